@@ -1,7 +1,19 @@
 from rest_framework.permissions import BasePermission
 
+from account.models import ROLE_ADMIN, ROLE_OWNER
+
 
 class IsSuperUser(BasePermission):
 
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_superuser)
\ No newline at end of file
+        return bool(request.user and request.user.is_superuser)
+
+
+class IsVenueStaff(BasePermission):
+    """Суперпользователь или владелец / администратор, привязанный к заведению."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        return user.is_superuser or bool(user.role in (ROLE_OWNER, ROLE_ADMIN) and user.venue_id)
\ No newline at end of file
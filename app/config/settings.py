@@ -20,6 +20,7 @@ DEBUG = bool(env("DEBUG", default=0))
 ALLOWED_HOSTS = env("DJANGO_ALLOWED_HOSTS").split(" ")
 
 DOMAIN = env("DOMAIN")
+SITE_URL = env("SITE_URL", default=f"https://{DOMAIN}")  # база для абсолютных ссылок на медиа
 
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_ALL_ORIGINS = True
@@ -168,6 +169,15 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Превью фото генерируются фоновым пулом (menu.services.thumbnails), а не в запросе гостя
+THUMBNAIL_WORKERS = int(env("THUMBNAIL_WORKERS", default=2))
+
+# Поиск товаров (menu.services.search): кроме триграмм по названию искать по tsvector названия и описания
+MENU_SEARCH_FULL_TEXT = bool(int(env("MENU_SEARCH_FULL_TEXT", default=0)))
+# postgres — запрос в БД (с кешем в Redis), memory — индекс в памяти процесса (menu.services.search_index)
+MENU_SEARCH_BACKEND = env("MENU_SEARCH_BACKEND", default="postgres")
+MENU_SEARCH_INDEX_SIZE = int(env("MENU_SEARCH_INDEX_SIZE", default=100))  # сколько заведений держать в памяти
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AXES_ENABLED = True
@@ -184,6 +194,12 @@ SMS_LOGIN=env("SMS_LOGIN")
 SMS_PASSWORD=env("SMS_PASSWORD")
 SMS_SENDER=env("SMS_SENDER")
 
+# Ссылка на оплату запрашивается в фоне: заказ создаётся сразу, ссылка приходит
+# в OrderStatusConsumer (order_payment_link) или через orders/{id}/payment-link/
+PAYMENT_LINK_DEFERRED = bool(int(env("PAYMENT_LINK_DEFERRED", default=0)))
+# Сколько потоков в каждом процессе сразу выполняют задачи оплаченных заказов (orders.services.order_jobs)
+ORDER_JOB_WORKERS = int(env("ORDER_JOB_WORKERS", default=2))
+
 RECEIPT_MQTT_BROKER = "193.176.239.186"
 RECEIPT_MQTT_PORT = 1883
 RECEIPT_MQTT_USERNAME = "myuser"
@@ -192,6 +208,16 @@ RECEIPT_MQTT_PASSWORD = "123456"
 POSTER_APPLICATION_ID = env('POSTER_APPLICATION_ID')
 POSTER_APPLICATION_SECRET = env('POSTER_APPLICATION_SECRET')
 POSTER_REDIRECT_URI = env('POSTER_REDIRECT_URI')
+# HTTP-клиент Poster (services.poster.transport)
+POSTER_CONNECT_TIMEOUT = float(env("POSTER_CONNECT_TIMEOUT", default=3))
+POSTER_READ_TIMEOUT = float(env("POSTER_READ_TIMEOUT", default=15))
+POSTER_RETRIES = int(env("POSTER_RETRIES", default=3))
+POSTER_RETRY_BACKOFF = float(env("POSTER_RETRY_BACKOFF", default=0.5))
+POSTER_POOL_SIZE = int(env("POSTER_POOL_SIZE", default=20))
+# Фоновая синхронизация меню (services.poster.sync_worker, команда sync_poster_menus)
+POSTER_SYNC_INTERVAL = int(env("POSTER_SYNC_INTERVAL", default=900))  # секунд между проходами
+POSTER_SYNC_WORKERS = int(env("POSTER_SYNC_WORKERS", default=4))
+POSTER_SYNC_LOCK_TIMEOUT = int(env("POSTER_SYNC_LOCK_TIMEOUT", default=600))
 
 OPENAI_API_KEY = env("OPENAI_API_KEY")
 
@@ -436,6 +462,12 @@ UNFOLD = {
                         "icon": "photo_library",
                         "link": reverse_lazy("admin:venues_banner_changelist"),
                     },
+                    {
+                        "title": _("Синхронизация с Poster"),
+                        "icon": "sync",
+                        "link": reverse_lazy("admin:venues_postersyncstate_changelist"),
+                        "permission": "account.utils.permission_callback_for_admin",
+                    },
                 ],
             },
             {
@@ -500,6 +532,12 @@ UNFOLD = {
                         "icon": "star",  # или "loyalty"/"redeem", если используешь Material Icons
                         "link": reverse_lazy("admin:orders_bonushistory_changelist"),
                     },
+                    {
+                        "title": _("Задачи по заказам"),
+                        "icon": "pending_actions",
+                        "link": reverse_lazy("admin:orders_orderjob_changelist"),
+                        "permission": lambda request: request.user.is_superuser,
+                    },
                 ],
             },
             {
@@ -1,5 +1,4 @@
 from django.contrib import admin, messages
-from django.core.cache import cache
 from django.http import HttpRequest, JsonResponse
 from django.shortcuts import redirect, get_object_or_404
 from django.urls import reverse_lazy, path
@@ -173,15 +172,6 @@ class CategoryAdmin(BaseModelAdmin, TabbedTranslationAdmin):
                 level=messages.SUCCESS
             )
 
-        cache.delete_pattern(f"categories:{obj.venue.slug}:*")
-        cache.delete_pattern(f"main_buttons:{obj.venue.slug}:*")
-
-    def delete_model(self, request, obj):
-        super().delete_model(request, obj)
-
-        cache.delete_pattern(f"categories:{obj.venue.slug}:*")
-        cache.delete_pattern(f"main_buttons:{obj.venue.slug}:*")
-
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         if request.user.is_superuser:
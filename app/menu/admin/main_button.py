@@ -1,6 +1,5 @@
 from django.contrib import admin
 from django import forms
-from django.core.cache import cache
 
 from account.models import ROLE_ADMIN, ROLE_OWNER
 from services.admin import BaseModelAdmin
@@ -89,13 +88,6 @@ class MainButtonAdmin(BaseModelAdmin):
             obj.venue = request.user.venue
         super().save_model(request, obj, form, change)
 
-        cache.delete_pattern(f"main_buttons:{obj.venue.slug}:*")
-
-    def delete_model(self, request, obj):
-        super().delete_model(request, obj)
-
-        cache.delete_pattern(f"main_buttons:{obj.venue.slug}:*")
-
     def has_add_permission(self, request):
         """Нельзя добавлять кнопки вручную"""
         # superuser может, если нужно, можно убрать
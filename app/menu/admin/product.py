@@ -1,7 +1,6 @@
 import logging
 
 from django.contrib import admin, messages
-from django.core.cache import cache
 from django.core.files.storage import default_storage
 from django.http import HttpRequest, JsonResponse
 from django.shortcuts import redirect, get_object_or_404
@@ -237,13 +236,6 @@ class ProductAdmin(BaseModelAdmin, TabbedTranslationAdmin, ImportExportModelAdmi
         if request.user.role == ROLE_ADMIN and not change:
             obj.spots.add(request.user.spot)
 
-        cache.delete_pattern(f"products:{obj.venue.slug}:*")
-
-    def delete_model(self, request, obj):
-        super().delete_model(request, obj)
-
-        cache.delete_pattern(f"products:{obj.venue.slug}:*")
-
     def formfield_for_manytomany(self, db_field, request, **kwargs):
         if request.user.role in [ROLE_OWNER, ROLE_ADMIN] and db_field.name == 'spots':
             venue = request.user.venue
@@ -1,5 +1,4 @@
 from django.contrib import admin, messages
-from django.core.cache import cache
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.urls import path
@@ -104,13 +103,6 @@ class SectionAdmin(BaseModelAdmin, TabbedTranslationAdmin):
             obj.venue = request.user.venue
         super().save_model(request, obj, form, change)
 
-        cache.delete_pattern(f"main_buttons:{obj.venue.slug}:*")
-
-    def delete_model(self, request, obj):
-        super().delete_model(request, obj)
-
-        cache.delete_pattern(f"main_buttons:{obj.venue.slug}:*")
-
     # --- Фильтрация queryset по ролям ---
     def get_queryset(self, request):
         qs = super().get_queryset(request)
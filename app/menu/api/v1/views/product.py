@@ -1,13 +1,15 @@
 from django.contrib.postgres.search import TrigramSimilarity
 from django.core.cache import cache
+from django.db.models import Prefetch
 from django.db.models.functions import Lower
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, mixins, status
 from rest_framework.response import Response
 
-from menu.models import Product
+from menu.models import Modificator, Product
 from menu.api.v1.serializers import ProductSerializer
+from menu.services import menu_cache_key, menu_language
 
 
 @extend_schema(
@@ -54,7 +56,7 @@ class ProductViewSet(viewsets.GenericViewSet,
             Product.objects
             .filter(venue__slug__iexact=venue_slug, hidden=False)
             .select_related("category", "venue")
-            .prefetch_related("modificators")
+            .prefetch_related(Prefetch("modificators", queryset=Modificator.objects.filter(is_hidden=False)))
         )
 
         if spot_id:
@@ -82,7 +84,7 @@ class ProductViewSet(viewsets.GenericViewSet,
         other_params = request.GET.copy()
         other_params.pop("venue_slug", None)
         params_str = other_params.urlencode()
-        cache_key = f"products:{venue_slug.lower()}:{params_str}"
+        cache_key = menu_cache_key("products_v1", venue_slug, menu_language(), params_str)
 
         data = cache.get(cache_key)
 
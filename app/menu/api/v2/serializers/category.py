@@ -1,32 +1,26 @@
 from rest_framework import serializers
 
-from config.settings import MEDIA_URL
 from menu.models import Category
+from menu.services.photo_urls import get_photo_urls
 
 
 class CategorySerializer(serializers.ModelSerializer):
     category_photo = serializers.SerializerMethodField()
     category_photo_small = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
     sections = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
 
     class Meta:
         model = Category
-        fields = ['id', 'category_name', 'slug', 'category_photo', 'category_photo_small', 'sections']
+        fields = ['id', 'category_name', 'slug', 'category_photo', 'category_photo_small', 'images', 'sections']
 
     def get_category_photo(self, obj):
-        # Если внешний URL
-        if obj.category_photo and str(obj.category_photo).startswith('http'):
-            return str(obj.category_photo)
-        # Если локальный файл
-        if obj.category_photo:
-            return self.context['request'].build_absolute_uri(obj.category_photo.url)
-        return None
+        return get_photo_urls(obj).get('original')
 
     def get_category_photo_small(self, obj):
-        # Для внешних URL нельзя сделать превью — возвращаем оригинал
-        if obj.category_photo and str(obj.category_photo).startswith('http'):
-            return str(obj.category_photo)
-        # Для локального файла возвращаем уменьшенную версию
-        if obj.category_photo_small:
-            return self.context['request'].build_absolute_uri(obj.category_photo_small.url)
-        return None
+        # Для внешних URL превью нет — там лежит оригинал
+        return get_photo_urls(obj).get('small')
+
+    def get_images(self, obj):
+        # WebP/AVIF-варианты в нескольких ширинах; None, пока фото не обработано пайплайном
+        return get_photo_urls(obj).get('images')
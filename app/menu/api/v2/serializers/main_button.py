@@ -3,6 +3,7 @@ from rest_framework import serializers
 from menu.api.v2.serializers import CategorySerializer
 from menu.api.v2.serializers.section import SectionSerializer
 from menu.models import MainButton
+from menu.services.photo_urls import get_photo_urls
 
 
 class MainButtonSerializer(serializers.ModelSerializer):
@@ -29,7 +30,8 @@ class MainButtonSerializer(serializers.ModelSerializer):
 
     def get_categories(self, obj):
         if obj.button_type == 'section' and hasattr(obj.section, 'categories'):
-            categories = obj.section.categories.all().order_by('sort_order')
+            # сортируем в Python: order_by() мимо prefetch_related ушёл бы в базу на каждую кнопку
+            categories = sorted(obj.section.categories.all(), key=lambda category: category.sort_order)
             return CategorySerializer(
                 categories, many=True, context=self.context
             ).data
@@ -47,24 +49,15 @@ class MainButtonSerializer(serializers.ModelSerializer):
 
     def get_photo(self, obj):
         """
-        Возвращает url картинки из section/category, если есть поле photo/photo.
+        Возвращает url превью картинки из section/category.
         """
-        photo_field = None
+        url = None
 
         # Проверяем Section
         if obj.section:
-            photo_field = getattr(obj.section, "photo_small", None)
+            url = get_photo_urls(obj.section).get("small")
 
-        if not photo_field and obj.category:
-            photo_field = getattr(obj.category, "category_photo_small", None)
-
-        if not photo_field:
-            return None
-
-        request = self.context.get("request")
-        url = getattr(photo_field, "url", None) if hasattr(photo_field, "url") else str(photo_field)
-
-        if url and request and not url.startswith("http"):
-            url = request.build_absolute_uri(url)
+        if not url and obj.category:
+            url = get_photo_urls(obj.category).get("small")
 
         return url
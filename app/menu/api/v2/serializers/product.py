@@ -1,7 +1,7 @@
 from rest_framework import serializers
 
-from config.settings import MEDIA_URL
 from menu.models import Product, Modificator, Category, ProductAttribute
+from menu.services.photo_urls import get_photo_urls
 
 
 class ModificatorSerializer(serializers.ModelSerializer):
@@ -29,35 +29,25 @@ class ProductSerializer(serializers.ModelSerializer):
     product_photo = serializers.SerializerMethodField()
     product_photo_small = serializers.SerializerMethodField()
     product_photo_large = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
 
     class Meta:
             model = Product
             fields = [
                 'id', 'product_name', 'product_description', 'product_price', 'weight',
-                'product_photo', 'product_photo_small', 'product_photo_large',
+                'product_photo', 'product_photo_small', 'product_photo_large', 'images',
                 'categories', 'is_recommended', 'modificators'
             ]
 
     def get_product_photo(self, obj):
-        if obj.product_photo:
-            photo_str = str(obj.product_photo)
-            if photo_str.startswith("http"):
-                return photo_str
-            return self.context['request'].build_absolute_uri(obj.product_photo.url)
-        return None
+        return get_photo_urls(obj).get('original')
 
     def get_product_photo_small(self, obj):
-        if obj.product_photo_small:
-            url = str(obj.product_photo_small)
-            if url.startswith("http"):
-                return url
-            return self.context['request'].build_absolute_uri(obj.product_photo_small.url)
-        return ''
+        return get_photo_urls(obj).get('small', '')
 
     def get_product_photo_large(self, obj):
-        if obj.product_photo_large:
-            url = str(obj.product_photo_large)
-            if url.startswith("http"):
-                return url
-            return self.context['request'].build_absolute_uri(obj.product_photo_large.url)
-        return ''
+        return get_photo_urls(obj).get('large', '')
+
+    def get_images(self, obj):
+        # WebP/AVIF-варианты в нескольких ширинах; None, пока фото не обработано пайплайном
+        return get_photo_urls(obj).get('images')
@@ -0,0 +1,29 @@
+from rest_framework import serializers
+
+from menu.api.v2.serializers.product import ProductSerializer, ProductAttributeSerializer
+from menu.models import Section
+from menu.services.photo_urls import get_photo_urls
+
+
+class SnapshotSectionSerializer(serializers.ModelSerializer):
+    photo_small = serializers.SerializerMethodField()
+    categories = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Section
+        fields = ('id', 'name', 'photo_small', 'categories')
+
+    def get_photo_small(self, obj):
+        return get_photo_urls(obj).get('small')
+
+
+class SnapshotProductSerializer(ProductSerializer):
+    """
+    Товар в снапшоте меню: дополнительно отдаёт атрибуты и точки,
+    чтобы фронт мог фильтровать по spot_id без отдельного запроса.
+    """
+    product_attributes = ProductAttributeSerializer(many=True, read_only=True)
+    spots = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta(ProductSerializer.Meta):
+        fields = ProductSerializer.Meta.fields + ['product_attributes', 'spots']
@@ -8,5 +8,6 @@ router.register(r'products', views.ProductViewSet, basename='products-v2')
 
 urlpatterns = [
     path('', include(router.urls)),
-    path("main-buttons/", views.MainButtonsAPIView.as_view(), name="main-buttons-v2")
+    path("main-buttons/", views.MainButtonsAPIView.as_view(), name="main-buttons-v2"),
+    path("menu-snapshot/", views.MenuSnapshotAPIView.as_view(), name="menu-snapshot-v2"),
 ]
@@ -1,3 +1,4 @@
 from .category import *
 from .product import *
-from .main_button import *
\ No newline at end of file
+from .main_button import *
+from .snapshot import *
\ No newline at end of file
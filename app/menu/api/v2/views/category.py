@@ -1,6 +1,5 @@
 from urllib.parse import urlencode
 
-from django.core.cache import cache
 from django.http import JsonResponse
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, mixins, status
@@ -9,6 +8,10 @@ from rest_framework.response import Response
 
 from menu.models import Category
 from menu.api.v2.serializers import CategorySerializer
+from menu.services import (
+    cache_key_etag, categories_cache_key, etag_headers, etag_matches, get_or_build_menu_data, menu_language,
+    not_modified_response
+)
 
 
 @extend_schema(
@@ -60,17 +63,19 @@ class CategoryViewSet(viewsets.GenericViewSet, mixins.ListModelMixin):
         other_params = request.GET.copy()
         other_params.pop("venue_slug", None)
         params_str = urlencode(sorted(other_params.items()))  # упорядочиваем, чтобы порядок параметров не влиял
-        cache_key = f"categories:{venue_slug.lower()}:{params_str}"
+        cache_key = categories_cache_key(venue_slug, menu_language(), params_str)
+        etag = cache_key_etag(cache_key)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
 
-        data = cache.get(cache_key)
+        data, etag = get_or_build_menu_data(cache_key, self._build_list_data)
 
-        if not data:
-            queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
-            data = serializer.data
-            cache.set(cache_key, data, 60 * 30)  # 30 минут
+        return Response(data, status=status.HTTP_200_OK, headers=etag_headers(etag))
 
-        return Response(data, status=status.HTTP_200_OK)
+    def _build_list_data(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer(queryset, many=True)
+        return serializer.data
 
 
 def get_categories(request):
@@ -1,10 +1,13 @@
-from django.core.cache import cache
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from menu.models import MainButton
 from menu.api.v2.serializers import MainButtonSerializer
+from menu.services import (
+    cache_key_etag, etag_headers, etag_matches, get_or_build_menu_data, group_main_buttons, main_buttons_cache_key,
+    menu_language, not_modified_response
+)
 
 
 @extend_schema(
@@ -32,10 +35,16 @@ class MainButtonsAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        cache_key = f"main_buttons:{venue_slug.lower()}"
-        data = cache.get(cache_key)
+        cache_key = main_buttons_cache_key(venue_slug, menu_language())
+        etag = cache_key_etag(cache_key)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+
+        data, etag = get_or_build_menu_data(cache_key, lambda: self._build_data(venue_slug))
+
+        return Response(data, status=status.HTTP_200_OK, headers=etag_headers(etag))
 
-        # if not data:
+    def _build_data(self, venue_slug):
         buttons = (
             MainButton.objects
             .filter(venue__slug__iexact=venue_slug)
@@ -44,13 +53,5 @@ class MainButtonsAPIView(APIView):
             .order_by("order")
         )
 
-        serializer = MainButtonSerializer(buttons, many=True, context={"request": request})
-        serialized_data = serializer.data
-
-        # группировка (2 + 3)
-        grouped = [serialized_data[:2], serialized_data[2:5]]
-
-        cache.set(cache_key, grouped, 60 * 30)  # 30 минут
-        data = grouped
-
-        return Response(data, status=status.HTTP_200_OK)
+        serializer = MainButtonSerializer(buttons, many=True, context={"request": self.request})
+        return group_main_buttons(serializer.data)
@@ -1,14 +1,18 @@
-from django.contrib.postgres.search import TrigramSimilarity
-from django.core.cache import cache
-from django.db.models.functions import Lower
+from django.conf import settings
+from django.db.models import Case, Prefetch, When
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, mixins, status
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from menu.models import Product
+from menu.models import Modificator, Product
 from menu.api.v2.serializers import ProductSerializer
+from menu.services import (
+    cache_key_etag, etag_headers, etag_matches, get_or_build_menu_data, get_or_build_search_data, menu_language,
+    normalize_search_query, not_modified_response, products_cache_key, search_product_ids,
+    search_product_ids_in_memory
+)
 
 
 @extend_schema(
@@ -28,7 +32,7 @@ from menu.api.v2.serializers import ProductSerializer
         ),
         OpenApiParameter(
             name='search',  # Имя параметра
-            description='Поиск по product_name',  # Описание параметра
+            description='Поиск по названию и описанию товара на языке запроса',  # Описание параметра
             required=False,  # Параметр необязательный
             type=str  # Тип данных
         )
@@ -53,21 +57,21 @@ class ProductViewSet(viewsets.GenericViewSet,
         qs = (
             Product.objects
             .filter(venue__slug__iexact=venue_slug, hidden=False)
-            .prefetch_related('categories', "modificators")
+            .prefetch_related('categories', Prefetch("modificators", queryset=Modificator.objects.filter(is_hidden=False)))
         )
 
         if spot_id:
             qs = qs.filter(spots__id=spot_id)
 
         if search_query:
+            if settings.MENU_SEARCH_BACKEND == 'memory':
+                product_ids = search_product_ids_in_memory(venue_slug, search_query)
+            else:
+                product_ids = search_product_ids(venue_slug, search_query)
+            # сохраняем порядок релевантности из поиска
             qs = (
-                qs.annotate(
-                    similarity=TrigramSimilarity(
-                        Lower('product_name'), search_query.lower()
-                    )
-                )
-                .filter(similarity__gt=0.1)
-                .order_by('-similarity')
+                qs.filter(id__in=product_ids)
+                .order_by(Case(*[When(id=pk, then=pos) for pos, pk in enumerate(product_ids)]))
             )
 
         return qs.distinct()
@@ -80,15 +84,24 @@ class ProductViewSet(viewsets.GenericViewSet,
 
         other_params = request.GET.copy()
         other_params.pop("venue_slug", None)
+        search_query = other_params.get("search")
+        if search_query:
+            # выдача зависит только от нормализованной строки — «Лате » и «лате» делят один ключ
+            other_params["search"] = normalize_search_query(search_query) or search_query
         params_str = other_params.urlencode()
-        cache_key = f"products:{venue_slug.lower()}:{params_str}"
+        cache_key = products_cache_key(venue_slug, menu_language(), params_str)
+        etag = cache_key_etag(cache_key)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
 
-        data = cache.get(cache_key)
+        if search_query:
+            data, etag = get_or_build_search_data(cache_key, self._build_list_data)
+        else:
+            data, etag = get_or_build_menu_data(cache_key, self._build_list_data)
 
-        if not data:
-            queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
-            data = serializer.data
-            cache.set(cache_key, data, 60 * 30)
+        return Response(data, status=status.HTTP_200_OK, headers=etag_headers(etag))
 
-        return Response(data, status=status.HTTP_200_OK)
+    def _build_list_data(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer(queryset, many=True)
+        return serializer.data
@@ -0,0 +1,49 @@
+from django.http import HttpResponse
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from menu.services import (
+    cache_key_etag, etag_headers, etag_matches, get_menu_snapshot, get_menu_version, menu_language,
+    menu_snapshot_key, not_modified_response
+)
+
+
+@extend_schema(
+    tags=["MenuSnapshot"],
+    parameters=[
+        OpenApiParameter(
+            name="venue_slug",
+            description="Слаг заведения (пример: ?venue_slug=my-cafe)",
+            required=True,
+            type=str,
+        )
+    ],
+)
+class MenuSnapshotAPIView(APIView):
+    """
+    Возвращает всё меню заведения одним документом: заведение, точки, график,
+    главные кнопки, разделы, категории и товары.
+    Документ собирается заранее и отдаётся из кеша без обращения к базе.
+    """
+
+    def get(self, request):
+        venue_slug = request.query_params.get("venue_slug")
+        if not venue_slug:
+            return Response(
+                {"error": "Параметр 'venue_slug' обязателен."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        version = get_menu_version(venue_slug)
+        language = menu_language()
+        etag = cache_key_etag(menu_snapshot_key(venue_slug, version, language))
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+
+        content = get_menu_snapshot(venue_slug, version, request, language)
+        if content is None:
+            return Response({"error": "Заведение не найдено."}, status=status.HTTP_404_NOT_FOUND)
+
+        return HttpResponse(content, content_type="application/json", headers=etag_headers(etag))
@@ -0,0 +1,80 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from menu.services import bump_menu_version, menu_version_key
+
+KEY_PREFIX = "bench_products"
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает стоимость сброса кеша меню одного заведения: "
+        "delete_pattern (SCAN по всем ключам) против смены версии (один INCR)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+            help='Сколько ключей лежит в Redis на каждом шаге'
+        )
+        parser.add_argument(
+            '--venues', type=int, default=50,
+            help='Между сколькими заведениями делятся ключи'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько замеров делать на каждом шаге'
+        )
+
+    def handle(self, *args, **options):
+        if not hasattr(cache, 'delete_pattern'):
+            raise CommandError("❌ Нужен django_redis: у текущего кеша нет delete_pattern.")
+
+        venues = options['venues']
+        slug = "bench-venue-0"
+        rows = []
+
+        try:
+            for size in options['sizes']:
+                per_venue = max(size // venues, 1)
+                self._fill(venues, per_venue)
+
+                pattern_times, version_times = [], []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    cache.delete_pattern(f"{KEY_PREFIX}:{slug}:*")
+                    pattern_times.append(time.perf_counter() - started)
+                    self._fill_venue(slug, per_venue)
+
+                    started = time.perf_counter()
+                    bump_menu_version(slug)
+                    version_times.append(time.perf_counter() - started)
+
+                rows.append((size, statistics.median(pattern_times), statistics.median(version_times)))
+                self.stdout.write(f"🔄 {size} ключей: замер готов")
+        finally:
+            cache.delete_pattern(f"{KEY_PREFIX}:*")
+            cache.delete(menu_version_key(slug))
+
+        self.stdout.write(f"{'ключей':>10} {'delete_pattern, мс':>20} {'INCR версии, мс':>18}")
+        for size, pattern_time, version_time in rows:
+            self.stdout.write(f"{size:>10} {pattern_time * 1000:>20.2f} {version_time * 1000:>18.3f}")
+        self.stdout.write(self.style.SUCCESS("🏁 Готово!"))
+
+    def _fill(self, venues, per_venue):
+        for venue_num in range(venues):
+            self._fill_venue(f"bench-venue-{venue_num}", per_venue)
+
+    def _fill_venue(self, slug, count):
+        for start in range(0, count, CHUNK_SIZE):
+            cache.set_many(
+                {
+                    f"{KEY_PREFIX}:{slug}:{num}": b"x" * 64
+                    for num in range(start, min(start + CHUNK_SIZE, count))
+                },
+                timeout=60 * 10,
+            )
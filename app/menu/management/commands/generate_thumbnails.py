@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from menu.models import Category, Product, Section
+from menu.services import PHOTO_FIELDS, generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        "Генерирует все превью фото товаров, категорий и разделов и сохраняет ссылки на них. "
+        "После выката photo_urls запустить с --missing: до этого такие записи отдают оригинал фото"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--venue_id',
+            type=int,
+            help='ID заведения, если нужно обработать только его'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Перегенерировать превью, даже если файлы уже есть'
+        )
+        parser.add_argument(
+            '--missing',
+            action='store_true',
+            help='Только записи без сохранённых ссылок (например, после добавления photo_urls)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.THUMBNAIL_WORKERS,
+            help='Сколько фото обрабатывать параллельно'
+        )
+
+    def handle(self, *args, **options):
+        venue_id = options.get('venue_id')
+        force = options['force']
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for model in (Product, Category, Section):
+                source_name, _ = PHOTO_FIELDS[model]
+                queryset = model.objects.exclude(**{source_name: ''}).exclude(**{f'{source_name}__isnull': True})
+                if venue_id:
+                    queryset = queryset.filter(venue_id=venue_id)
+                if options['missing']:
+                    queryset = queryset.filter(photo_urls={})
+
+                pks = list(queryset.values_list('pk', flat=True))
+                self.stdout.write(f"🔄 {model.__name__}: {len(pks)} фото")
+
+                futures = [executor.submit(self._generate, model, pk, force) for pk in pks]
+                failed = 0
+                for future in as_completed(futures):
+                    error = future.result()
+                    if error:
+                        failed += 1
+                        self.stdout.write(self.style.ERROR(f"❌ {error}"))
+
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ {model.__name__}: готово {len(pks) - failed}, ошибок {failed}"
+                ))
+
+        self.stdout.write(self.style.SUCCESS("🏁 Готово!"))
+
+    @staticmethod
+    def _generate(model, pk, force):
+        try:
+            generate_thumbnails(model, pk, force=force)
+        except Exception as e:
+            return f"{model.__name__} {pk}: {e}"
+        finally:
+            connection.close()
+        return None
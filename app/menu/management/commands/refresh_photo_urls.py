@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from menu.models import Category, Product, Section
+from menu.services import refresh_photo_urls
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает сохранённые ссылки на фото и превью товаров, категорий и разделов "
+        "(после выкладки или смены SITE_URL)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--venue_id',
+            type=int,
+            help='ID заведения, если нужно обработать только его'
+        )
+
+    def handle(self, *args, **options):
+        venue_id = options.get('venue_id')
+
+        for model in (Product, Category, Section):
+            queryset = model.objects.all()
+            if venue_id:
+                queryset = queryset.filter(venue_id=venue_id)
+
+            updated = 0
+            for instance in queryset.iterator(chunk_size=500):
+                old_urls = instance.photo_urls
+                if refresh_photo_urls(instance) != old_urls:
+                    updated += 1
+
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {model.__name__}: обновлено ссылок у {updated} записей"
+            ))
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from menu.services import warm_menu_cache
+from venues.models import Venue
+
+
+class Command(BaseCommand):
+    help = (
+        "Заранее собирает кеш меню (товары, категории, главные кнопки, снапшот) "
+        "на всех языках за один проход по базе"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--venue',
+            help='Слаг заведения, если нужно прогреть только его'
+        )
+        parser.add_argument(
+            '--languages',
+            nargs='+',
+            choices=settings.MODELTRANSLATION_LANGUAGES,
+            help='Языки (по умолчанию все из MODELTRANSLATION_LANGUAGES)'
+        )
+
+    def handle(self, *args, **options):
+        venue_slugs = Venue.objects.order_by('slug').values_list('slug', flat=True)
+        if options.get('venue'):
+            venue_slugs = venue_slugs.filter(slug__iexact=options['venue'])
+
+        for venue_slug in venue_slugs:
+            started = time.monotonic()
+            languages = warm_menu_cache(venue_slug, options.get('languages'))
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {venue_slug}: {', '.join(languages)} за {time.monotonic() - started:.2f}с"
+            ))
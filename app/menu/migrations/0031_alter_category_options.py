@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-18 16:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0030_category_sort_order'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'ordering': ['sort_order'], 'verbose_name': 'Категория', 'verbose_name_plural': 'Категории'},
+        ),
+    ]
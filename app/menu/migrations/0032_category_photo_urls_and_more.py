@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-18 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0031_alter_category_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='photo_urls',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Ссылки на фото и превью'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='photo_urls',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Ссылки на фото и превью'),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='photo_urls',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Ссылки на фото и превью'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1 on 2026-10-18 16:16
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0032_category_photo_urls_and_more'),
+        ('venues', '0047_venue_table_qr_text_en_venue_table_qr_text_ky_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('product_name_ru'), name='gin_trgm_ops'), name='product_name_ru_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('product_name_en'), name='gin_trgm_ops'), name='product_name_en_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('product_name_ky'), name='gin_trgm_ops'), name='product_name_ky_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('product_name_ru', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('product_description_ru', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), name='product_ru_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('product_name_en', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('product_description_en', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), name='product_en_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('product_name_ky', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('product_description_ky', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), name='product_ky_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0033_product_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modificator',
+            name='is_hidden',
+            field=models.BooleanField(default=False, verbose_name='Скрыт?'),
+        ),
+    ]
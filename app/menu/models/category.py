@@ -33,6 +33,10 @@ class Category(BaseModel):
         format='PNG',
         options={'quality': 90}
     )
+    photo_urls = models.JSONField(
+        default=dict, blank=True, editable=False,
+        verbose_name="Ссылки на фото и превью"
+    )
     category_hidden = models.BooleanField(
         default=False,
         verbose_name="Скрыт?",
@@ -17,6 +17,8 @@ class Modificator(BaseModel):
         'Product', on_delete=models.CASCADE, related_name='modificators',
         verbose_name="Товар"
     )
+    # пропавший из Poster модификатор скрывается, а не удаляется: на него ссылается история заказов
+    is_hidden = models.BooleanField(default=False, verbose_name="Скрыт?")
 
     def __str__(self):
         return self.name
@@ -1,10 +1,16 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models.functions import Lower
 from imagekit.models import ProcessedImageField, ImageSpecField
 from pilkit.processors import ResizeToFill
 
 from services.model import BaseModel
 
 
+SEARCH_LANGUAGES = ('ru', 'en', 'ky')  # совпадает с MODELTRANSLATION_LANGUAGES
+
+
 class Product(BaseModel):
     external_id = models.CharField(max_length=100, blank=True, verbose_name="Внешний ID товара")
     product_name = models.CharField(max_length=255, verbose_name="Название товара")
@@ -26,6 +32,10 @@ class Product(BaseModel):
         format='JPEG',
         options={'quality': 85}
     )
+    photo_urls = models.JSONField(
+        default=dict, blank=True, editable=False,
+        verbose_name="Ссылки на фото и превью"
+    )
 
     product_price = models.BigIntegerField( blank=True, default=0,
                                         verbose_name="Цена товара")
@@ -50,6 +60,21 @@ class Product(BaseModel):
         indexes = [
             models.Index(fields=['product_name']),  # For search optimization
             models.Index(fields=['venue', 'hidden']),  # For filtering
+            # Поиск (menu.services.search): триграммы по названию на каждом языке
+            # и взвешенный tsvector по названию и описанию
+            *[
+                GinIndex(OpClass(Lower(f'product_name_{lang}'), name='gin_trgm_ops'),
+                         name=f'product_name_{lang}_trgm_idx')
+                for lang in SEARCH_LANGUAGES
+            ],
+            *[
+                GinIndex(
+                    SearchVector(f'product_name_{lang}', weight='A', config='simple')
+                    + SearchVector(f'product_description_{lang}', weight='B', config='simple'),
+                    name=f'product_{lang}_search_vector_idx'
+                )
+                for lang in SEARCH_LANGUAGES
+            ],
         ]
 
     def __str__(self):
@@ -21,6 +21,10 @@ class Section(BaseModel):
         format='PNG',
         options={'quality': 50}
     )
+    photo_urls = models.JSONField(
+        default=dict, blank=True, editable=False,
+        verbose_name="Ссылки на фото и превью"
+    )
     venue = models.ForeignKey(
         'venues.Venue',
         on_delete=models.CASCADE,
@@ -1,2 +1,12 @@
 from .ai_image import *
-from .ai_translate import *
\ No newline at end of file
+from .ai_translate import *
+from .etag import *
+from .menu_version import *
+from .menu_cache import *
+from .image_variants import *
+from .photo_urls import *
+from .thumbnails import *
+from .snapshot import *
+from .search import *
+from .search_index import *
+from .menu_variants import *
\ No newline at end of file
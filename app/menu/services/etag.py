@@ -0,0 +1,35 @@
+import hashlib
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+# Браузер хранит ответ, но перед использованием всегда перепроверяет его по ETag
+MENU_CACHE_CONTROL = "no-cache"
+# Язык ответа выбирается по Accept-Language (LanguageMiddleware) и входит в кеш-ключ,
+# поэтому и кеши между клиентом и сервером должны хранить варианты по языкам
+MENU_VARY = "Accept-Language"
+
+
+def cache_key_etag(cache_key: str) -> str:
+    """
+    Сильный ETag для ответа, закешированного под ключом с версией меню.
+    Ключ меняется при каждом изменении меню заведения, а значит и ETag.
+    """
+    return quote_etag(hashlib.md5(cache_key.encode()).hexdigest())
+
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return "*" in etags or etag in etags
+
+
+def etag_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": MENU_CACHE_CONTROL, "Vary": MENU_VARY}
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
@@ -0,0 +1,60 @@
+from imagekit import ImageSpec, register
+from imagekit.cachefiles import ImageCacheFile
+from PIL import Image
+from pilkit.processors import ResizeToFill, ResizeToFit
+
+from menu.models import Category, Product, Section
+
+
+def _avif_supported() -> bool:
+    try:
+        import pillow_avif  # noqa: F401  необязательный плагин, регистрирует AVIF в Pillow
+    except ImportError:
+        pass
+    Image.init()
+    return 'AVIF' in Image.SAVE
+
+
+# формат -> (формат Pillow, MIME-тип, опции сохранения); AVIF — только если Pillow умеет его писать
+RESPONSIVE_FORMATS = {}
+if _avif_supported():
+    RESPONSIVE_FORMATS['avif'] = ('AVIF', 'image/avif', {'quality': 55})
+RESPONSIVE_FORMATS['webp'] = ('WEBP', 'image/webp', {'quality': 80})
+
+# модель -> (процессор, размеры); товары режутся под 4:3 как product_photo_small/large
+RESPONSIVE_SIZES = {
+    Product: (ResizeToFill, [(320, 240), (480, 360), (640, 480)]),
+    Category: (ResizeToFit, [(100, 100), (200, 200), (400, 400)]),
+    Section: (ResizeToFit, [(150, 150), (300, 300), (600, 600)]),
+}
+
+_spec_classes = {}
+
+
+def _spec_class(processor, width, height, image_format, options):
+    key = (processor, width, height, image_format)
+    if key not in _spec_classes:
+        _spec_classes[key] = type(
+            f"Responsive{image_format.title()}{width}x{height}Spec",
+            (ImageSpec,),
+            {'processors': [processor(width, height)], 'format': image_format, 'options': options},
+        )
+        # imagekit создаёт недостающий файл по .url только для зарегистрированных спек
+        register.generator(
+            f"menu:{processor.__name__.lower()}_{image_format.lower()}_{width}x{height}", _spec_classes[key]
+        )
+    return _spec_classes[key]
+
+
+def responsive_variants(instance, source):
+    """
+    Современные варианты фото в нескольких ширинах.
+    Возвращает список (формат, ширина, высота, MIME-тип, ImageCacheFile).
+    """
+    processor, sizes = RESPONSIVE_SIZES[type(instance)]
+    variants = []
+    for variant_format, (image_format, mime_type, options) in RESPONSIVE_FORMATS.items():
+        for width, height in sizes:
+            spec = _spec_class(processor, width, height, image_format, options)(source=source)
+            variants.append((variant_format, width, height, mime_type, ImageCacheFile(spec)))
+    return variants
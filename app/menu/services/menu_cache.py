@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.utils import translation
+
+from menu.services.etag import cache_key_etag
+
+logger = logging.getLogger(__name__)
+
+MENU_CACHE_TIMEOUT = 60 * 30  # 30 минут
+MENU_EARLY_REFRESH = 60  # за минуту до истечения данные начинают обновляться в фоне
+MENU_STALE_TIMEOUT = 60 * 60 * 24  # предыдущее значение держим сутки
+REBUILD_LOCK_TIMEOUT = 60
+REBUILD_WAIT = 5
+REBUILD_POLL_INTERVAL = 0.05
+SEARCH_RESULTS_CACHE_TIMEOUT = 60 * 2  # выдача поиска: ключ на каждую строку, держим недолго
+
+
+def get_or_build_menu_data(cache_key: str, build):
+    """
+    Читает данные меню из кеша по ключу из menu_cache_key(), пересобирая их
+    через build() не более чем в одном воркере одновременно (lock в Redis на ключ).
+
+    Пока данные пересобираются, остальные запросы получают предыдущее значение
+    (stale-while-revalidate), а сама пересборка идёт в фоне. Ждать сборки
+    приходится только если по ключу ещё никогда ничего не кешировалось.
+
+    Возвращает (data, etag): etag соответствует именно отданным данным,
+    в том числе когда отдаётся предыдущее значение.
+    """
+    stale_key = _stale_key(cache_key)
+
+    entry = cache.get(cache_key)
+    if entry is not None:
+        if entry["refresh_at"] <= time.time():
+            _rebuild_in_background(cache_key, stale_key, build)
+        return entry["data"], entry["etag"]
+
+    stale = cache.get(stale_key)
+    if stale is not None:
+        _rebuild_in_background(cache_key, stale_key, build)
+        return stale["data"], stale["etag"]
+
+    lock_key = f"{cache_key}:lock"
+    deadline = time.monotonic() + REBUILD_WAIT
+    while not cache.add(lock_key, 1, REBUILD_LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            # держатель лока завис или упал — собираем сами, не оставляя гостя без меню
+            return _store(cache_key, stale_key, build())
+        time.sleep(REBUILD_POLL_INTERVAL)
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return entry["data"], entry["etag"]
+
+    try:
+        return _store(cache_key, stale_key, build())
+    finally:
+        cache.delete(lock_key)
+
+
+def get_or_build_search_data(cache_key: str, build):
+    """
+    Кеш выдачи поиска. Ключей здесь столько, сколько разных строк ввели гости,
+    поэтому без stale-копии на сутки и фоновой пересборки — только короткий TTL.
+    Возвращает (data, etag), как и get_or_build_menu_data().
+    """
+    entry = cache.get(cache_key)
+    if entry is not None:
+        return entry["data"], entry["etag"]
+
+    data, etag = build(), cache_key_etag(cache_key)
+    cache.set(cache_key, {"data": data, "etag": etag}, SEARCH_RESULTS_CACHE_TIMEOUT)
+    return data, etag
+
+
+def store_menu_data(cache_key: str, data):
+    """Кладёт заранее собранные данные под ключ get_or_build_menu_data(), возвращает (data, etag)."""
+    return _store(cache_key, _stale_key(cache_key), data)
+
+
+def _stale_key(cache_key):
+    # prefix:slug:version:params -> prefix:slug:stale:params
+    prefix, venue_slug, _version, params = cache_key.split(":", 3)
+    return f"{prefix}:{venue_slug}:stale:{params}"
+
+
+def _store(cache_key, stale_key, data):
+    etag = cache_key_etag(cache_key)
+    refresh_at = time.time() + MENU_CACHE_TIMEOUT - MENU_EARLY_REFRESH
+    cache.set(cache_key, {"data": data, "etag": etag, "refresh_at": refresh_at}, MENU_CACHE_TIMEOUT)
+    cache.set(stale_key, {"data": data, "etag": etag}, MENU_STALE_TIMEOUT)
+    return data, etag
+
+
+def _rebuild_in_background(cache_key, stale_key, build):
+    lock_key = f"{cache_key}:lock"
+    if not cache.add(lock_key, 1, REBUILD_LOCK_TIMEOUT):
+        return  # уже пересобирает другой воркер
+
+    # язык активирован только в потоке запроса, а данные в ключе — на языке запроса
+    language = translation.get_language()
+
+    def rebuild():
+        try:
+            with translation.override(language):
+                data = build()
+            _store(cache_key, stale_key, data)
+        except Exception:
+            logger.exception(f"Failed to rebuild menu cache {cache_key}")
+        finally:
+            cache.delete(lock_key)
+            connection.close()
+
+    threading.Thread(target=rebuild, daemon=True).start()
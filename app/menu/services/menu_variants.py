@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import translation
+
+from menu.models import Product
+from menu.services.menu_cache import store_menu_data
+from menu.services.menu_version import get_menu_version, menu_cache_key
+from menu.services.snapshot import (
+    MENU_SNAPSHOT_TIMEOUT, load_menu_snapshot_objects, menu_snapshot_key, render_menu_snapshot
+)
+
+
+def menu_language() -> str:
+    """Язык ответа меню: активный язык запроса (его выставляет LanguageMiddleware) или основной."""
+    language = (translation.get_language() or settings.MODELTRANSLATION_DEFAULT_LANGUAGE).split("-")[0]
+    return language if language in settings.MODELTRANSLATION_LANGUAGES else settings.MODELTRANSLATION_DEFAULT_LANGUAGE
+
+
+def products_cache_key(venue_slug: str, language: str, params: str = "") -> str:
+    return menu_cache_key("products", venue_slug, language, params)
+
+
+def categories_cache_key(venue_slug: str, language: str, params: str = "") -> str:
+    return menu_cache_key("categories", venue_slug, language, params)
+
+
+def main_buttons_cache_key(venue_slug: str, language: str) -> str:
+    return menu_cache_key("main_buttons", venue_slug, language)
+
+
+def group_main_buttons(buttons_data) -> list:
+    # группировка (2 + 3)
+    return [buttons_data[:2], buttons_data[2:5]]
+
+
+def warm_menu_cache(venue_slug: str, languages=None) -> list[str]:
+    """
+    Заранее собирает кеш меню заведения на всех языках за один проход:
+    товары, категории, главные кнопки и снапшот загружаются из базы один раз,
+    а затем сериализуются под translation.override() для каждого языка —
+    modeltranslation хранит все переводы в тех же строках.
+    Кладёт данные под те же ключи, что читают вьюхи без дополнительных параметров.
+    Возвращает языки, для которых собран кеш (пусто, если заведение не найдено).
+    """
+    # сериализаторы сами используют menu.services, поэтому импортируем их здесь
+    from menu.api.v2.serializers import CategorySerializer, MainButtonSerializer, ProductSerializer
+
+    objects = load_menu_snapshot_objects(venue_slug)
+    if objects is None:
+        return []
+
+    languages = list(languages or settings.MODELTRANSLATION_LANGUAGES)
+    version = get_menu_version(venue_slug)
+    context = {"request": None}
+    for language in languages:
+        with translation.override(language):
+            products = _in_language_order(objects["products"], objects["venue"])
+            variant = {**objects, "products": products}
+
+            store_menu_data(
+                products_cache_key(venue_slug, language),
+                ProductSerializer(products, many=True, context=context).data,
+            )
+            store_menu_data(
+                categories_cache_key(venue_slug, language),
+                CategorySerializer(objects["categories"], many=True, context=context).data,
+            )
+            store_menu_data(
+                main_buttons_cache_key(venue_slug, language),
+                group_main_buttons(MainButtonSerializer(objects["main_buttons"], many=True, context=context).data),
+            )
+            cache.set(
+                menu_snapshot_key(venue_slug, version, language),
+                render_menu_snapshot(variant, version, context),
+                MENU_SNAPSHOT_TIMEOUT,
+            )
+    return languages
+
+
+def _in_language_order(products, venue) -> list:
+    """
+    Товары сортируются по product_name на активном языке (product_name_<язык>),
+    поэтому порядок берём из базы тем же запросом, что и во вьюхе, но только по id.
+    """
+    by_pk = {product.pk: product for product in products}
+    ordered_ids = Product.objects.filter(venue=venue, hidden=False).values_list("pk", flat=True)
+    return [by_pk[pk] for pk in ordered_ids if pk in by_pk]
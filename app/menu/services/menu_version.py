@@ -0,0 +1,52 @@
+from django.db import transaction
+
+from services.cache_counter import get_counter, incr_counter
+from venues.models import Venue
+
+# Версия — счётчик от текущего времени, поэтому истечение ключа безопасно:
+# новая версия больше прежних. TTL не даёт копиться ключам для мусорных venue_slug.
+MENU_VERSION_TIMEOUT = 60 * 60 * 24 * 30  # 30 дней
+
+
+def menu_version_key(venue_slug: str) -> str:
+    return f"menu_version:{venue_slug.lower()}"
+
+
+def get_menu_version(venue_slug: str) -> int:
+    """Текущая версия меню заведения, входит во все кеш-ключи меню."""
+    return get_counter(menu_version_key(venue_slug), MENU_VERSION_TIMEOUT)
+
+
+def menu_cache_key(prefix: str, venue_slug: str, *parts) -> str:
+    """
+    Кеш-ключ вида prefix:slug:version:parts с текущей версией меню заведения.
+    Сброс кеша — это смена версии, удалять старые ключи не нужно.
+    """
+    version = get_menu_version(venue_slug)
+    return ":".join([prefix, venue_slug.lower(), str(version), *map(str, parts)])
+
+
+def bump_menu_version(venue_slug: str) -> int:
+    """
+    Сбрасывает все кеши меню заведения одним INCR:
+    старые ключи больше не читаются и со временем вытесняются из Redis.
+    """
+    return incr_counter(menu_version_key(venue_slug), MENU_VERSION_TIMEOUT)
+
+
+def invalidate_venue_menu(**venue_lookup) -> None:
+    """
+    Сбрасывает кеш меню заведения после коммита текущей транзакции.
+    Заведение ищется по переданным условиям, например pk=... или products__pk=...
+    """
+    def bump():
+        venue_slug = Venue.objects.filter(**venue_lookup).values_list('slug', flat=True).first()
+        if venue_slug:
+            bump_menu_version(venue_slug)
+
+    transaction.on_commit(bump)
+
+
+def invalidate_menu_slug(venue_slug: str) -> None:
+    """Сбрасывает кеш меню по slug после коммита — когда заведения под этим slug уже может не быть."""
+    transaction.on_commit(lambda: bump_menu_version(venue_slug))
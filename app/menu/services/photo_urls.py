@@ -0,0 +1,119 @@
+from urllib.parse import urljoin
+
+from django.conf import settings
+
+from menu.models import Category, Product, Section
+from menu.services.image_variants import responsive_variants
+from menu.services.menu_version import invalidate_venue_menu
+
+# модель -> (поле оригинала, {вариант: imagekit-спека})
+PHOTO_FIELDS = {
+    Product: ('product_photo', {'small': 'product_photo_small', 'large': 'product_photo_large'}),
+    Category: ('category_photo', {'small': 'category_photo_small'}),
+    Section: ('photo', {'small': 'photo_small'}),
+}
+
+
+def absolute_media_url(url: str) -> str:
+    if url.startswith('http'):
+        return url
+    return urljoin(settings.SITE_URL, url)
+
+
+def is_external_photo(source) -> bool:
+    return str(source).startswith('http')
+
+
+def original_photo_url(instance) -> str | None:
+    source_name, _ = PHOTO_FIELDS[type(instance)]
+    source = getattr(instance, source_name)
+    if not source:
+        return None
+    if is_external_photo(source):
+        return str(source)
+    return absolute_media_url(source.url)
+
+
+def photo_changed(instance) -> bool:
+    """Сменилось ли фото с момента последнего расчёта ссылок."""
+    return original_photo_url(instance) != instance.photo_urls.get('original')
+
+
+def build_photo_urls(instance) -> dict:
+    """
+    Абсолютные ссылки на оригинал фото и все его превью.
+    Для внешних ссылок (фото из POS) превью не делаются — везде отдаём оригинал.
+    """
+    source_name, variants = PHOTO_FIELDS[type(instance)]
+    source = getattr(instance, source_name)
+    original = original_photo_url(instance)
+    if not original:
+        return {}
+
+    if is_external_photo(source):
+        return original_only_photo_urls(instance)
+
+    urls = {'original': original}
+    for variant, spec_name in variants.items():
+        urls[variant] = absolute_media_url(getattr(instance, spec_name).url)
+    urls['images'] = _build_images(instance, source, original, urls['small'])
+    return urls
+
+
+def _build_images(instance, source, original, fallback) -> dict:
+    """
+    Структура для <picture>: sources — готовые srcset по форматам (сначала AVIF, потом WebP),
+    variants — те же файлы списком, fallback — старое JPEG/PNG-превью.
+    """
+    sources = {}
+    variants = []
+    for variant_format, width, height, mime_type, cache_file in responsive_variants(instance, source):
+        url = absolute_media_url(cache_file.url)
+        sources.setdefault(mime_type, []).append(f"{url} {width}w")
+        variants.append({'format': variant_format, 'width': width, 'height': height, 'url': url})
+
+    return {
+        'original': original,
+        'fallback': fallback,
+        'sources': [{'type': mime_type, 'srcset': ", ".join(srcset)} for mime_type, srcset in sources.items()],
+        'variants': variants,
+    }
+
+
+def original_only_photo_urls(instance) -> dict:
+    """Ссылки, для которых не нужно генерировать превью: во всех вариантах — оригинал."""
+    _, variants = PHOTO_FIELDS[type(instance)]
+    original = original_photo_url(instance)
+    if not original:
+        return {}
+    return {
+        'original': original,
+        **{variant: original for variant in variants},
+        'images': {'original': original, 'fallback': original, 'sources': [], 'variants': []},
+    }
+
+
+def get_photo_urls(instance) -> dict:
+    """
+    Сохранённые ссылки — их пишет фоновый пул уже после генерации превью.
+    Запись, которую пул ещё не обработал, отдаёт оригинал вместо превью
+    и ставится в очередь: в запросе гостя картинки не обрабатываются.
+    """
+    if instance.photo_urls:
+        return instance.photo_urls
+
+    urls = original_only_photo_urls(instance)
+    if urls:
+        from menu.services.thumbnails import request_thumbnails  # thumbnails импортирует этот модуль
+        request_thumbnails(instance)
+    return urls
+
+
+def refresh_photo_urls(instance) -> dict:
+    """Пересчитывает ссылки и сохраняет их в строку, если они изменились."""
+    urls = build_photo_urls(instance)
+    if urls != instance.photo_urls:
+        type(instance).objects.filter(pk=instance.pk).update(photo_urls=urls)
+        instance.photo_urls = urls
+        invalidate_venue_menu(pk=instance.venue_id)
+    return urls
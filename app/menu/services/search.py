@@ -0,0 +1,102 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest, Lower
+from django.utils import translation
+
+from menu.models import Product
+from menu.models.product import SEARCH_LANGUAGES
+from menu.services.menu_version import menu_cache_key
+
+SEARCH_CACHE_TIMEOUT = 60 * 10
+SEARCH_SIMILARITY_THRESHOLD = 0.1  # как и раньше в ProductViewSet, по умолчанию в pg_trgm 0.3
+SEARCH_MAX_QUERY_LENGTH = 64
+SEARCH_LIMIT = 200
+
+
+def normalize_search_query(query: str) -> str:
+    """Нижний регистр, без лишних пробелов и знаков — так строка и попадает в кеш-ключ."""
+    query = re.sub(r"[^\w\s-]", " ", query.lower())
+    return " ".join(query.split())[:SEARCH_MAX_QUERY_LENGTH]
+
+
+def search_language() -> str:
+    language = (translation.get_language() or settings.MODELTRANSLATION_DEFAULT_LANGUAGE).split("-")[0]
+    return language if language in SEARCH_LANGUAGES else settings.MODELTRANSLATION_DEFAULT_LANGUAGE
+
+
+def search_product_ids(venue_slug: str, query: str, language: str | None = None) -> list[int]:
+    """
+    id видимых товаров заведения, подходящих под поисковую строку, от лучших к худшим.
+
+    Ищем по Lower(product_name_<язык>) и по основному языку (там, где перевода нет,
+    modeltranslation всё равно покажет русское название): подстрока (LIKE) и
+    триграммная похожесть — оба условия обслуживает GIN-индекс *_trgm_idx.
+    При MENU_SEARCH_FULL_TEXT дополнительно ищем префиксный tsquery по взвешенному
+    tsvector из названия и описания (индекс product_<язык>_search_vector_idx).
+
+    Результат кешируется на (заведение, версия меню, язык, строка).
+    """
+    normalized = normalize_search_query(query)
+    if not normalized:
+        return []
+    language = language or search_language()
+
+    cache_key = menu_cache_key("product_search", venue_slug, language, normalized)
+    product_ids = cache.get(cache_key)
+    if product_ids is None:
+        product_ids = _search(venue_slug, normalized, language)
+        cache.set(cache_key, product_ids, SEARCH_CACHE_TIMEOUT)
+    return product_ids
+
+
+def _search(venue_slug, normalized, language):
+    languages = list(dict.fromkeys([language, settings.MODELTRANSLATION_DEFAULT_LANGUAGE]))
+
+    qs = Product.objects.filter(venue__slug__iexact=venue_slug, hidden=False)
+    condition = Q()
+    similarities = []
+    for lang in languages:
+        name = f"name_{lang}"
+        # выражения совпадают с индексами в Product.Meta, иначе Postgres их не возьмёт
+        qs = qs.annotate(**{name: Lower(f"product_name_{lang}")})
+        condition |= Q(**{f"{name}__contains": normalized}) | Q(**{f"{name}__trigram_similar": normalized})
+        similarities.append(TrigramSimilarity(name, normalized))
+
+    rank = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+
+    if settings.MENU_SEARCH_FULL_TEXT:
+        search_query = _prefix_search_query(normalized)
+        if search_query is not None:
+            qs = qs.annotate(search_vector=(
+                SearchVector(f"product_name_{language}", weight="A", config="simple")
+                + SearchVector(f"product_description_{language}", weight="B", config="simple")
+            ))
+            condition |= Q(search_vector=search_query)
+            rank = rank + SearchRank(F("search_vector"), search_query)
+
+    qs = (
+        qs.filter(condition)
+        .annotate(rank=rank)
+        .order_by("-rank", "pk")
+        .values_list("pk", flat=True)[:SEARCH_LIMIT]
+    )
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # порог оператора % действует только до конца транзакции
+            cursor.execute("SET LOCAL pg_trgm.similarity_threshold = %s", [SEARCH_SIMILARITY_THRESHOLD])
+        return list(qs)
+
+
+def _prefix_search_query(normalized):
+    # "капучино сир" -> 'капучино':* & 'сир':*, каждое слово как префикс для подсказок
+    words = [word for word in re.split(r"[\s-]+", normalized) if word]
+    if not words:
+        return None
+    raw = " & ".join(f"'{word}':*" for word in words)
+    return SearchQuery(raw, search_type="raw", config="simple")
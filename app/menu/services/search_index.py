@@ -0,0 +1,112 @@
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+
+from django.conf import settings
+from unidecode import unidecode
+
+from menu.models import Product
+from menu.models.product import SEARCH_LANGUAGES
+from menu.services.menu_version import get_menu_version
+from menu.services.search import SEARCH_LIMIT, SEARCH_SIMILARITY_THRESHOLD, normalize_search_query
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def search_key(text: str) -> str:
+    """Транслитерация как у слагов (unidecode), нижний регистр: «Капучино» и «kapuchino» совпадут."""
+    return " ".join(_WORD_RE.findall(unidecode(text or "").lower()))
+
+
+def trigrams(text: str) -> set[str]:
+    """Триграммы слов так же, как их считает pg_trgm: два пробела в начале слова и один в конце."""
+    result = set()
+    for word in text.split():
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class VenueSearchIndex:
+    """
+    Индекс поиска по товарам одного заведения: названия на всех языках,
+    транслитерированные в латиницу, и обратный индекс триграмма -> товары.
+    """
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.entries = []  # (id товара, транслитерированное название, число его триграмм)
+        self.postings = defaultdict(list)  # триграмма -> номера в entries
+
+        for pk, *names in rows:
+            for key in dict.fromkeys(key for key in map(search_key, names) if key):
+                grams = trigrams(key)
+                for gram in grams:
+                    self.postings[gram].append(len(self.entries))
+                self.entries.append((pk, key, len(grams)))
+
+    @classmethod
+    def build(cls, venue_slug, version):
+        rows = (
+            Product.objects
+            .filter(venue__slug__iexact=venue_slug, hidden=False)
+            .values_list("pk", *[f"product_name_{lang}" for lang in SEARCH_LANGUAGES])
+        )
+        return cls(version, rows)
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list[int]:
+        """
+        id товаров от лучших к худшим. Как и в Postgres-поиске, подходят товары,
+        название которых содержит строку или похоже на неё по триграммам
+        (similarity = общие / (триграммы строки + триграммы названия - общие)).
+        """
+        key = search_key(normalize_search_query(query))
+        if not key:
+            return []
+        query_trigrams = trigrams(key)
+
+        shared = Counter()
+        for gram in query_trigrams:
+            shared.update(self.postings.get(gram, ()))
+
+        scores = {}
+        for entry, common in shared.items():
+            pk, name, name_trigrams = self.entries[entry]
+            similarity = common / (len(query_trigrams) + name_trigrams - common)
+            if similarity > SEARCH_SIMILARITY_THRESHOLD or key in name:
+                scores[pk] = max(scores.get(pk, 0), similarity)
+
+        return sorted(scores, key=lambda pk: (-scores[pk], pk))[:limit]
+
+
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_venue_search_index(venue_slug: str) -> VenueSearchIndex:
+    """
+    Индекс заведения из LRU процесса (не больше MENU_SEARCH_INDEX_SIZE заведений).
+    Пересобирается, когда меняется версия меню, то есть после любых правок товаров.
+    """
+    venue_slug = venue_slug.lower()
+    version = get_menu_version(venue_slug)
+
+    with _lock:
+        index = _indexes.get(venue_slug)
+        if index is not None and index.version == version:
+            _indexes.move_to_end(venue_slug)
+            return index
+
+    # собираем вне лока, чтобы не держать поиск по остальным заведениям
+    index = VenueSearchIndex.build(venue_slug, version)
+
+    with _lock:
+        _indexes[venue_slug] = index
+        _indexes.move_to_end(venue_slug)
+        while len(_indexes) > settings.MENU_SEARCH_INDEX_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def search_product_ids_in_memory(venue_slug: str, query: str) -> list[int]:
+    return get_venue_search_index(venue_slug).search(query)
@@ -0,0 +1,120 @@
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.utils import timezone
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+
+from menu.models import Category, MainButton, Modificator, Product, Section
+from venues.models import Venue, Spot
+
+MENU_SNAPSHOT_TIMEOUT = 60 * 60 * 24  # сутки, при изменениях меню меняется версия в ключе
+
+
+def menu_snapshot_key(venue_slug: str, version: int, language: str) -> str:
+    return f"menu_snapshot:{venue_slug.lower()}:{version}:{language}"
+
+
+def load_menu_snapshot_objects(venue_slug: str) -> dict | None:
+    """
+    Загружает из базы всё, что входит в снапшот меню, уже вычисленными списками:
+    по ним можно отрендерить снапшот на нескольких языках без повторных запросов.
+    Возвращает None, если заведение не найдено.
+    """
+    venue = (
+        Venue.objects
+        .prefetch_related(
+            Prefetch("spots", queryset=Spot.objects.filter(is_hidden=False)),
+            "schedules",
+        )
+        .filter(slug=venue_slug.lower())
+        .first()
+    )
+    if not venue:
+        return None
+
+    main_buttons = (
+        MainButton.objects
+        .filter(venue=venue)
+        .select_related("section", "category")
+        .prefetch_related(
+            "category__sections",
+            # MainButtonSerializer отдаёт категории раздела вместе с их разделами
+            Prefetch(
+                "section__categories",
+                queryset=Category.objects.order_by("sort_order").prefetch_related("sections"),
+            ),
+        )
+        .order_by("order")
+    )
+    sections = Section.objects.filter(venue=venue).prefetch_related("categories")
+    categories = (
+        Category.objects
+        .filter(venue=venue, category_hidden=False)
+        .prefetch_related("sections")
+        .order_by("sort_order")
+    )
+    products = (
+        Product.objects
+        .filter(venue=venue, hidden=False)
+        .prefetch_related(
+            "categories",
+            Prefetch("modificators", queryset=Modificator.objects.filter(is_hidden=False)),
+            "product_attributes",
+            "spots",
+        )
+    )
+
+    return {
+        "venue": venue,
+        "main_buttons": list(main_buttons),
+        "sections": list(sections),
+        "categories": list(categories),
+        "products": list(products),
+    }
+
+
+def render_menu_snapshot(objects: dict, version: int, context: dict) -> bytes:
+    """Рендерит снапшот из load_menu_snapshot_objects() на активном языке."""
+    # сериализаторы сами используют menu.services, поэтому импортируем их здесь
+    from menu.api.v2.serializers import (
+        CategorySerializer, MainButtonSerializer, SnapshotProductSerializer, SnapshotSectionSerializer
+    )
+    from venues.api.v2.serializers import VenueSerializer
+
+    buttons_data = MainButtonSerializer(objects["main_buttons"], many=True, context=context).data
+
+    snapshot = {
+        "version": version,
+        "generated_at": timezone.now().isoformat(),
+        "venue": VenueSerializer(objects["venue"], context=context).data,
+        # та же группировка, что и в MainButtonsAPIView (2 + 3)
+        "main_buttons": [buttons_data[:2], buttons_data[2:5]],
+        "sections": SnapshotSectionSerializer(objects["sections"], many=True, context=context).data,
+        "categories": CategorySerializer(objects["categories"], many=True, context=context).data,
+        "products": SnapshotProductSerializer(objects["products"], many=True, context=context).data,
+    }
+
+    return CamelCaseJSONRenderer().render(snapshot)
+
+
+def build_menu_snapshot(venue_slug: str, version: int, request, language: str) -> bytes | None:
+    """
+    Собирает всё меню заведения (заведение, точки, график, главные кнопки,
+    разделы, категории, товары с модификаторами и атрибутами) в один
+    JSON-документ на активном языке и кладёт его в кеш уже отрендеренным.
+    Возвращает готовые байты или None, если заведение не найдено.
+    """
+    objects = load_menu_snapshot_objects(venue_slug)
+    if objects is None:
+        return None
+
+    content = render_menu_snapshot(objects, version, {"request": request})
+    cache.set(menu_snapshot_key(venue_slug, version, language), content, MENU_SNAPSHOT_TIMEOUT)
+    return content
+
+
+def get_menu_snapshot(venue_slug: str, version: int, request, language: str) -> bytes | None:
+    """Отдаёт снапшот указанной версии и языка из кеша, при промахе собирает его заново."""
+    content = cache.get(menu_snapshot_key(venue_slug, version, language))
+    if content is None:
+        content = build_menu_snapshot(venue_slug, version, request, language)
+    return content
@@ -0,0 +1,81 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from menu.services.image_variants import responsive_variants
+from menu.services.photo_urls import PHOTO_FIELDS, is_external_photo, refresh_photo_urls
+
+logger = logging.getLogger(__name__)
+
+THUMBNAILS_QUEUED_TIMEOUT = 60 * 10  # повторно ставим запись в очередь не чаще, чем раз в 10 минут
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix="thumbnails",
+            )
+    return _executor
+
+
+def generate_thumbnails(model, pk, force=False) -> bool:
+    """
+    Генерирует все превью фото записи и сохраняет готовые ссылки.
+    Возвращает False, если запись уже удалена.
+    """
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return False
+
+    source_name, variants = PHOTO_FIELDS[model]
+    source = getattr(instance, source_name)
+    if source and not is_external_photo(source):
+        cache_files = [getattr(instance, spec_name) for spec_name in variants.values()]
+        cache_files += [cache_file for *_, cache_file in responsive_variants(instance, source)]
+        for cache_file in cache_files:
+            _generate(cache_file, force)
+
+    refresh_photo_urls(instance)
+    return True
+
+
+def _generate(cache_file, force):
+    if force:
+        # FileSystemStorage не перезаписывает файлы, поэтому старое превью удаляем сами
+        cache_file.storage.delete(cache_file.name)
+    cache_file.generate(force=force)
+
+
+def _run_job(model, pk, force):
+    try:
+        generate_thumbnails(model, pk, force)
+    except Exception:
+        logger.exception(f"Failed to generate thumbnails for {model.__name__} {pk}")
+    finally:
+        connection.close()
+
+
+def enqueue_thumbnails(instance, force=False) -> None:
+    """Ставит генерацию превью в фоновый пул после коммита транзакции."""
+    model, pk = type(instance), instance.pk
+    transaction.on_commit(lambda: _get_executor().submit(_run_job, model, pk, force))
+
+
+def request_thumbnails(instance) -> None:
+    """
+    Ставит в очередь запись без сохранённых ссылок, найденную при чтении меню.
+    Одна запись попадает в пул один раз, сколько бы запросов её ни прочитали.
+    """
+    key = f"thumbnails_queued:{instance._meta.label_lower}:{instance.pk}"
+    if cache.add(key, 1, THUMBNAILS_QUEUED_TIMEOUT):
+        enqueue_thumbnails(instance)
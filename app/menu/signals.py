@@ -0,0 +1,52 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from menu.models import Category, MainButton, Modificator, Product, ProductAttribute, Section
+from menu.services import enqueue_thumbnails, invalidate_venue_menu, photo_changed
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Section)
+@receiver([post_save, post_delete], sender=MainButton)
+def invalidate_menu_on_change(sender, instance, **kwargs):
+    invalidate_venue_menu(pk=instance.venue_id)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Section)
+def enqueue_thumbnails_on_save(sender, instance, raw=False, **kwargs):
+    # превью и ссылки считаются в фоне, до этого отдаются ссылки на прежнее фото
+    if not raw and photo_changed(instance):
+        enqueue_thumbnails(instance)
+
+
+@receiver(post_save, sender=Modificator)
+@receiver(post_save, sender=ProductAttribute)
+def invalidate_menu_on_product_part_change(sender, instance, **kwargs):
+    invalidate_venue_menu(products__pk=instance.product_id)
+
+
+@receiver(pre_delete, sender=Modificator)
+@receiver(pre_delete, sender=ProductAttribute)
+def remember_product_part_venue(sender, instance, **kwargs):
+    # при каскадном удалении товара после коммита его уже не найти по products__pk,
+    # поэтому заведение запоминаем, пока товар ещё в базе
+    instance._menu_venue_id = instance.product.venue_id
+
+
+@receiver(post_delete, sender=Modificator)
+@receiver(post_delete, sender=ProductAttribute)
+def invalidate_menu_on_product_part_delete(sender, instance, **kwargs):
+    invalidate_venue_menu(pk=instance._menu_venue_id)
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+@receiver(m2m_changed, sender=Product.spots.through)
+@receiver(m2m_changed, sender=Section.categories.through)
+def invalidate_menu_on_m2m_change(sender, instance, action, **kwargs):
+    # instance — объект с той стороны связи, с которой её меняли
+    # (товар, категория, раздел или точка), у всех есть venue_id
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_venue_menu(pk=instance.venue_id)
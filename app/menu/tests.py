@@ -1,3 +1,96 @@
-from django.test import TestCase
+import time
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from menu.models import Category, MainButton, Modificator, Product, Section
+from menu.services import menu_cache_key
+from venues.models import Venue
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    SECURE_SSL_REDIRECT=False,
+)
+class MenuCacheBackgroundRebuildTests(TransactionTestCase):
+    """
+    Фоновая пересборка (stale-while-revalidate) идёт в отдельном потоке —
+    данные в ключе языка должны собираться на этом же языке.
+    TransactionTestCase: поток читает базу своим соединением.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.venue = Venue.objects.create(company_name='Cafe', slug='rebuild-cafe')
+        Product.objects.create(
+            venue=self.venue, product_name='Блюдо', product_name_en='Dish', product_name_ky='Тамак', product_price=100
+        )
+
+    def product_names(self, language):
+        response = self.client.get('/api/v2/products/?venue_slug=rebuild-cafe', HTTP_ACCEPT_LANGUAGE=language)
+        self.assertEqual(response.status_code, 200)
+        return [product['productName'] for product in response.json()]
+
+    def expire_and_rebuild(self, language):
+        cache_key = menu_cache_key('products', 'rebuild-cafe', language, '')
+        entry = cache.get(cache_key)
+        entry['refresh_at'] = 0
+        cache.set(cache_key, entry)
+
+        self.product_names(language)  # отдаёт старое значение и запускает пересборку
+        deadline = time.monotonic() + 5
+        while cache.get(f'{cache_key}:lock') and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertGreater(cache.get(cache_key)['refresh_at'], time.time())
+
+    def test_rebuild_keeps_request_language(self):
+        for language, name in (('ru', 'Блюдо'), ('en', 'Dish'), ('ky', 'Тамак')):
+            with self.subTest(language=language):
+                self.assertEqual(self.product_names(language), [name])
+                self.expire_and_rebuild(language)
+                self.assertEqual(self.product_names(language), [name])
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    SECURE_SSL_REDIRECT=False,
+)
+class MenuSnapshotQueryCountTests(TestCase):
+    """Снапшот собирается фиксированным числом запросов, сколько бы в меню ни было кнопок и товаров."""
+
+    # заведение, точки, график; кнопки и 3 prefetch; разделы + 1; категории + 1; товары + 4
+    SNAPSHOT_QUERIES = 16
+
+    def setUp(self):
+        cache.clear()
+
+    def create_menu(self, slug, size):
+        venue = Venue.objects.create(company_name=slug, slug=slug)
+        for order in range(1, size + 1):
+            section = Section.objects.create(venue=venue, name=f'Раздел {order}')
+            categories = [
+                Category.objects.create(venue=venue, category_name=f'Категория {order}.{i}', sort_order=i)
+                for i in range(size)
+            ]
+            section.categories.set(categories)
+            if order % 2:
+                MainButton.objects.create(venue=venue, button_type='section', section=section, order=order)
+            else:
+                MainButton.objects.create(venue=venue, button_type='category', category=categories[0], order=order)
+            for category in categories:
+                product = Product.objects.create(venue=venue, product_name=f'Блюдо {category.pk}', product_price=100)
+                product.categories.add(category)
+                Modificator.objects.create(product=product, name='Большой', price=10)
+        return venue
+
+    def snapshot(self, slug):
+        response = self.client.get(f'/api/v2/menu-snapshot/?venue_slug={slug}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_query_count_does_not_grow_with_menu(self):
+        for slug, size in (('small-cafe', 2), ('large-cafe', 5)):
+            self.create_menu(slug, size)
+            with self.subTest(size=size), self.assertNumQueries(self.SNAPSHOT_QUERIES):
+                snapshot = self.snapshot(slug)
+            self.assertEqual(len(snapshot['products']), size * size)
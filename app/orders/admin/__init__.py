@@ -4,4 +4,5 @@ from .receipt_printer import *
 from .receipt import *
 from .transaction import *
 from .payment_account import *
-from .bonus_history import *
\ No newline at end of file
+from .bonus_history import *
+from .order_job import *
\ No newline at end of file
@@ -0,0 +1,36 @@
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from services.admin import BaseModelAdmin
+from ..models import OrderJob
+
+
+@admin.register(OrderJob)
+class OrderJobAdmin(BaseModelAdmin):
+    list_display = (
+        "id", "order", "step", "status", "attempts", "duration_ms", "run_after", "finished_at", "detail_link"
+    )
+    list_filter = ("status", "step")
+    list_filter_submit = True
+    list_select_related = ("order",)
+    search_fields = ("idempotency_key", "order__id", "order__phone")
+    date_hierarchy = "created_at"
+    readonly_fields = [field.name for field in OrderJob._meta.fields]
+    actions = ("retry_jobs",)
+
+    def has_module_permission(self, request):
+        return request.user.is_superuser
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Повторить выбранные задачи")
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status=OrderJob.Status.DONE).update(
+            status=OrderJob.Status.PENDING,
+            attempts=0,
+            run_after=timezone.now(),
+            locked_until=None,
+            finished_at=None,
+        )
+        self.message_user(request, f"В очередь возвращено задач: {updated}", messages.SUCCESS)
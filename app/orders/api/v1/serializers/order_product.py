@@ -3,13 +3,25 @@ from rest_framework import serializers
 from config.settings import MEDIA_URL
 from menu.models import Product
 from orders.models import OrderProduct
+from orders.services import resolve_order_items
+
+
+class OrderProductCreateListSerializer(serializers.ListSerializer):
+    """Товары и модификаторы всей корзины достаются разом, а не по запросу на позицию."""
+
+    def to_internal_value(self, data):
+        return resolve_order_items(super().to_internal_value(data))
 
 
 class OrderProductCreateSerializer(serializers.ModelSerializer):
+    # id проверяются в OrderProductCreateListSerializer, там же подставляются объекты
+    product = serializers.IntegerField()
+    modificator = serializers.IntegerField(required=False, allow_null=True)
 
     class Meta:
         model = OrderProduct
         fields = ('product', 'count', 'modificator')
+        list_serializer_class = OrderProductCreateListSerializer
 
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -11,8 +11,9 @@ from rest_framework.response import Response
 from account.models import PhoneVerification
 from account.services import send_sms
 from venues.models import Venue
-from orders.models import Order, OrderStatus
+from orders.models import Order
 from orders.api.v1.serializers import OrderListSerializer, OrderCreateSerializer
+from orders.services import filter_order_history
 from orders.services.order import is_within_schedule
 
 logger = logging.getLogger(__name__)
@@ -83,21 +84,13 @@ class OrderViewSet(viewsets.GenericViewSet,
         table_id = self.request.GET.get('table_id', None)
         phone = self.request.GET.get('phone', None)
 
-        if venue_slug:
-            queryset = queryset.filter(venue__slug=venue_slug.lower())
-        if spot_id:
-            queryset = queryset.filter(spot__id=spot_id)
-        if table_id:
-            queryset = queryset.filter(table__id=table_id)
-        if phone:
-            queryset = queryset.filter(phone=phone)
-
         start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
         end = start + timezone.timedelta(days=1)
 
-        queryset = queryset.filter(created_at__gte=start, created_at__lt=end)
-
-        queryset = queryset.exclude(status=OrderStatus.WAITING_FOR_PAYMENT)
+        queryset = filter_order_history(
+            queryset, start, end,
+            venue_slug=venue_slug, spot_id=spot_id, table_id=table_id, phone=phone,
+        )
 
         return queryset.prefetch_related(
             'order_products',
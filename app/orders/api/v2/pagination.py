@@ -0,0 +1,135 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from datetime import datetime
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class OrderPagination(LimitOffsetPagination):
+    """
+    Пагинация для заказов — по умолчанию 20 элементов на странице,
+    можно регулировать через параметры limit / offset.
+    """
+    default_limit = 20
+    max_limit = 100
+
+
+class OrderKeysetPagination(BasePagination):
+    """
+    Курсорная пагинация заказов по (created_at, id), от новых к старым.
+    Страница — это WHERE по курсору + LIMIT, без COUNT(*) и OFFSET:
+    глубокие страницы истории читаются по индексу так же быстро, как первая.
+    Курсор следующей страницы приходит в поле next, размер страницы — limit.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by('-created_at', '-id')
+        cursor = self.decode_cursor(request)
+        if cursor:
+            created_at, pk = cursor
+            # created_at <= курсора — диапазон по индексу, равные по времени добираем по id
+            queryset = queryset.filter(created_at__lte=created_at).exclude(created_at=created_at, id__gte=pk)
+
+        page = list(queryset[:page_size + 1])
+        self.next_position = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_position = (page[-1].created_at, page[-1].pk)
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            return datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        created_at, pk = position
+        return b64encode(f'{created_at.isoformat()}|{pk}'.encode('ascii')).decode('ascii')
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор страницы из поля next',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Количество заказов на странице',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+# Выбор пагинации списка заказов параметром запроса:
+# ?pagination=cursor — курсорная по (created_at, id), иначе limit/offset.
+# (комментарий, а не docstring — иначе он попадёт в описание вьюх в схеме API)
+class OrderPaginationMixin:
+    pagination_class = OrderPagination
+    keyset_pagination_class = OrderKeysetPagination
+    pagination_query_param = 'pagination'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get(self.pagination_query_param) == 'cursor':
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
@@ -1,16 +1,15 @@
-from decimal import Decimal, ROUND_HALF_UP
-
-from django.db import transaction
+from django.conf import settings
 from rest_framework import serializers
 
 from ..serializers import OrderProductCreateSerializer, OrderProductSerializer
-from orders.models import Order, OrderProduct, Transaction, PaymentAccount, ServiceMode, BonusHistory
-from orders.services import generate_payment_link
+from orders.models import Order
+from orders.services import create_order, enqueue_payment_link, generate_payment_link, payment_link_token
 
 
 class OrderCreateSerializer(serializers.ModelSerializer):
     order_products = OrderProductCreateSerializer(many=True, write_only=True)
     payment_url = serializers.SerializerMethodField(read_only=True)
+    payment_token = serializers.SerializerMethodField(read_only=True)
 
     code = serializers.CharField(write_only=True, required=False, allow_blank=True, allow_null=True)
     hash = serializers.CharField(write_only=True, required=False, allow_blank=True, allow_null=True)
@@ -23,101 +22,38 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             'id', 'phone', 'comment', 'service_mode', 'address',
             'service_price', 'tips_price', 'bonus', 'spot', 'table',
             'is_tg_bot', 'tg_redirect_url', 'order_products',
-            'payment_url', 'code', 'hash', 'phone_verification_hash', 'use_bonus'
+            'payment_url', 'payment_token', 'code', 'hash', 'phone_verification_hash', 'use_bonus'
         )
         extra_kwargs = {
             f: {'write_only': True}
-            for f in fields if f not in ('id', 'payment_url', 'phone_verification_hash')
+            for f in fields if f not in ('id', 'payment_url', 'payment_token', 'phone_verification_hash')
         }
 
     def create(self, validated_data):
         order_product_data = validated_data.pop('order_products', [])
-        bonus = validated_data.get("bonus", 0) or 0
         validated_data.pop("code", None)
         validated_data.pop("use_bonus", None)
         validated_data.pop("hash", None)
 
-        with transaction.atomic():
-            # --- создаём заказ ---
-            order = Order.objects.create(**validated_data)
-            products_total_price = Decimal('0.00')
-
-            for item in order_product_data:
-                product = item['product']
-                modificator = item.get('modificator')
-                count = item['count']
-
-                price = Decimal(modificator.price) if modificator else Decimal(product.product_price)
-                total_price = (price * count).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-
-                OrderProduct.objects.create(
-                    order=order,
-                    product=product,
-                    modificator=modificator,
-                    count=count,
-                    price=price,
-                    total_price=total_price
-                )
-                products_total_price += total_price
-
-            # 🔹 сервисный сбор (берём по режиму)
-            if order.service_mode == ServiceMode.DELIVERY:
-                service_fee_percent = order.venue.delivery_service_fee_percent
-            elif order.service_mode == ServiceMode.PICKUP:
-                service_fee_percent = order.venue.takeout_service_fee_percent
-            elif order.service_mode == ServiceMode.ON_SITE:
-                service_fee_percent = order.venue.dinein_service_fee_percent
-            else:
-                service_fee_percent = 0
-
-            service_fee_percent = Decimal(service_fee_percent or 0)
-            service_price = (products_total_price * service_fee_percent / Decimal('100')).quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            )
-
-            # 🔹 доставка (только если режим = доставка)
-            delivery_price = Decimal('0.00')
-            if order.service_mode == ServiceMode.DELIVERY:
-                delivery_fixed_fee = order.venue.delivery_fixed_fee or Decimal('0.00')
-                delivery_free_from = order.venue.delivery_free_from
-                delivery_price = (
-                    Decimal('0.00')
-                    if delivery_free_from and products_total_price >= delivery_free_from
-                    else delivery_fixed_fee
-                )
-
-            # 🔹 итоговая сумма
-            total_price = (products_total_price + service_price + delivery_price).quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            )
-
-            # 🔹 бонусы
-            if bonus:
-                applied_bonus = min(bonus, total_price)
-                total_price = (total_price - applied_bonus).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-                order.bonus = applied_bonus
-
-            # сохраняем все цены
-            order.delivery_price = delivery_price
-            order.service_price = service_price
-            order.total_price = total_price
-            order.save()
-
-            # создаём транзакцию и платежный аккаунт
-            transaction_obj = Transaction.objects.create(order=order, total_price=total_price)
-            payment_account = PaymentAccount.objects.filter(venue=order.venue).first()
-
-            self.context['transaction'] = transaction_obj
-            self.context['payment_account'] = payment_account
+        order, transaction_obj, payment_account = create_order(validated_data, order_product_data)
+        self.context['transaction'] = transaction_obj
+        self.context['payment_account'] = payment_account
 
         return order
 
     def get_payment_url(self, obj):
         transaction_obj = self.context.get('transaction')
         payment_account = self.context.get('payment_account')
-        if transaction_obj:
-            return generate_payment_link(transaction_obj, obj, payment_account)
-        return None
+        if not transaction_obj:
+            return None
+        if settings.PAYMENT_LINK_DEFERRED:
+            # ссылка придёт в OrderStatusConsumer или через orders/{id}/payment-link/
+            enqueue_payment_link(transaction_obj, obj, payment_account)
+            return None
+        return generate_payment_link(transaction_obj, obj, payment_account)
+
+    def get_payment_token(self, obj) -> str:
+        return payment_link_token(obj.id)
 
 
 class OrderListSerializer(serializers.ModelSerializer):
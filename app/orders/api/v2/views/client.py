@@ -1,12 +1,18 @@
+from django.http import Http404
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
+from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, viewsets, mixins
 from phonenumber_field.phonenumber import to_python
 
+from config.permissions import IsVenueStaff
 from venues.models import Venue
-from orders.models import Client, ClientVenueProfile
+from orders.models import Client, ClientVenueProfile, Order, OrderStatus
+from orders.api.v2.pagination import OrderPaginationMixin
+from orders.api.v1.serializers import OrderListSerializer
 from orders.api.v2.serializers import ClientBonusSerializer, ClientSerializer
+from orders.services import resolve_venue_id
 
 
 @extend_schema(tags=['Client'])
@@ -91,7 +97,8 @@ class ClientBonusAPIView(APIView):
 
 
 @extend_schema(tags=['Client'])
-class ClientViewSet(viewsets.GenericViewSet,
+class ClientViewSet(OrderPaginationMixin,
+                    viewsets.GenericViewSet,
                     mixins.RetrieveModelMixin,
                     mixins.UpdateModelMixin,):
     queryset = Client.objects.all()
@@ -102,3 +109,57 @@ class ClientViewSet(viewsets.GenericViewSet,
         """Переопределяем поиск объекта по номеру телефона."""
         phone_number = self.kwargs.get(self.lookup_field)
         return Client.objects.get(phone_number=phone_number)
+
+    @extend_schema(
+        summary="История заказов клиента",
+        description='Только для персонала: владелец и администратор видят заказы клиента '
+                    'в своём заведении, суперпользователь — во всех или в заданном venue_slug.',
+        parameters=[
+            OpenApiParameter(
+                name='venue_slug',
+                description='Только заказы в этом заведении',
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name='pagination',
+                description='cursor — курсорная пагинация по (created_at, id) без подсчёта количества, '
+                            'по умолчанию limit/offset',
+                required=False,
+                type=str,
+            ),
+        ],
+        responses=OrderListSerializer(many=True),
+    )
+    @action(
+        detail=True,
+        methods=['get'],
+        url_path='orders',
+        serializer_class=OrderListSerializer,
+        permission_classes=[IsVenueStaff],
+    )
+    def orders(self, request, phone_number=None):
+        client_id = Client.objects.filter(phone_number=phone_number).values_list('id', flat=True).first()
+        if client_id is None:
+            raise Http404
+
+        queryset = Order.objects.filter(client_id=client_id).exclude(status=OrderStatus.WAITING_FOR_PAYMENT)
+        venue_slug = request.query_params.get('venue_slug')
+        if request.user.is_superuser:
+            if venue_slug:
+                venue_id = resolve_venue_id(venue_slug)
+                queryset = queryset.filter(venue_id=venue_id) if venue_id else queryset.none()
+        elif venue_slug and resolve_venue_id(venue_slug) != request.user.venue_id:
+            queryset = queryset.none()
+        else:
+            # персонал видит историю клиента только в своём заведении
+            queryset = queryset.filter(venue_id=request.user.venue_id)
+
+        page = self.paginate_queryset(queryset.prefetch_related(
+            'order_products',
+            'order_products__product',
+            'order_products__product__modificators',
+            'order_products__product__categories',
+        ))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
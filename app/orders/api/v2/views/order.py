@@ -2,32 +2,26 @@ import logging
 import random
 from datetime import timedelta, datetime
 
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from rest_framework import viewsets, mixins, status
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from account.models import PhoneVerification
 from account.services import send_sms
 from venues.models import Venue
-from orders.models import Order, OrderStatus
+from orders.models import Order, OrderStatus, PaymentAccount
 from orders.api.v1.serializers import OrderListSerializer, OrderCreateSerializer
+from orders.api.v2.pagination import OrderPaginationMixin
+from orders.services import check_payment_link_token, enqueue_payment_link, filter_order_history
 from orders.services.order import is_within_schedule
 
 logger = logging.getLogger(__name__)
 
 
-class OrderPagination(LimitOffsetPagination):
-    """
-    Пагинация для заказов — по умолчанию 20 элементов на странице,
-    можно регулировать через параметры limit / offset.
-    """
-    default_limit = 20
-    max_limit = 100
-
-
 @extend_schema(
     tags=['Order'],
 )
@@ -73,17 +67,24 @@ class OrderPagination(LimitOffsetPagination):
                 description='Конечная дата фильтрации (формат YYYY-MM-DD)',
                 required=False,
                 type=str,
-            )
+            ),
+            OpenApiParameter(
+                name='pagination',
+                description='cursor — курсорная пагинация по (created_at, id) без подсчёта количества, '
+                            'по умолчанию limit/offset',
+                required=False,
+                type=str,
+            ),
         ]
     )
 )
-class OrderViewSet(viewsets.GenericViewSet,
+class OrderViewSet(OrderPaginationMixin,
+                   viewsets.GenericViewSet,
                    mixins.ListModelMixin,
                    mixins.RetrieveModelMixin,
                    mixins.CreateModelMixin):
     queryset = Order.objects.all()
     filter_backends = [DjangoFilterBackend]
-    pagination_class = OrderPagination
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -108,15 +109,6 @@ class OrderViewSet(viewsets.GenericViewSet,
         start_date = self.request.GET.get('start_date')
         end_date = self.request.GET.get('end_date')
 
-        if venue_slug:
-            queryset = queryset.filter(venue__slug=venue_slug.lower())
-        if spot_id:
-            queryset = queryset.filter(spot__id=spot_id)
-        if table_id:
-            queryset = queryset.filter(table__id=table_id)
-        if phone:
-            queryset = queryset.filter(phone=phone)
-
         # --- Фильтрация по дате ---
         # Если даты не заданы, берём текущий день
         now_local = timezone.localtime()
@@ -136,9 +128,10 @@ class OrderViewSet(viewsets.GenericViewSet,
         else:
             end = start + timedelta(days=1)
 
-        queryset = queryset.filter(created_at__gte=start, created_at__lt=end)
-
-        queryset = queryset.exclude(status=OrderStatus.WAITING_FOR_PAYMENT)
+        queryset = filter_order_history(
+            queryset, start, end,
+            venue_slug=venue_slug, spot_id=spot_id, table_id=table_id, phone=phone,
+        )
 
         return queryset.prefetch_related(
             'order_products',
@@ -248,3 +241,42 @@ class OrderViewSet(viewsets.GenericViewSet,
             data["phone_verification_hash"] = phone_verification_hash
 
         return Response(data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        summary='Ссылка на оплату заказа',
+        description='Для режима PAYMENT_LINK_DEFERRED: пока ссылка готовится, отвечает 202 со status=pending. '
+                    'Нужен token — paymentToken из ответа на создание заказа. '
+                    'Работает только для заказов, ожидающих оплату.',
+        parameters=[
+            OpenApiParameter(
+                name='token',
+                description='paymentToken из ответа на создание заказа',
+                required=True,
+                type=str,
+            ),
+        ],
+    )
+    @action(detail=True, methods=['get'], url_path='payment-link')
+    def payment_link(self, request, pk=None):
+        # без верного токена заказ «не найден», чтобы id нельзя было перебрать
+        if not check_payment_link_token(pk, request.query_params.get('token')):
+            return Response({'error': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        order = get_object_or_404(Order.objects.select_related('venue'), pk=pk)
+        transaction_obj = order.transactions.order_by('-created_at').first()
+        if not transaction_obj:
+            return Response({'error': 'Transaction not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        if order.status != OrderStatus.WAITING_FOR_PAYMENT:
+            return Response({'error': 'Order is not awaiting payment.'}, status=status.HTTP_409_CONFLICT)
+
+        if transaction_obj.payment_url:
+            return Response({'status': 'ready', 'payment_url': transaction_obj.payment_url})
+
+        payment_account = PaymentAccount.objects.filter(venue_id=order.venue_id).first()
+        if not payment_account:
+            return Response({'error': 'Payment account not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        # прошлый запрос не дал ссылку — запускаем заново, если он сейчас не идёт
+        enqueue_payment_link(transaction_obj, order, payment_account)
+        return Response({'status': 'pending', 'payment_url': None}, status=status.HTTP_202_ACCEPTED)
@@ -3,14 +3,16 @@ import logging
 
 from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.db import transaction
 from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets, mixins, status
 from rest_framework.response import Response
 
-from orders.models import Order
+from orders.models import Order, WebhookEvent
 from orders.api.v2.serializers.webhook import PosterWebhookSerializer
-from orders.services import notify_order_status
+from orders.services import notify_order_status, poster_event_key, record_webhook_event, webhook_event_seen
 from services.pos_service_factory import POSServiceFactory
+from services.poster import POSTER_REFERENCE_OBJECTS, invalidate_poster_cache
 from venues.models import Venue
 
 logger = logging.getLogger(__name__)
@@ -36,8 +38,18 @@ class PosterWebhookViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
 
         logger.info(f"Webhook data verified successfully: {post_data}")
 
+        event_key = poster_event_key(post_data)
+        if webhook_event_seen(WebhookEvent.Source.POSTER, event_key):
+            logger.info(f"Webhook {event_key} already processed")
+            return Response({"status": "accepted"}, status=status.HTTP_200_OK)
+
         try:
-            self._process_webhook(post_data)
+            # запрос в Poster — до транзакции, чтобы не держать журнал на время HTTP;
+            # событие попадает в журнал только вместе с успешной обработкой
+            venue, order, pos_response = self._fetch_webhook_data(post_data)
+            with transaction.atomic():
+                if record_webhook_event(WebhookEvent.Source.POSTER, event_key):
+                    self._process_webhook(venue, post_data, order, pos_response)
         except Exception as e:
             logger.error(f"Error processing webhook: {str(e)}")
             return Response({"error": "Processing failed"}, status=status.HTTP_200_OK)
@@ -62,18 +74,35 @@ class PosterWebhookViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
 
         return verify_hash == verify_original
 
-    def _process_webhook(self, post_data):
-        """ Обрабатывает валидные данные webhook. """
+    def _fetch_webhook_data(self, post_data):
+        """ Заведение, заказ и его данные из POS-системы — всё, что нужно обработке. """
         venue = Venue.objects.filter(account_number=post_data.get('account_number')).first()
 
         if not venue:
             logger.warning(f"Venue not found for account number: {post_data.get('account_number')}")
             raise ValueError("Venue not found")
 
+        if not (post_data['object'] == 'incoming_order' and post_data['action'] == 'changed'):
+            return venue, None, None
+
+        order = Order.objects.filter(venue=venue, external_id=post_data.get('object_id')).first()
+
+        if not order:
+            logger.warning(f"Order not found for external ID: {post_data.get('object_id')}")
+            raise ValueError("Order not found")
+
         pos_service = self._get_pos_service(venue)
+        pos_response = pos_service.get_incoming_order_by_id(order_id=post_data.get('object_id'))
+        return venue, order, pos_response
 
-        if post_data['object'] == 'incoming_order' and post_data['action'] == 'changed':
-            self._update_order_status(venue, post_data, pos_service)
+    def _process_webhook(self, venue, post_data, order, pos_response):
+        """ Обрабатывает валидные данные webhook. """
+        if order:
+            self._update_order_status(order, pos_response)
+        elif post_data['object'] == 'client':
+            invalidate_poster_cache(venue.access_token, 'clients.getClient', {'client_id': post_data.get('object_id')})
+        elif post_data['object'] in POSTER_REFERENCE_OBJECTS:
+            invalidate_poster_cache(venue.access_token)
 
     def _get_pos_service(self, venue):
         """ Получение POS-сервиса по системе заведения. """
@@ -81,22 +110,15 @@ class PosterWebhookViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
         api_token = venue.access_token
         return POSServiceFactory.get_service(pos_system_name, api_token)
 
-    def _update_order_status(self, venue, post_data, pos_service):
+    def _update_order_status(self, order, pos_response):
         """ Обновление статуса заказа на основании данных POS-системы. """
-        order = Order.objects.filter(venue=venue, external_id=post_data.get('object_id')).first()
-
-        if not order:
-            logger.warning(f"Order not found for external ID: {post_data.get('object_id')}")
-            raise ValueError("Order not found")
-
-        pos_response = pos_service.get_incoming_order_by_id(order_id=post_data.get('object_id'))
         order_status = pos_response.get('status')
 
         if order_status:
             order.status = order_status
             order.save()
 
-            async_to_sync(notify_order_status)(order)
+            transaction.on_commit(lambda: async_to_sync(notify_order_status)(order))
 
             logger.info(f"Order {order.id} status updated to {order.status}")
         else:
@@ -8,6 +8,7 @@ class OrdersConfig(AppConfig):
     name = 'orders'
 
     def ready(self):
+        from . import signals  # noqa: F401
         from .services import mqtt_client
 
         mqtt_client.initialize()
@@ -2,7 +2,15 @@ import json
 import logging
 from urllib.parse import parse_qs
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from orders.services.staff_feed import (
+    build_staff_feed_snapshot, resolve_staff_feed_scope, staff_feed_deltas_since, staff_feed_group
+)
 
 logger = logging.getLogger(__name__)
 
@@ -52,3 +60,94 @@ class OrderStatusConsumer(AsyncWebsocketConsumer):
             }))
         except Exception as e:
             logger.exception(f"Ошибка отправки данных через WebSocket: {e}")
+
+    async def order_payment_link(self, event):
+        try:
+            await self.send(text_data=json.dumps({
+                'order_id': event.get('order_id'),
+                'payment_url': event.get('payment_url'),
+            }))
+        except Exception as e:
+            logger.exception(f"Ошибка отправки данных через WebSocket: {e}")
+
+
+class StaffOrderFeedConsumer(AsyncWebsocketConsumer):
+    """
+    Лента заказов для персонала (кухонные экраны, планшеты): оплаченные заказы
+    заведения или точки и смены их статусов вместо опроса OrderViewSet.list.
+
+    Подключение: ws/staff/orders/?token=<JWT access>[&venue_id=][&spot_id=][&since=]
+    (или сессия админки). Сразу после подключения приходит снапшот заказов за сегодня
+    {"type": "snapshot", "seq": N, "orders": [...]}, затем события с растущим seq.
+    После разрыва переподключаемся с since=<последний seq> — придут пропущенные события,
+    а если догнать уже нельзя, снова снапшот. События с seq не больше seq снапшота пропускаются.
+    """
+
+    async def connect(self):
+        self.group_name = None
+        try:
+            query_params = parse_qs(self.scope["query_string"].decode())
+
+            def param(name):
+                return query_params.get(name, [None])[0]
+
+            user = await self._authenticate(param("token"))
+            scope = await database_sync_to_async(resolve_staff_feed_scope)(
+                user, _int_or_none(param("venue_id")), _int_or_none(param("spot_id"))
+            )
+            if scope is None:
+                await self.close(code=4003)
+                return
+            self.venue_id, self.spot_id = scope
+
+            # сначала подписка, потом снапшот — иначе события между ними потеряются
+            self.group_name = staff_feed_group(self.venue_id, self.spot_id)
+            await self.channel_layer.group_add(self.group_name, self.channel_name)
+            await self.accept()
+
+            since = _int_or_none(param("since"))
+            deltas = None
+            if since is not None:
+                deltas = await database_sync_to_async(staff_feed_deltas_since)(self.venue_id, since, self.spot_id)
+            if deltas is None:
+                snapshot = await database_sync_to_async(build_staff_feed_snapshot)(self.venue_id, self.spot_id)
+                await self.send(text_data=json.dumps(snapshot))
+            else:
+                for delta in deltas:
+                    await self.send(text_data=json.dumps(delta))
+
+            logger.info(f"Staff feed connected: venue {self.venue_id}, spot {self.spot_id}, user {user.pk}")
+
+        except Exception as e:
+            logger.exception(f"Ошибка подключения ленты персонала: {e}")
+            await self.close(code=1011)
+
+    async def disconnect(self, close_code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def staff_order_event(self, event):
+        try:
+            await self.send(text_data=json.dumps(event["delta"]))
+        except Exception as e:
+            logger.exception(f"Ошибка отправки данных через WebSocket: {e}")
+
+    async def _authenticate(self, token):
+        if token:
+            return await database_sync_to_async(_jwt_user)(token)
+        return self.scope.get("user")
+
+
+def _jwt_user(token):
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
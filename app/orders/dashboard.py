@@ -1,55 +1,49 @@
 import calendar
 import json
 import random
-from datetime import timedelta, datetime
+from datetime import timedelta
 
-from django.db.models import Count, Sum, F
-from django.db.models.functions import TruncDay
+from django.db.models import Q, Sum
 from django.utils import timezone
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
 from account.models import ROLE_OWNER, ROLE_ADMIN
-from orders.models import Order, OrderStatus
+from orders.models import OrderDailyStats, OrderStatus
 
 
-def get_current_month_orders_chart(request, chart_type="line"):
+def get_stats_queryset(user):
     """
-    График количества заказов за весь текущий месяц (включая будущие дни).
+    Сводка заказов по дням (OrderDailyStats), доступная пользователю.
+    Дашборд читает только её: время загрузки не зависит от числа заказов.
     """
-    now = timezone.now()
-
-    # начало месяца (00:00:00)
-    start_date = timezone.make_aware(
-        datetime(now.year, now.month, 1, 0, 0, 0), timezone.get_current_timezone()
-    )
+    if user.is_superuser:
+        return OrderDailyStats.objects.all()
+    if user.role in (ROLE_OWNER, ROLE_ADMIN):
+        return OrderDailyStats.objects.filter(venue=user.venue)
+    return OrderDailyStats.objects.none()
 
-    # конец месяца (23:59:59)
-    last_day = calendar.monthrange(now.year, now.month)[1]
-    end_date = timezone.make_aware(
-        datetime(now.year, now.month, last_day, 23, 59, 59), timezone.get_current_timezone()
-    )
 
-    user = request.user
+def get_current_month_orders_chart(request, chart_type="line"):
+    """
+    График количества заказов за весь текущий месяц (включая будущие дни).
+    """
+    today = timezone.localdate()
 
-    # Доступные заказы
-    if user.is_superuser:
-        orders_queryset = Order.objects
-    elif user.role in (ROLE_OWNER, ROLE_ADMIN):
-        orders_queryset = Order.objects.filter(venue=user.venue)
-    else:
-        orders_queryset = Order.objects.none()
+    # первый и последний день месяца
+    start_date = today.replace(day=1)
+    end_date = today.replace(day=calendar.monthrange(today.year, today.month)[1])
 
-    # Фильтруем заказы текущего месяца
+    # Заказы текущего месяца по дням (все статусы)
     orders_per_day = (
-        orders_queryset.filter(created_at__range=(start_date, end_date))
-        .annotate(day=TruncDay("created_at"))
+        get_stats_queryset(request.user)
+        .filter(day__range=(start_date, end_date))
         .values("day")
-        .annotate(count=Count("id"))
+        .annotate(count=Sum("count"))
         .order_by("day")
     )
 
-    orders_dict = {order["day"].date(): order["count"] for order in orders_per_day}
+    orders_dict = {row["day"]: row["count"] for row in orders_per_day}
 
     months_ru = {
         1: "янв", 2: "фев", 3: "мар", 4: "апр", 5: "май",
@@ -57,10 +51,10 @@ def get_current_month_orders_chart(request, chart_type="line"):
     }
 
     labels, order_counts = [], []
-    total_days = (end_date.date() - start_date.date()).days + 1
+    total_days = (end_date - start_date).days + 1
 
     for i in range(total_days):
-        current_day = start_date.date() + timedelta(days=i)
+        current_day = start_date + timedelta(days=i)
         month_name = months_ru[current_day.month]
         labels.append(f"{current_day.day:02d} {month_name}")
         order_counts.append(orders_dict.get(current_day, 0))
@@ -113,52 +107,28 @@ def get_summary_cards(request):
     - первые 4 карточки — за прошлый месяц
     - последние 4 — за текущий месяц
     """
-    now = timezone.now()
-    tz = timezone.get_current_timezone()
-
-    # Начало текущего месяца (1 число 00:00:00)
-    first_day_current_month = timezone.make_aware(
-        datetime(now.year, now.month, 1, 0, 0, 0), tz
+    # Начало текущего и прошлого месяца
+    first_day_current_month = timezone.localdate().replace(day=1)
+    first_day_last_month = (first_day_current_month - timedelta(days=1)).replace(day=1)
+
+    # --- Только COMPLETED и NEW, оба месяца одним запросом по сводке ---
+    last_month = Q(day__lt=first_day_current_month)
+    current_month = Q(day__gte=first_day_current_month)
+    totals = (
+        get_stats_queryset(request.user)
+        .filter(status__in=[OrderStatus.COMPLETED, OrderStatus.NEW], day__gte=first_day_last_month)
+        .aggregate(
+            last_month_sum=Sum("revenue", filter=last_month),
+            last_month_count=Sum("count", filter=last_month),
+            current_month_sum=Sum("revenue", filter=current_month),
+            current_month_count=Sum("count", filter=current_month),
+        )
     )
 
-    # Конец прошлого месяца = день перед началом текущего
-    last_month_end = first_day_current_month - timedelta(seconds=1)
-
-    # Начало прошлого месяца
-    first_day_last_month = timezone.make_aware(
-        datetime(last_month_end.year, last_month_end.month, 1, 0, 0, 0), tz
-    )
-
-    user = request.user
-
-    # --- Фильтр заказов по пользователю ---
-    if user.is_superuser:
-        orders_queryset = Order.objects.all()
-    elif user.role in (ROLE_OWNER, ROLE_ADMIN):
-        orders_queryset = Order.objects.filter(venue=user.venue)
-    else:
-        orders_queryset = Order.objects.none()
-
-    # --- Только COMPLETED и NEW ---
-    completed_orders = orders_queryset.filter(
-        status__in=[OrderStatus.COMPLETED, OrderStatus.NEW]
-    )
-
-    # --- Прошлый месяц (>= 1 числа прошл. месяца, < 1 числа тек. месяца) ---
-    last_month_orders = completed_orders.filter(
-        created_at__gte=first_day_last_month,
-        created_at__lt=first_day_current_month,
-    )
-
-    last_month_orders_sum = last_month_orders.aggregate(total=Sum("total_price"))["total"] or 0
-    last_month_orders_count = last_month_orders.count()
-
-    # --- Текущий месяц ---
-    current_month_orders = completed_orders.filter(
-        created_at__gte=first_day_current_month
-    )
-    current_month_orders_sum = current_month_orders.aggregate(total=Sum("total_price"))["total"] or 0
-    current_month_orders_count = current_month_orders.count()
+    last_month_orders_sum = totals["last_month_sum"] or 0
+    last_month_orders_count = totals["last_month_count"] or 0
+    current_month_orders_sum = totals["current_month_sum"] or 0
+    current_month_orders_count = totals["current_month_count"] or 0
 
     # --- Карточки ---
     cards = [
@@ -0,0 +1,318 @@
+import json
+import os
+import random
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client as TestClient
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from menu.models import Category, Modificator, Product
+from menu.services import bump_menu_version
+from orders.models import PaymentAccount, Transaction
+from venues.models import Spot, Venue, WorkSchedule
+
+BENCH_SLUG_PREFIX = "bench-hot-paths"
+BENCH_PHONE = "+996700000001"
+SCENARIOS = (
+    'order_create_v1', 'order_create_v2', 'bakai_webhook',
+    'menu_products', 'menu_categories', 'menu_snapshot',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный замер горячих путей: создание заказа (v1, v2), вебхук Bakai и меню. "
+        "Считает RPS, p50/p95/p99 и число запросов к БД на синтетическом заведении; "
+        "внешние вызовы (ссылка на оплату, задачи POS/Telegram/чек) заглушены. "
+        "Запускать на копии окружения с PostgreSQL и Redis, а не на проде"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS),
+            help='Какие сценарии замерять'
+        )
+        parser.add_argument('--requests', type=int, default=200, help='Запросов на сценарий')
+        parser.add_argument('--concurrency', type=int, default=1, help='Сколько потоков шлют запросы одновременно')
+        parser.add_argument('--products', type=int, default=500, help='Товаров в синтетическом меню')
+        parser.add_argument('--categories', type=int, default=25, help='Категорий в синтетическом меню')
+        parser.add_argument('--cart-size', type=int, default=5, help='Позиций в корзине заказа')
+        parser.add_argument(
+            '--cold-menu', action='store_true',
+            help='Сбрасывать кеш меню перед каждым запросом меню (замер сборки, а не попаданий в кеш)'
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Seed генератора корзин')
+        parser.add_argument('--output', help='Сохранить результаты в JSON-файл')
+        parser.add_argument('--baseline', help='JSON прошлого запуска для сравнения')
+        parser.add_argument('--keep', action='store_true', help='Не удалять синтетическое заведение')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2:
+            raise CommandError("❌ Нужно хотя бы 2 запроса на сценарий для перцентилей.")
+
+        self.options = options
+        self.random = random.Random(options['seed'])
+        setup_test_environment()  # разрешает хост testserver для тестового клиента
+        venue = self._create_venue()
+        self.stdout.write(
+            f"🔄 Заведение {venue.slug}: {options['products']} товаров, {options['categories']} категорий"
+        )
+
+        try:
+            with self._stub_external_calls():
+                results = {}
+                for scenario in options['scenarios']:
+                    results[scenario] = getattr(self, f'_bench_{scenario}')(venue)
+                    self._print_row(scenario, results[scenario])
+        finally:
+            if not options['keep']:
+                Transaction.objects.filter(order__venue=venue).delete()  # on_delete=PROTECT
+                venue.delete()
+            teardown_test_environment()
+
+        report = {
+            'commit': self._git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'cache': settings.CACHES['default']['BACKEND'],
+            'params': {
+                name: options[name] for name in (
+                    'requests', 'concurrency', 'products', 'categories', 'cart_size', 'cold_menu', 'seed'
+                )
+            },
+            'results': results,
+        }
+
+        if options['baseline']:
+            self._compare(report, options['baseline'])
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"💾 Результаты сохранены в {options['output']}")
+        self.stdout.write(self.style.SUCCESS(f"🏁 Готово! Коммит {report['commit']}"))
+
+    # --- сценарии
+
+    def _bench_order_create_v1(self, venue):
+        return self._run(lambda client, i: client.post(
+            '/api/orders/', self._order_body(venue), content_type='application/json', secure=True
+        ))
+
+    def _bench_order_create_v2(self, venue):
+        return self._run(lambda client, i: client.post(
+            '/api/v2/orders/', self._order_body(venue), content_type='application/json', secure=True
+        ))
+
+    def _bench_bakai_webhook(self, venue):
+        # транзакции готовятся заранее и в замер не входят
+        client = TestClient()
+        for _ in range(self.options['requests']):
+            client.post('/api/v2/orders/', self._order_body(venue), content_type='application/json', secure=True)
+        transaction_ids = list(
+            Transaction.objects.filter(order__venue=venue).order_by('-id')
+            .values_list('id', flat=True)[:self.options['requests']]
+        )
+
+        return self._run(lambda client, i: client.post(
+            '/api/v2/payment/webhook/',
+            json.dumps({'operation_id': transaction_ids[i], 'operation_state': 'success'}),
+            content_type='application/json', secure=True,
+        ))
+
+    def _bench_menu_products(self, venue):
+        return self._run_menu(venue, f'/api/v2/products/?venue_slug={venue.slug}')
+
+    def _bench_menu_categories(self, venue):
+        return self._run_menu(venue, f'/api/v2/categories/?venue_slug={venue.slug}')
+
+    def _bench_menu_snapshot(self, venue):
+        return self._run_menu(venue, f'/api/v2/menu-snapshot/?venue_slug={venue.slug}')
+
+    def _run_menu(self, venue, url):
+        def request(client, i):
+            if self.options['cold_menu']:
+                bump_menu_version(venue.slug)
+            return client.get(url, secure=True)
+
+        return self._run(request)
+
+    # --- замер
+
+    def _run(self, request) -> dict:
+        """
+        Делит запросы между потоками (у каждого свой клиент и соединение с БД)
+        и считает задержки и запросы к БД. Запросы фоновых потоков
+        (например, пересборки кеша меню) в счётчик не попадают.
+        """
+        count, concurrency = self.options['requests'], self.options['concurrency']
+        errors = []
+
+        def worker(indexes):
+            client, samples = TestClient(), []
+            try:
+                for i in indexes:
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        response = request(client, i)
+                        elapsed = time.perf_counter() - started
+                    ok = 200 <= response.status_code < 300
+                    if not ok:
+                        errors.append(f"{response.status_code} {response.content[:200]!r}")
+                    samples.append((elapsed * 1000, len(queries), ok))
+            finally:
+                connection.close()
+            return samples
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            chunks = executor.map(worker, [range(start, count, concurrency) for start in range(concurrency)])
+            samples = [sample for chunk in chunks for sample in chunk]
+        total = time.perf_counter() - started
+
+        latencies = sorted(elapsed for elapsed, _, _ in samples)
+        queries = [query_count for _, query_count, _ in samples]
+        percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        return {
+            'requests': count,
+            'errors': len(errors),
+            'first_error': errors[0] if errors else None,
+            'rps': round(count / total, 1),
+            'p50_ms': round(percentiles[49], 2),
+            'p95_ms': round(percentiles[94], 2),
+            'p99_ms': round(percentiles[98], 2),
+            'max_ms': round(latencies[-1], 2),
+            'queries_avg': round(statistics.mean(queries), 1),
+            'queries_max': max(queries),
+        }
+
+    def _print_row(self, scenario, result):
+        self.stdout.write(
+            f"{scenario:<16} {result['rps']:>8.1f} rps  p50 {result['p50_ms']:>7.1f}  "
+            f"p95 {result['p95_ms']:>7.1f}  p99 {result['p99_ms']:>7.1f} мс  "
+            f"SQL {result['queries_avg']:>5.1f} (макс {result['queries_max']})  ошибок {result['errors']}"
+        )
+        if result['first_error']:
+            self.stdout.write(self.style.WARNING(f"   ⚠️ {result['first_error']}"))
+
+    def _compare(self, report, baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        if baseline.get('params') != report['params']:
+            self.stdout.write(self.style.WARNING("⚠️ Параметры базового запуска отличаются, сравнение неточное"))
+
+        self.stdout.write(f"Сравнение с {baseline.get('commit')}:")
+        for scenario, result in report['results'].items():
+            before = baseline.get('results', {}).get(scenario)
+            if not before:
+                continue
+            changes = ", ".join(
+                f"{metric} {_change(before[metric], result[metric])}"
+                for metric in ('rps', 'p95_ms', 'queries_avg')
+            )
+            self.stdout.write(f"  {scenario:<16} {changes}")
+
+    # --- данные
+
+    def _create_venue(self) -> Venue:
+        venue = Venue.objects.create(
+            company_name="Benchmark",
+            slug=f"{BENCH_SLUG_PREFIX}-{int(time.time())}",
+            delivery_service_fee_percent=10,
+            takeout_service_fee_percent=5,
+            dinein_service_fee_percent=10,
+        )
+        # расписание по умолчанию создаёт сигнал заведения, заказы должны приниматься круглосуточно
+        WorkSchedule.objects.bulk_create(
+            [WorkSchedule(venue=venue, day_of_week=day) for day in range(1, 8)], ignore_conflicts=True
+        )
+        venue.schedules.update(is_24h=True, is_day_off=False)
+        spot = Spot.objects.create(venue=venue, name="Benchmark")
+        PaymentAccount.objects.create(venue=venue, service='bakai', name="Benchmark", token="bench")
+
+        categories = Category.objects.bulk_create([
+            Category(venue=venue, category_name=f"Категория {num}", slug=f"{venue.slug}-{num}", sort_order=num)
+            for num in range(self.options['categories'])
+        ])
+        products = Product.objects.bulk_create([
+            Product(
+                venue=venue,
+                product_name=f"Товар {num}",
+                product_description="Описание товара для замера, примерно как у настоящего меню",
+                product_price=100 + num % 900,
+                weight=250,
+            )
+            for num in range(self.options['products'])
+        ])
+        Product.categories.through.objects.bulk_create([
+            Product.categories.through(product_id=product.pk, category_id=categories[num % len(categories)].pk)
+            for num, product in enumerate(products)
+        ])
+        Product.spots.through.objects.bulk_create([
+            Product.spots.through(product_id=product.pk, spot_id=spot.pk) for product in products
+        ])
+        # у каждого третьего товара — два модификатора
+        modificators = Modificator.objects.bulk_create([
+            Modificator(product=product, name=name, price=price, external_id=f"{product.pk}-{name}")
+            for product in products[::3] for name, price in (("Маленький", 0), ("Большой", 150))
+        ])
+
+        self.products = [product.pk for product in products]
+        self.modificators = {}
+        for modificator in modificators:
+            self.modificators.setdefault(modificator.product_id, []).append(modificator.pk)
+        return venue
+
+    def _order_body(self, venue) -> str:
+        order_products = []
+        for product_id in self.random.sample(self.products, min(self.options['cart_size'], len(self.products))):
+            modificators = self.modificators.get(product_id)
+            order_products.append({
+                'product': product_id,
+                'count': self.random.randint(1, 3),
+                'modificator': self.random.choice(modificators) if modificators else None,
+            })
+        return json.dumps({
+            'venue_slug': venue.slug,
+            'phone': BENCH_PHONE,
+            'service_mode': 2,
+            'order_products': order_products,
+        })
+
+    # --- окружение
+
+    @staticmethod
+    def _stub_external_calls() -> ExitStack:
+        """Ссылка на оплату отдаётся сразу, фоновые задачи заказа не запускаются."""
+        async def request_payment_link(payload):
+            return "https://pay.example.com/benchmark"
+
+        stack = ExitStack()
+        stack.enter_context(mock.patch('orders.services.open_banking.request_payment_link', request_payment_link))
+        stack.enter_context(mock.patch('orders.services.order_jobs.kick_order_jobs', lambda order_id: None))
+        return stack
+
+    @staticmethod
+    def _git_commit() -> str:
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return os.environ.get('GIT_COMMIT', 'unknown')
+        return commit
+
+
+def _change(before, after) -> str:
+    if not before:
+        return f"{before} → {after}"
+    return f"{before} → {after} ({(after - before) / before * 100:+.1f}%)"
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from services.poster import CLIENT_PAGE_SIZE, PosterService, import_poster_clients, poster_sync_venues
+
+
+class Command(BaseCommand):
+    help = "Переносит клиентскую базу заведения из Poster (клиенты, бонусы, сумма покупок) постранично"
+
+    def add_arguments(self, parser):
+        parser.add_argument('venue', type=int, help='ID заведения')
+        parser.add_argument(
+            '--page-size', type=int, default=CLIENT_PAGE_SIZE,
+            help='Сколько клиентов запрашивать у Poster за раз'
+        )
+
+    def handle(self, *args, **options):
+        venue = poster_sync_venues().filter(pk=options['venue']).first()
+        if not venue:
+            raise CommandError(f"Заведение {options['venue']} не найдено или не подключено к Poster")
+
+        self.stdout.write(f"🔄 Импорт клиентов заведения {venue}")
+        totals = import_poster_clients(
+            venue, PosterService(venue.access_token, use_cache=False), page_size=options['page_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"🏁 Создано: {totals['created']}, обновлено: {totals['updated']}, "
+            f"без изменений: {totals['unchanged']}, без телефона: {totals['skipped']}"
+        ))
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.models import WebhookEvent
+
+
+class Command(BaseCommand):
+    help = "Удаляет из журнала обработанных вебхуков записи старше указанного срока"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=30,
+            help='Сколько дней хранить записи (провайдеры повторяют доставку не дольше нескольких суток)'
+        )
+
+    def handle(self, *args, **options):
+        deleted, _ = WebhookEvent.objects.filter(
+            created_at__lt=timezone.now() - timedelta(days=options['days'])
+        ).delete()
+        self.stdout.write(self.style.SUCCESS(f"🏁 Удалено записей: {deleted}"))
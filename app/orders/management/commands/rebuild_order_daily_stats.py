@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.services import rebuild_order_daily_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверяет сводку OrderDailyStats с таблицей заказов и исправляет расхождения "
+        "(заполнение с нуля, заказы, изменённые через queryset.update() в обход сигналов)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--venue_id',
+            type=int,
+            help='ID заведения, если нужно пересчитать только его'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Пересчитать только последние N дней (по умолчанию всю историю)'
+        )
+
+    def handle(self, *args, **options):
+        start = None
+        if options.get('days'):
+            start = timezone.localdate() - timedelta(days=options['days'] - 1)
+
+        result = rebuild_order_daily_stats(venue_id=options.get('venue_id'), start=start)
+        self.stdout.write(self.style.SUCCESS(
+            f"🏁 Создано строк: {result['created']}, исправлено: {result['updated']}, "
+            f"удалено: {result['deleted']}"
+        ))
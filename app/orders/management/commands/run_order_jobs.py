@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Avg, Count, Max
+
+from orders.models import OrderJob
+from orders.services import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Воркер задач оплаченных заказов (POS, бонусы, Telegram, чек, n8n): "
+        "выполняет готовые задачи и повторяет упавшие по расписанию"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=2,
+            help='Пауза между проверками очереди, секунд'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить всё готовое и выйти'
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Показать метрики по шагам и выйти'
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self._print_stats()
+            return
+
+        if options['once']:
+            count = run_pending_jobs()
+            self.stdout.write(self.style.SUCCESS(f"🏁 Выполнено попыток: {count}"))
+            return
+
+        self.stdout.write("🔄 Воркер задач по заказам запущен")
+        while True:
+            close_old_connections()
+            if not run_pending_jobs(limit=100):
+                time.sleep(options['interval'])
+
+    def _print_stats(self):
+        rows = (
+            OrderJob.objects
+            .values('step', 'status')
+            .annotate(
+                count=Count('id'),
+                avg_attempts=Avg('attempts'),
+                avg_ms=Avg('duration_ms'),
+                max_ms=Max('duration_ms'),
+            )
+            .order_by('step', 'status')
+        )
+        self.stdout.write(
+            f"{'шаг':<12} {'статус':<10} {'задач':>8} {'попыток':>8} {'средн, мс':>10} {'макс, мс':>10}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['step']:<12} {row['status']:<10} {row['count']:>8} "
+                f"{row['avg_attempts'] or 0:>8.2f} {row['avg_ms'] or 0:>10.0f} {row['max_ms'] or 0:>10}"
+            )
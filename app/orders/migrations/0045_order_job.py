@@ -0,0 +1,43 @@
+# Generated by Django 5.1 on 2026-10-18 16:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0044_alter_order_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата последнего обновления')),
+                ('step', models.CharField(choices=[('pos_client', 'POS и клиент'), ('bonus', 'Бонусы'), ('telegram', 'Telegram'), ('receipt', 'Чек (MQTT)'), ('n8n', 'n8n webhook')], max_length=20, verbose_name='Шаг')),
+                ('idempotency_key', models.CharField(max_length=100, unique=True, verbose_name='Ключ идемпотентности')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Выполнено'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=8, verbose_name='Максимум попыток')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Не раньше')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Занято до')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начало последней попытки')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+                ('duration_ms', models.PositiveIntegerField(blank=True, null=True, verbose_name='Длительность, мс')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Результат шага')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='Последняя ошибка')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='orders.order', verbose_name='Заказ')),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='orders.transaction', verbose_name='Транзакция')),
+            ],
+            options={
+                'verbose_name': 'Задача по заказу',
+                'verbose_name_plural': 'Задачи по заказам',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='orders_orde_status_05d209_idx')],
+            },
+        ),
+    ]
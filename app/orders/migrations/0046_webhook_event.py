@@ -0,0 +1,27 @@
+# Generated by Django 5.1 on 2026-10-18 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0045_order_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('bakai', 'Bakai bank'), ('poster', 'Poster')], max_length=20, verbose_name='Источник')),
+                ('event_key', models.CharField(max_length=255, verbose_name='Ключ события')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата обработки')),
+            ],
+            options={
+                'verbose_name': 'Обработанный вебхук',
+                'verbose_name_plural': 'Обработанные вебхуки',
+                'constraints': [models.UniqueConstraint(fields=('source', 'event_key'), name='unique_webhook_event')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 16:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0046_webhook_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='pos_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Если данные клиента в POS не изменились, запись не перезаписывается', max_length=64, verbose_name='Хеш данных из POS'),
+        ),
+    ]
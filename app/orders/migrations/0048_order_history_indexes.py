@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-18 16:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0047_client_pos_hash'),
+        ('venues', '0048_poster_sync_state'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['venue', '-created_at'], name='order_venue_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['venue', '-created_at'], name='order_venue_paid_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['phone', '-created_at'], name='order_phone_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['table', 'created_at'], name='order_table_created_idx'),
+        ),
+    ]
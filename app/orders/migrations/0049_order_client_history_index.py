@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 16:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0048_order_history_indexes'),
+        ('venues', '0048_poster_sync_state'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['client', '-created_at', '-id'], name='order_client_created_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1 on 2026-10-18 16:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def fill_order_daily_stats(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderDailyStats = apps.get_model('orders', 'OrderDailyStats')
+
+    rows = (
+        Order.objects
+        .annotate(day=TruncDate('created_at'))
+        .values('venue_id', 'day', 'status')
+        .annotate(count=Count('id'), revenue=Sum('total_price'), bonus=Sum('bonus'), tips=Sum('tips_price'))
+        .order_by()
+    )
+    OrderDailyStats.objects.bulk_create((OrderDailyStats(**row) for row in rows), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0049_order_client_history_index'),
+        ('venues', '0048_poster_sync_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('status', models.PositiveSmallIntegerField(choices=[(0, 'Заказ оформлен'), (1, 'Готовим заказ'), (2, 'Заказ готов'), (3, 'Заказ выполнен'), (4, 'Ожидает оплату'), (5, 'В доставке'), (7, 'Отменён')], verbose_name='Статус заказа')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество заказов')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Сумма заказов')),
+                ('bonus', models.BigIntegerField(default=0, verbose_name='Бонусы')),
+                ('tips', models.BigIntegerField(default=0, verbose_name='Чаевые')),
+                ('venue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_daily_stats', to='venues.venue', verbose_name='Заведение')),
+            ],
+            options={
+                'verbose_name': 'Статистика заказов за день',
+                'verbose_name_plural': 'Статистика заказов по дням',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day', 'status'], name='orders_orde_day_3dbad6_idx')],
+                'constraints': [models.UniqueConstraint(fields=('venue', 'day', 'status'), name='unique_order_daily_stats')],
+            },
+        ),
+        migrations.RunPython(fill_order_daily_stats, migrations.RunPython.noop),
+    ]
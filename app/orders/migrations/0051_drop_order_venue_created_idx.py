@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-18 17:13
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0050_order_daily_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_venue_created_idx',
+        ),
+    ]
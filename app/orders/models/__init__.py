@@ -5,4 +5,7 @@ from .receipt import *
 from .receipt_printer import *
 from .payment_account import *
 from .transaction import *
-from .bonus_history import *
\ No newline at end of file
+from .bonus_history import *
+from .order_job import *
+from .webhook_event import *
+from .order_daily_stats import *
\ No newline at end of file
@@ -39,6 +39,11 @@ class Client(BaseModel):
     address = models.TextField(
         blank=True, null=True, verbose_name="Адрес"
     )
+    pos_hash = models.CharField(
+        max_length=64, blank=True, editable=False,
+        verbose_name="Хеш данных из POS",
+        help_text="Если данные клиента в POS не изменились, запись не перезаписывается"
+    )
 
     def __str__(self):
         return f'{self.firstname} {self.lastname} - {self.phone}'
@@ -101,6 +101,20 @@ class Order(BaseModel):
         verbose_name = "Заказ"
         verbose_name_plural = "Заказы"
         ordering = ['-created_at']
+        indexes = [
+            # история заказов (orders.services.order_history): фильтр + диапазон дат
+            # и сортировка по -created_at читаются из индекса без отдельной сортировки;
+            # неоплаченные заказы история не показывает, их в индекс не берём
+            models.Index(
+                fields=['venue', '-created_at'],
+                condition=~models.Q(status=OrderStatus.WAITING_FOR_PAYMENT),
+                name='order_venue_paid_created_idx',
+            ),
+            models.Index(fields=['phone', '-created_at'], name='order_phone_created_idx'),
+            models.Index(fields=['table', 'created_at'], name='order_table_created_idx'),
+            # история заказов клиента с курсорной пагинацией по (created_at, id)
+            models.Index(fields=['client', '-created_at', '-id'], name='order_client_created_idx'),
+        ]
 
     def __str__(self):
         return f'Order {self.id} for {self.phone}'
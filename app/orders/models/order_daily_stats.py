@@ -0,0 +1,35 @@
+from django.db import models
+
+from orders.models.order import OrderStatus
+
+
+class OrderDailyStats(models.Model):
+    """
+    Сводка заказов заведения за день по статусу: её читает дашборд админки
+    вместо агрегатов по всей таблице заказов. Поддерживается сигналами Order
+    (orders.services.order_stats), сверяется командой rebuild_order_daily_stats.
+    """
+    venue = models.ForeignKey(
+        'venues.Venue', on_delete=models.CASCADE, related_name='order_daily_stats',
+        verbose_name="Заведение"
+    )
+    day = models.DateField(verbose_name="День")
+    status = models.PositiveSmallIntegerField(choices=OrderStatus.choices, verbose_name="Статус заказа")
+    count = models.IntegerField(default=0, verbose_name="Количество заказов")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Сумма заказов")
+    bonus = models.BigIntegerField(default=0, verbose_name="Бонусы")
+    tips = models.BigIntegerField(default=0, verbose_name="Чаевые")
+
+    class Meta:
+        verbose_name = "Статистика заказов за день"
+        verbose_name_plural = "Статистика заказов по дням"
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['venue', 'day', 'status'], name='unique_order_daily_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'status']),  # дашборд суперпользователя по всем заведениям
+        ]
+
+    def __str__(self):
+        return f'{self.venue_id} {self.day} {self.get_status_display()}: {self.count}'
@@ -0,0 +1,56 @@
+from django.db import models
+from django.utils import timezone
+
+from services.model import BaseModel
+
+
+class OrderJob(BaseModel):
+    """
+    Шаг обработки оплаченного заказа (отправка в POS, бонусы, уведомления),
+    который выполняет фоновый воркер orders.services.order_jobs с повторами.
+    """
+
+    class Step(models.TextChoices):
+        POS_CLIENT = 'pos_client', 'POS и клиент'
+        BONUS = 'bonus', 'Бонусы'
+        TELEGRAM = 'telegram', 'Telegram'
+        RECEIPT = 'receipt', 'Чек (MQTT)'
+        N8N = 'n8n', 'n8n webhook'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнено'
+        FAILED = 'failed', 'Ошибка'
+
+    order = models.ForeignKey(
+        'Order', related_name='jobs', on_delete=models.CASCADE, verbose_name="Заказ"
+    )
+    transaction = models.ForeignKey(
+        'Transaction', related_name='jobs', on_delete=models.CASCADE, verbose_name="Транзакция"
+    )
+    step = models.CharField(max_length=20, choices=Step.choices, verbose_name="Шаг")
+    idempotency_key = models.CharField(max_length=100, unique=True, verbose_name="Ключ идемпотентности")
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING, verbose_name="Статус"
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Попыток")
+    max_attempts = models.PositiveSmallIntegerField(default=8, verbose_name="Максимум попыток")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="Не раньше")
+    locked_until = models.DateTimeField(blank=True, null=True, verbose_name="Занято до")
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name="Начало последней попытки")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Завершено")
+    duration_ms = models.PositiveIntegerField(blank=True, null=True, verbose_name="Длительность, мс")
+    result = models.JSONField(blank=True, null=True, verbose_name="Результат шага")
+    last_error = models.TextField(blank=True, null=True, verbose_name="Последняя ошибка")
+
+    class Meta:
+        verbose_name = "Задача по заказу"
+        verbose_name_plural = "Задачи по заказам"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),  # выборка воркером
+        ]
+
+    def __str__(self):
+        return f'{self.get_step_display()} для заказа {self.order_id}'
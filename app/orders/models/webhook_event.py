@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class WebhookEvent(models.Model):
+    """
+    Журнал обработанных вебхуков: по естественному ключу события повторная
+    доставка отсекается до любых блокировок и внешних запросов.
+    """
+
+    class Source(models.TextChoices):
+        BAKAI = 'bakai', 'Bakai bank'
+        POSTER = 'poster', 'Poster'
+
+    source = models.CharField(max_length=20, choices=Source.choices, verbose_name="Источник")
+    event_key = models.CharField(max_length=255, verbose_name="Ключ события")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Дата обработки")
+
+    class Meta:
+        verbose_name = "Обработанный вебхук"
+        verbose_name_plural = "Обработанные вебхуки"
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'event_key'], name='unique_webhook_event'),
+        ]
+
+    def __str__(self):
+        return f'{self.source}:{self.event_key}'
@@ -4,4 +4,5 @@ from . import consumers
 
 websocket_urlpatterns = [
     path("ws/orders/", consumers.OrderStatusConsumer.as_asgi()),
+    path("ws/staff/orders/", consumers.StaffOrderFeedConsumer.as_asgi()),
 ]
\ No newline at end of file
@@ -2,4 +2,10 @@ from .receipt import *
 from .open_banking import *
 from .format_order_to_tg import *
 from .ws_order import *
-from .geocode import *
\ No newline at end of file
+from .geocode import *
+from .order_create import *
+from .order_jobs import *
+from .webhook_events import *
+from .order_history import *
+from .order_stats import *
+from .staff_feed import *
\ No newline at end of file
@@ -1,21 +1,69 @@
-import requests
+import asyncio
 import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.core.cache import cache
+from django.db import connection
+from django.utils.crypto import constant_time_compare
+
+from orders.models import Transaction
+from orders.services.ws_order import notify_payment_link
 
 PAYMENT_API_URL = "https://pay.operator.kg/api/v1/payments/make-payment-link/"
+PAYMENT_TIMEOUT = httpx.Timeout(10.0, connect=3.0)  # ⏱️ обязательно
+PAYMENT_DEADLINE = 10.0  # на все попытки вместе — синхронный запрос не ждёт дольше одного таймаута
+PAYMENT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60)
+PAYMENT_RETRIES = 3
+PAYMENT_RETRY_BACKOFF = 0.5  # 1-я ошибка → 0.5с, 2-я → 1с
+# POST создаёт ссылку и не идемпотентен: повторяем, только если запрос точно не дошёл до сервиса
+PAYMENT_RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+PAYMENT_RETRY_STATUSES = (429,)
+PAYMENT_WAIT_TIMEOUT = PAYMENT_DEADLINE + 1
+PAYMENT_PENDING_TIMEOUT = 60
+
 logger = logging.getLogger(__name__)
 
+_loop = None
+_loop_lock = threading.Lock()
+_client = None
 
-def generate_payment_link(transaction, order, payment_account):
-    if not payment_account:
-        logger.error(f"Не найден платёжный аккаунт для заведения {order.venue}")
-        return None
 
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Отдельный event loop в фоновом потоке: на нём живёт один httpx-клиент
+    с пулом соединений к платёжному сервису, общий для всех воркеров процесса.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="payment-links", daemon=True).start()
+    return _loop
+
+
+def _get_client() -> httpx.AsyncClient:
+    # вызывается только из потока _loop, поэтому без лока
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=PAYMENT_TIMEOUT, limits=PAYMENT_LIMITS)
+    return _client
+
+
+def _run(coroutine):
+    return asyncio.run_coroutine_threadsafe(coroutine, _get_loop())
+
+
+def build_payment_payload(transaction, order, payment_account) -> dict:
     redirect_url = (
         order.tg_redirect_url if order.is_tg_bot and order.tg_redirect_url
         else f"https://imenu.kg/{order.venue.slug}/order-status/{order.id}"
     )
 
-    payload = {
+    return {
         "amount": str(transaction.total_price),
         "transaction_id": str(transaction.id),
         "comment": f"Оплата заказа #{transaction.id}",
@@ -23,28 +71,118 @@ def generate_payment_link(transaction, order, payment_account):
         "token": payment_account.token,
     }
 
+
+async def request_payment_link(payload: dict) -> str | None:
+    """
+    Запрашивает ссылку на оплату. Повторяются только неудачное соединение и 429 —
+    тогда сервис запрос не обработал. Таймаут чтения и 5xx не повторяются: ссылка
+    могла уже создаться, а отложенный режим и payment-link/ запросят её заново.
+    Все попытки укладываются в PAYMENT_DEADLINE, ошибки возвращают None.
+    """
+    client = _get_client()
     try:
-        response = requests.post(
-            PAYMENT_API_URL,
-            json=payload,
-            headers={"Content-Type": "application/json"},
-            timeout=10  # ⏱️ обязательно
-        )
-        response.raise_for_status()  # выбросит исключение если 4xx/5xx
+        async with asyncio.timeout(PAYMENT_DEADLINE):
+            for attempt in range(1, PAYMENT_RETRIES + 1):
+                retry = attempt < PAYMENT_RETRIES
+                try:
+                    response = await client.post(PAYMENT_API_URL, json=payload)
+                    if response.status_code in PAYMENT_RETRY_STATUSES and retry:
+                        logger.warning(f"Платежный сервис ответил {response.status_code}, попытка {attempt}")
+                        await asyncio.sleep(PAYMENT_RETRY_BACKOFF * 2 ** (attempt - 1))
+                        continue
+                    response.raise_for_status()  # выбросит исключение если 4xx/5xx
+                    data = response.json()
+                except PAYMENT_RETRY_ERRORS as e:
+                    if retry:
+                        logger.warning(f"Не удалось соединиться с платежным сервисом, попытка {attempt}: {e}")
+                        await asyncio.sleep(PAYMENT_RETRY_BACKOFF * 2 ** (attempt - 1))
+                        continue
+                    logger.error(f"Ошибка при запросе к платежному сервису: {e}", exc_info=True)
+                    return None
+                except (httpx.HTTPError, ValueError) as e:
+                    logger.error(f"Ошибка при запросе к платежному сервису: {e}", exc_info=True)
+                    return None
+
+                pay_url = data.get('pay_url')
+                if not pay_url:
+                    logger.error(f"API не вернул pay_url. Ответ: {data}")
+                    return None
+                return pay_url
+    except TimeoutError:
+        logger.error(f"Платежный сервис не ответил за {PAYMENT_DEADLINE}с")
+        return None
 
-        data = response.json()
-        pay_url = data.get('pay_url')
 
-        if not pay_url:
-            logger.error(f"API не вернул pay_url. Ответ: {data}")
-            return None
+def generate_payment_link(transaction, order, payment_account):
+    """Синхронно получает ссылку на оплату и сохраняет её в транзакцию."""
+    if not payment_account:
+        logger.error(f"Не найден платёжный аккаунт для заведения {order.venue}")
+        return None
 
+    future = _run(request_payment_link(build_payment_payload(transaction, order, payment_account)))
+    try:
+        pay_url = future.result(timeout=PAYMENT_WAIT_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        logger.error(f"Платежный сервис не ответил за {PAYMENT_WAIT_TIMEOUT}с, транзакция {transaction.id}")
+        return None
+
+    if pay_url:
         # сохраняем URL в транзакцию
         transaction.payment_url = pay_url
         transaction.save(update_fields=["payment_url"])
+    return pay_url
+
+
+def payment_link_token(order_id) -> str:
+    """
+    Подпись id заказа: её получает только создавший заказ, и только с ней
+    orders/{id}/payment-link/ отдаёт ссылку — перебором id чужие заказы не достать.
+    """
+    return signing.Signer(salt="orders.payment-link").signature(str(order_id))
 
-        return pay_url
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Ошибка при запросе к платежному сервису: {e}", exc_info=True)
-        return None
\ No newline at end of file
+def check_payment_link_token(order_id, token) -> bool:
+    return bool(token) and constant_time_compare(payment_link_token(order_id), token)
+
+
+def payment_link_pending_key(transaction_id) -> str:
+    return f"payment_link_pending:{transaction_id}"
+
+
+def enqueue_payment_link(transaction, order, payment_account) -> bool:
+    """
+    Запрашивает ссылку на оплату в фоне, не задерживая ответ на создание заказа.
+    Готовая ссылка сохраняется в транзакцию и отправляется в OrderStatusConsumer
+    (событие order_payment_link), её же отдаёт orders/{id}/payment-link/.
+    Возвращает False, если аккаунта нет или ссылка по транзакции уже запрашивается.
+    """
+    if not payment_account:
+        logger.error(f"Не найден платёжный аккаунт для заведения {order.venue}")
+        return False
+
+    if not cache.add(payment_link_pending_key(transaction.id), 1, PAYMENT_PENDING_TIMEOUT):
+        return False
+
+    payload = build_payment_payload(transaction, order, payment_account)
+    _run(_deliver_payment_link(transaction.id, order, payload))
+    return True
+
+
+async def _deliver_payment_link(transaction_id, order, payload):
+    try:
+        pay_url = await request_payment_link(payload)
+        if pay_url:
+            await sync_to_async(_save_payment_url, thread_sensitive=False)(transaction_id, pay_url)
+            await notify_payment_link(order, pay_url)
+    except Exception:
+        logger.exception(f"Не удалось доставить ссылку на оплату, транзакция {transaction_id}")
+    finally:
+        await cache.adelete(payment_link_pending_key(transaction_id))
+
+
+def _save_payment_url(transaction_id, pay_url):
+    try:
+        Transaction.objects.filter(pk=transaction_id).update(payment_url=pay_url)
+    finally:
+        connection.close()
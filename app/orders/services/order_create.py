@@ -0,0 +1,155 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+
+from menu.models import Modificator, Product
+from orders.models import Order, OrderProduct, PaymentAccount, ServiceMode, Transaction
+
+VENUE_PRICING_TIMEOUT = 60 * 60  # сбрасывается сигналами при изменении заведения и платёжных аккаунтов
+CENT = Decimal('0.01')
+
+
+def _quantize(value: Decimal) -> Decimal:
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def venue_pricing_key(venue_id) -> str:
+    return f"venue_pricing:{venue_id}"
+
+
+def get_venue_pricing(venue) -> dict:
+    """
+    Сборы заведения и id его платёжного аккаунта — всё, что нужно для расчёта заказа.
+    Лежит в кеше, чтобы создание заказа не перечитывало их из БД. Сам аккаунт
+    с токеном в кеш не кладётся: create_order читает его из БД по id.
+    """
+    key = venue_pricing_key(venue.pk)
+    pricing = cache.get(key)
+    if pricing is None:
+        pricing = {
+            'service_fee_percent': {
+                ServiceMode.DELIVERY: Decimal(venue.delivery_service_fee_percent or 0),
+                ServiceMode.PICKUP: Decimal(venue.takeout_service_fee_percent or 0),
+                ServiceMode.ON_SITE: Decimal(venue.dinein_service_fee_percent or 0),
+            },
+            'delivery_fixed_fee': venue.delivery_fixed_fee or Decimal('0.00'),
+            'delivery_free_from': venue.delivery_free_from,
+            'payment_account_id': PaymentAccount.objects.filter(venue_id=venue.pk).values_list('pk', flat=True).first(),
+        }
+        cache.set(key, pricing, VENUE_PRICING_TIMEOUT)
+    return pricing
+
+
+def invalidate_venue_pricing(venue_id) -> None:
+    transaction.on_commit(lambda: cache.delete(venue_pricing_key(venue_id)))
+
+
+def resolve_order_items(items: list[dict]) -> list[dict]:
+    """
+    Подставляет в позиции корзины товары и модификаторы вместо их id —
+    по одному запросу на товары и на модификаторы, сколько бы ни было позиций.
+    """
+    products = Product.objects.in_bulk({item['product'] for item in items})
+    modificator_ids = {item['modificator'] for item in items if item.get('modificator')}
+    modificators = Modificator.objects.filter(is_hidden=False).in_bulk(modificator_ids) if modificator_ids else {}
+
+    does_not_exist = PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+    errors, has_errors = [], False
+    for item in items:
+        item_errors = {}
+        pk = item['product']
+        item['product'] = products.get(pk)
+        if item['product'] is None:
+            item_errors['product'] = [does_not_exist.format(pk_value=pk)]
+        if item.get('modificator'):
+            pk = item['modificator']
+            item['modificator'] = modificators.get(pk)
+            if item['modificator'] is None:
+                item_errors['modificator'] = [does_not_exist.format(pk_value=pk)]
+        errors.append(item_errors)
+        has_errors = has_errors or bool(item_errors)
+
+    if has_errors:
+        raise serializers.ValidationError(errors)
+    return items
+
+
+def calculate_order_prices(items: list[dict], service_mode, pricing: dict, bonus=0) -> dict:
+    """
+    Считает позиции и суммы заказа до записи в БД.
+    Возвращает цены позиций (lines) и поля заказа.
+    """
+    lines = []
+    products_total_price = Decimal('0.00')
+    for item in items:
+        modificator = item.get('modificator')
+        price = Decimal(modificator.price) if modificator else Decimal(item['product'].product_price)
+        total_price = _quantize(price * item['count'])
+        lines.append({**item, 'modificator': modificator, 'price': price, 'total_price': total_price})
+        products_total_price += total_price
+
+    # 🔹 сервисный сбор (берём по режиму)
+    service_fee_percent = pricing['service_fee_percent'].get(service_mode, Decimal('0'))
+    service_price = _quantize(products_total_price * service_fee_percent / Decimal('100'))
+
+    # 🔹 доставка (только если режим = доставка)
+    delivery_price = Decimal('0.00')
+    if service_mode == ServiceMode.DELIVERY:
+        delivery_free_from = pricing['delivery_free_from']
+        delivery_price = (
+            Decimal('0.00')
+            if delivery_free_from and products_total_price >= delivery_free_from
+            else pricing['delivery_fixed_fee']
+        )
+
+    # 🔹 итоговая сумма
+    total_price = _quantize(products_total_price + service_price + delivery_price)
+
+    prices = {
+        'lines': lines,
+        'service_price': service_price,
+        'delivery_price': delivery_price,
+    }
+
+    # 🔹 бонусы
+    if bonus:
+        applied_bonus = min(bonus, total_price)
+        total_price = _quantize(total_price - applied_bonus)
+        prices['bonus'] = applied_bonus
+
+    prices['total_price'] = total_price
+    return prices
+
+
+def create_order(validated_data: dict, items: list[dict]):
+    """
+    Создаёт заказ с позициями и транзакцию фиксированным числом запросов:
+    суммы считаются заранее, позиции пишутся одним bulk_create.
+    Возвращает (заказ, транзакция, платёжный аккаунт).
+    """
+    pricing = get_venue_pricing(validated_data['venue'])
+    service_mode = validated_data.get('service_mode', Order._meta.get_field('service_mode').default)
+    prices = calculate_order_prices(items, service_mode, pricing, validated_data.get('bonus', 0) or 0)
+    lines = prices.pop('lines')
+
+    with transaction.atomic():
+        order = Order.objects.create(**{**validated_data, **prices})
+        OrderProduct.objects.bulk_create([
+            OrderProduct(
+                order=order,
+                product=line['product'],
+                modificator=line['modificator'],
+                count=line['count'],
+                price=line['price'],
+                total_price=line['total_price'],
+            )
+            for line in lines
+        ])
+        transaction_obj = Transaction.objects.create(order=order, total_price=order.total_price)
+
+    payment_account_id = pricing['payment_account_id']
+    payment_account = PaymentAccount.objects.filter(pk=payment_account_id).first() if payment_account_id else None
+    return order, transaction_obj, payment_account
@@ -0,0 +1,32 @@
+from orders.models import OrderStatus
+from venues.models import Venue
+
+
+def resolve_venue_id(venue_slug: str) -> int | None:
+    return Venue.objects.filter(slug=venue_slug.lower()).values_list('id', flat=True).first()
+
+
+def filter_order_history(queryset, start, end, venue_slug=None, spot_id=None, table_id=None, phone=None):
+    """
+    Заказы для истории/планшетов персонала за [start, end) без ожидающих оплату.
+    Заведение сначала находится по слагу, а заказы фильтруются по venue_id без JOIN,
+    чтобы запрос шёл по частичному индексу order_venue_paid_created_idx
+    (по телефону — order_phone_created_idx, по столу — order_table_created_idx).
+    """
+    if venue_slug:
+        venue_id = resolve_venue_id(venue_slug)
+        if venue_id is None:
+            return queryset.none()
+        queryset = queryset.filter(venue_id=venue_id)
+    if spot_id:
+        queryset = queryset.filter(spot_id=spot_id)
+    if table_id:
+        queryset = queryset.filter(table_id=table_id)
+    if phone:
+        queryset = queryset.filter(phone=phone)
+
+    return (
+        queryset
+        .filter(created_at__gte=start, created_at__lt=end)
+        .exclude(status=OrderStatus.WAITING_FOR_PAYMENT)
+    )
@@ -0,0 +1,428 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal, ROUND_FLOOR
+
+import requests
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from account.models import ROLE_OWNER
+from orders.models import BonusHistory, Client, ClientVenueProfile, Order, OrderJob, ReceiptPrinter
+from orders.services.format_order_to_tg import format_order_details
+from orders.services.receipt import send_receipt_to_mqtt
+from services.pos_service_factory import POSServiceFactory
+from services.poster import PosterClientWithoutPhone
+from tg_bot.utils import send_order_notification
+
+logger = logging.getLogger(__name__)
+
+N8N_WEBHOOK_URL = "https://n8n.nexus.kg/webhook/payment_success"
+JOB_LEASE = timedelta(minutes=5)  # после этого зависшую задачу забирает другой воркер
+JOB_RETRY_BASE = 10  # секунд, дальше пауза удваивается
+JOB_RETRY_MAX = 60 * 60
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class OrderJobError(Exception):
+    """Шаг не выполнен и будет повторён."""
+
+
+# --- Постановка в очередь ---
+
+def enqueue_order_jobs(order, transaction_obj) -> None:
+    """
+    Ставит обработку оплаченного заказа в очередь. Вызывается в той же транзакции,
+    что и смена статуса: задачи появятся только вместе с ним. Повторный вебхук
+    по той же транзакции новых задач не создаёт (ключ идемпотентности).
+    После коммита задачи заказа сразу начинают выполняться в фоне,
+    всё, что не успело или упало, доделывает воркер run_order_jobs.
+    """
+    steps = [OrderJob.Step.POS_CLIENT, OrderJob.Step.TELEGRAM, OrderJob.Step.RECEIPT]
+    if order.is_tg_bot:
+        steps.append(OrderJob.Step.N8N)
+    _create_jobs(order.pk, transaction_obj.pk, steps)
+
+    transaction.on_commit(lambda: kick_order_jobs(order.pk))
+
+
+def _create_jobs(order_id, transaction_id, steps):
+    OrderJob.objects.bulk_create(
+        [
+            OrderJob(
+                order_id=order_id,
+                transaction_id=transaction_id,
+                step=step,
+                idempotency_key=f"{transaction_id}:{step}",
+            )
+            for step in steps
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ORDER_JOB_WORKERS,
+                thread_name_prefix="order-jobs",
+            )
+    return _executor
+
+
+def kick_order_jobs(order_id) -> None:
+    """Без ожидания выполняет готовые задачи заказа в фоновом пуле процесса."""
+    _get_executor().submit(_drain_order, order_id)
+
+
+def _drain_order(order_id):
+    try:
+        run_pending_jobs(order_id=order_id)
+    except Exception:
+        logger.exception(f"Failed to run jobs for order {order_id}")
+    finally:
+        connection.close()
+
+
+# --- Выполнение ---
+
+def claim_next_job(order_id=None) -> OrderJob | None:
+    """
+    Забирает одну готовую задачу. SKIP LOCKED позволяет нескольким воркерам
+    разбирать очередь параллельно, не блокируя друг друга.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        qs = OrderJob.objects.select_for_update(skip_locked=True).filter(
+            Q(status=OrderJob.Status.PENDING, run_after__lte=now)
+            | Q(status=OrderJob.Status.RUNNING, locked_until__lt=now)
+        )
+        if order_id is not None:
+            qs = qs.filter(order_id=order_id)
+        job = qs.order_by('run_after', 'id').first()
+        if job is None:
+            return None
+
+        job.status = OrderJob.Status.RUNNING
+        job.attempts += 1
+        job.started_at = now
+        job.locked_until = now + JOB_LEASE
+        job.save(update_fields=['status', 'attempts', 'started_at', 'locked_until', 'updated_at'])
+    return job
+
+
+def run_pending_jobs(order_id=None, limit=None) -> int:
+    """Выполняет готовые задачи, пока они есть. Возвращает число выполненных попыток."""
+    count = 0
+    while limit is None or count < limit:
+        job = claim_next_job(order_id)
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+
+def run_job(job: OrderJob) -> bool:
+    started = time.monotonic()
+    try:
+        STEP_HANDLERS[job.step](job)
+    except Exception as e:
+        _fail(job, e, _elapsed_ms(started))
+        return False
+
+    _complete(job, _elapsed_ms(started))
+    return True
+
+
+def _elapsed_ms(started):
+    return int((time.monotonic() - started) * 1000)
+
+
+def _complete(job, duration_ms):
+    with transaction.atomic():
+        job.status = OrderJob.Status.DONE
+        job.finished_at = timezone.now()
+        job.duration_ms = duration_ms
+        job.locked_until = None
+        job.last_error = None
+        job.save(update_fields=[
+            'status', 'finished_at', 'duration_ms', 'locked_until', 'last_error', 'result', 'updated_at'
+        ])
+        next_steps = STEP_NEXT.get(job.step)
+        if next_steps:
+            _create_jobs(job.order_id, job.transaction_id, next_steps)
+
+    logger.info(f"Order job {job.idempotency_key} done in {duration_ms} ms (attempt {job.attempts})")
+
+
+def _fail(job, error, duration_ms):
+    job.duration_ms = duration_ms
+    job.locked_until = None
+    job.last_error = f"{type(error).__name__}: {error}"
+    if job.attempts >= job.max_attempts:
+        job.status = OrderJob.Status.FAILED
+        job.finished_at = timezone.now()
+        logger.error(f"Order job {job.idempotency_key} failed after {job.attempts} attempts", exc_info=error)
+    else:
+        delay = min(JOB_RETRY_BASE * 2 ** (job.attempts - 1), JOB_RETRY_MAX)
+        job.status = OrderJob.Status.PENDING
+        job.run_after = timezone.now() + timedelta(seconds=delay)
+        logger.warning(f"Order job {job.idempotency_key} attempt {job.attempts} failed, retry in {delay}s: {error}")
+    job.save(update_fields=[
+        'status', 'run_after', 'finished_at', 'duration_ms', 'locked_until', 'last_error', 'result', 'updated_at'
+    ])
+
+
+def _load_order(job):
+    return (
+        Order.objects
+        .select_related('venue__pos_system', 'spot', 'table', 'client')
+        .prefetch_related('order_products__product')
+        .get(pk=job.order_id)
+    )
+
+
+# --- Шаги ---
+
+def run_pos_client_step(job):
+    """Отправка заказа в POS и создание/обновление клиента (через POS или локально)"""
+    order = _load_order(job)
+    venue = order.venue
+    pos_system_name = venue.pos_system.name.lower() if venue.pos_system else None
+    job.result = job.result or {}
+
+    if pos_system_name:
+        pos_service = POSServiceFactory.get_service(pos_system_name, venue.access_token)
+
+        if not order.external_id:
+            logger.info(f"Отправка заказа {order.id} в POS {pos_system_name}")
+            pos_response = pos_service.send_order_to_pos(order)
+            if not pos_response:
+                raise OrderJobError("POS не принял заказ")
+            if not pos_response.get("incoming_order_id"):
+                raise OrderJobError("Не получили external_id от POS")
+
+            # сохраняем сразу: при повторе шага заказ не уйдёт в POS второй раз
+            order.external_id = pos_response["incoming_order_id"]
+            job.result["pos_client_id"] = pos_response.get("client_id")
+            Order.objects.filter(pk=order.pk).update(external_id=order.external_id)
+            OrderJob.objects.filter(pk=job.pk).update(result=job.result)
+
+        pos_client_id = job.result.get("pos_client_id")
+        if not pos_client_id:
+            logger.info(f"Заказ {order.id} принят POS без клиента, клиента не привязываем")
+            return
+        try:
+            client = pos_service.get_or_create_client(venue, pos_client_id)
+        except PosterClientWithoutPhone as e:
+            # телефон в POS не появится от повторов: заказ остаётся без клиента
+            logger.warning(f"Заказ {order.id}: {e}")
+            job.result["client_skipped"] = str(e)
+            return
+        if not client:
+            raise OrderJobError("Не удалось создать/получить клиента из POS")
+    else:
+        logger.info(f"POS не подключён, ищем/создаём локального клиента для заказа {order.id}")
+        client = Client.objects.filter(phone_number=order.phone).first()
+        if not client:
+            client = Client.objects.create(phone_number=order.phone)
+
+    # профиль клиента в конкретном заведении
+    ClientVenueProfile.objects.get_or_create(
+        client=client,
+        venue=venue,
+        defaults={"bonus": 0, "total_payed_sum": 0},
+    )
+
+    Order.objects.filter(pk=order.pk).update(client=client)
+    job.result["client_id"] = client.pk
+
+
+def run_bonus_step(job):
+    """Списание и начисление бонусов, каждое не больше одного раза на заказ"""
+    order = _load_order(job)
+    client, venue = order.client, order.venue
+    if not client or not venue:
+        return
+
+    with transaction.atomic():
+        _apply_bonus_writeoff(order, client, venue)
+        _apply_bonus_accrual(order, client, venue)
+
+
+def _apply_bonus_writeoff(order, client, venue):
+    """Списание бонусов клиента после оплаты"""
+    amount = order.bonus or 0
+    if amount <= 0:
+        return
+    if BonusHistory.objects.filter(order=order, operation=BonusHistory.Operation.WRITE_OFF).exists():
+        return
+
+    # атомарное списание
+    updated = ClientVenueProfile.objects.filter(
+        client=client,
+        venue=venue,
+        bonus__gte=amount
+    ).update(bonus=F("bonus") - amount)
+
+    if not updated:
+        logger.warning("Недостаточно бонусов у клиента %s для списания", client.phone_number)
+        return
+
+    BonusHistory.objects.create(
+        client=client,
+        order=order,
+        venue=venue,
+        amount=-amount,
+        operation=BonusHistory.Operation.WRITE_OFF,
+        description=f"Списание {amount} бонусов при оплате заказа {order.id}",
+    )
+    logger.info("Списано %s бонусов у клиента %s", amount, client.phone_number)
+
+
+def _apply_bonus_accrual(order, client, venue):
+    """Начисление бонусов после успешной оплаты"""
+    if not venue.is_bonus_system_enabled:
+        return
+    if BonusHistory.objects.filter(order=order, operation=BonusHistory.Operation.ACCRUAL).exists():
+        return
+
+    percent = Decimal(str(venue.bonus_accrual_percent or 0))
+    if percent <= 0:
+        return
+
+    net_sum = Decimal(order.total_price)
+    accrued = int((net_sum * percent / Decimal("100")).to_integral_value(rounding=ROUND_FLOOR))
+    if accrued <= 0:
+        return
+
+    profile, created = ClientVenueProfile.objects.get_or_create(
+        client=client,
+        venue=venue,
+        defaults={"bonus": accrued, "total_payed_sum": int(net_sum)},
+    )
+
+    if not created:
+        ClientVenueProfile.objects.filter(id=profile.id).update(
+            bonus=F("bonus") + accrued,
+            total_payed_sum=F("total_payed_sum") + int(net_sum),
+        )
+
+    BonusHistory.objects.create(
+        client=client,
+        venue=venue,
+        order=order,
+        amount=accrued,
+        operation=BonusHistory.Operation.ACCRUAL,
+        description=f"Начислено {percent}% за заказ {order.id}",
+    )
+    logger.info("Начислено %s бонусов клиенту %s", accrued, client.phone_number)
+
+
+def run_telegram_step(job):
+    """Telegram владельцу"""
+    order = _load_order(job)
+    user_owner = order.venue.users.filter(role=ROLE_OWNER).first()
+    if not user_owner or not user_owner.tg_chat_id:
+        return
+
+    _send_at_most_once(
+        job,
+        lambda: send_order_notification(user_owner.tg_chat_id, format_order_details(order), order.id),
+        "Не удалось отправить уведомление в Telegram",
+    )
+
+
+def run_receipt_step(job):
+    """MQTT чек"""
+    order = _load_order(job)
+    # без принтера с топиком печатать некуда, повторы тут не помогут
+    receipt_printer = ReceiptPrinter.objects.filter(venue_id=order.venue_id).first()
+    if not receipt_printer or not receipt_printer.topic:
+        logger.warning(f"Чек заказа {order.id} не отправлен: у заведения нет принтера с топиком")
+        return
+
+    _send_at_most_once(job, lambda: send_receipt_to_mqtt(order, order.venue), "Не удалось отправить чек в MQTT")
+
+
+def _send_at_most_once(job, send, error_message):
+    """
+    Отправка без ключа идемпотентности на той стороне (Telegram, MQTT-принтер):
+    отметка о попытке пишется в задачу до вызова. Если воркер упадёт уже после
+    отправки, задачу по истечении аренды заберёт другой воркер, увидит отметку
+    и второй раз не отправит. Отказ, о котором send() сообщил сам, снимает отметку
+    и повторяется как обычно.
+    """
+    job.result = job.result or {}
+    if job.result.get("sent_at"):
+        logger.warning(f"Order job {job.idempotency_key}: отправка уже начиналась {job.result['sent_at']}, не повторяем")
+        return
+
+    job.result["sent_at"] = timezone.now().isoformat()
+    OrderJob.objects.filter(pk=job.pk).update(result=job.result)
+    if not send():
+        del job.result["sent_at"]
+        OrderJob.objects.filter(pk=job.pk).update(result=job.result)
+        raise OrderJobError(error_message)
+
+
+def run_n8n_step(job):
+    """Webhook в n8n"""
+    order = _load_order(job)
+    response = requests.post(N8N_WEBHOOK_URL, json=build_order_payload(order, job.transaction), timeout=20)
+    if response.status_code != 200:
+        raise OrderJobError(f"Ошибка webhook: {response.status_code} {response.text[:200]}")
+    logger.info("Webhook успешно отправлен в n8n")
+
+
+def build_order_payload(order, transaction_obj):
+    """Формирование payload для n8n"""
+    return {
+        "order_id": order.id,
+        "venue_id": order.venue.id,
+        "venue_name": order.venue.company_name,
+        "phone": order.phone,
+        "total_price": str(order.total_price),
+        "created_at": order.created_at.isoformat(),
+        "is_tg_bot": order.is_tg_bot,
+        "tg_redirect_url": order.tg_redirect_url,
+        "address": order.address,
+        "spot": order.spot.address if order.spot else None,
+        "service_mode": order.get_service_mode_display(),
+        "products": [
+            {
+                "product_name": op.product.product_name,
+                "count": op.count,
+                "price": str(op.total_price),
+            }
+            for op in order.order_products.all()
+        ],
+        "transaction": {
+            "id": transaction_obj.id,
+            "status": transaction_obj.status,
+            "amount": str(transaction_obj.total_price),
+        },
+    }
+
+
+STEP_HANDLERS = {
+    OrderJob.Step.POS_CLIENT: run_pos_client_step,
+    OrderJob.Step.BONUS: run_bonus_step,
+    OrderJob.Step.TELEGRAM: run_telegram_step,
+    OrderJob.Step.RECEIPT: run_receipt_step,
+    OrderJob.Step.N8N: run_n8n_step,
+}
+
+# шаги, которые ставятся в очередь после успешного выполнения шага (бонусам нужен клиент)
+STEP_NEXT = {
+    OrderJob.Step.POS_CLIENT: [OrderJob.Step.BONUS],
+}
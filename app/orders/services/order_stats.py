@@ -0,0 +1,116 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.models import Order, OrderDailyStats
+
+# поля заказа, от которых зависит его строка в OrderDailyStats
+ORDER_STATS_FIELDS = ('venue_id', 'created_at', 'status', 'total_price', 'bonus', 'tips_price')
+ORDER_STATS_VALUES = ('count', 'revenue', 'bonus', 'tips')
+
+
+def order_stats_snapshot(order) -> dict:
+    """Вклад заказа в сводку: строка (venue, day, status) и значения."""
+    return {
+        'venue_id': order.venue_id,
+        'day': timezone.localdate(order.created_at),
+        'status': order.status,
+        'count': 1,
+        'revenue': Decimal(order.total_price or 0),
+        'bonus': order.bonus or 0,
+        'tips': order.tips_price or 0,
+    }
+
+
+def stored_order_stats_snapshot(order_pk) -> dict | None:
+    """Вклад заказа по значениям из базы — до сохранения изменений."""
+    stored = Order.objects.filter(pk=order_pk).values(*ORDER_STATS_FIELDS).first()
+    if stored is None:
+        return None
+    return order_stats_snapshot(Order(**stored))
+
+
+def apply_order_stats_change(old: dict | None, new: dict | None) -> None:
+    """
+    Переносит вклад заказа из старой строки сводки в новую через F()-инкременты
+    в текущей транзакции: откатится сохранение заказа — откатится и сводка.
+    """
+    if old == new:
+        return
+    if old:
+        _add(old, -1)
+    if new:
+        _add(new, 1)
+
+
+def _add(snapshot, sign):
+    lookup = {'venue_id': snapshot['venue_id'], 'day': snapshot['day'], 'status': snapshot['status']}
+    deltas = {name: F(name) + sign * snapshot[name] for name in ORDER_STATS_VALUES}
+    if OrderDailyStats.objects.filter(**lookup).update(**deltas):
+        return
+    # первой строки за этот день ещё нет; параллельная вставка отсекается уникальным индексом
+    OrderDailyStats.objects.bulk_create([OrderDailyStats(**lookup)], ignore_conflicts=True)
+    OrderDailyStats.objects.filter(**lookup).update(**deltas)
+
+
+def rebuild_order_daily_stats(venue_id=None, start=None, end=None) -> dict:
+    """
+    Пересчитывает сводку по таблице заказов за дни [start, end) и исправляет
+    расхождения: недостающие строки создаются, неверные обновляются, лишние удаляются.
+    Возвращает число созданных, обновлённых и удалённых строк.
+    """
+    orders = Order.objects.all()
+    stats = OrderDailyStats.objects.all()
+    if venue_id:
+        orders = orders.filter(venue_id=venue_id)
+        stats = stats.filter(venue_id=venue_id)
+    if start:
+        orders = orders.filter(created_at__date__gte=start)
+        stats = stats.filter(day__gte=start)
+    if end:
+        orders = orders.filter(created_at__date__lt=end)
+        stats = stats.filter(day__lt=end)
+
+    with transaction.atomic():
+        # строки сводки блокируются до подсчёта: инкременты заказов, сохраняемых
+        # во время пересчёта, дождутся коммита и лягут уже поверх пересчитанных значений
+        existing = list(stats.select_for_update())
+        expected = {
+            (row['venue_id'], row['day'], row['status']): row
+            for row in (
+                orders
+                .annotate(day=TruncDate('created_at'))
+                .values('venue_id', 'day', 'status')
+                .annotate(
+                    count=Count('id'),
+                    revenue=Sum('total_price'),
+                    bonus=Sum('bonus'),
+                    tips=Sum('tips_price'),
+                )
+                .order_by()
+            )
+        }
+
+        to_update, to_delete = [], []
+        for row in existing:
+            values = expected.pop((row.venue_id, row.day, row.status), None)
+            if values is None:
+                # нулевые строки остаются после смены статуса заказов — это не расхождение
+                if any(getattr(row, name) for name in ORDER_STATS_VALUES):
+                    to_delete.append(row.pk)
+                continue
+            if any(getattr(row, name) != values[name] for name in ORDER_STATS_VALUES):
+                for name in ORDER_STATS_VALUES:
+                    setattr(row, name, values[name])
+                to_update.append(row)
+
+        OrderDailyStats.objects.filter(pk__in=to_delete).delete()
+        OrderDailyStats.objects.bulk_update(to_update, ORDER_STATS_VALUES, batch_size=500)
+        OrderDailyStats.objects.bulk_create(
+            [OrderDailyStats(**values) for values in expected.values()], batch_size=500
+        )
+
+    return {'created': len(expected), 'updated': len(to_update), 'deleted': len(to_delete)}
@@ -0,0 +1,181 @@
+import logging
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from account.models import ROLE_ADMIN, ROLE_OWNER
+from orders.models import Order, OrderStatus
+from orders.services.order_history import filter_order_history
+from services.cache_counter import incr_counter
+from venues.models import Spot, Venue
+
+logger = logging.getLogger(__name__)
+
+STAFF_FEED_DELTA_TIMEOUT = 60 * 60  # столько после разрыва можно догнать ленту по дельтам
+STAFF_FEED_SEQ_TIMEOUT = 60 * 60 * 24  # номер живёт дольше дельт, которые по нему ищутся
+STAFF_FEED_MAX_RESUME = 500  # больше пропущенных событий — дешевле прислать снапшот
+STAFF_FEED_SNAPSHOT_LIMIT = 200
+
+
+def staff_feed_group(venue_id, spot_id=None) -> str:
+    return f"staff_orders_{venue_id}_{spot_id}" if spot_id else f"staff_orders_{venue_id}"
+
+
+def staff_feed_seq_key(venue_id) -> str:
+    return f"staff_feed_seq:{venue_id}"
+
+
+def staff_feed_delta_key(venue_id, seq) -> str:
+    return f"staff_feed_delta:{venue_id}:{seq}"
+
+
+def get_staff_feed_seq(venue_id) -> int:
+    return cache.get(staff_feed_seq_key(venue_id)) or 0
+
+
+def resolve_staff_feed_scope(user, venue_id=None, spot_id=None) -> tuple[int, int | None] | None:
+    """
+    Какую ленту может слушать пользователь админки: (venue_id, spot_id или None).
+    Суперпользователь выбирает заведение сам, владелец и администратор видят только своё,
+    а привязанный к точке — только свою точку. None — доступа нет.
+    """
+    if not user or not user.is_authenticated or not user.is_active:
+        return None
+
+    if user.is_superuser:
+        if not venue_id or not Venue.objects.filter(pk=venue_id).exists():
+            return None
+    elif user.role in (ROLE_OWNER, ROLE_ADMIN) and user.venue_id:
+        if venue_id and int(venue_id) != user.venue_id:
+            return None
+        venue_id = user.venue_id
+        if user.spot_id:
+            if spot_id and int(spot_id) != user.spot_id:
+                return None
+            spot_id = user.spot_id
+    else:
+        return None
+
+    venue_id = int(venue_id)
+    if spot_id:
+        spot_id = int(spot_id)
+        if not Spot.objects.filter(pk=spot_id, venue_id=venue_id).exists():
+            return None
+    return venue_id, spot_id or None
+
+
+def staff_feed_order(order) -> dict:
+    """Заказ в ленте персонала: только то, что нужно кухне и залу."""
+    return {
+        'id': order.id,
+        'status': order.status,
+        'service_mode': order.service_mode,
+        'spot_id': order.spot_id,
+        'table_num': order.table.table_num if order.table else '',
+        'total_price': str(order.total_price),
+        'comment': order.comment,
+        'address': order.address,
+        'created_at': order.created_at.isoformat(),
+        'items': [
+            {
+                'product': order_product.product.product_name,
+                'count': order_product.count,
+                'modificator': order_product.modificator.name if order_product.modificator else None,
+            }
+            for order_product in order.order_products.all()
+        ],
+    }
+
+
+def staff_feed_orders():
+    return Order.objects.select_related('table').prefetch_related(
+        'order_products__product', 'order_products__modificator'
+    )
+
+
+def build_staff_feed_snapshot(venue_id, spot_id=None) -> dict:
+    """
+    Оплаченные заказы за сегодня. seq читается до выборки: события с seq не больше
+    него клиент может получить повторно и должен пропустить.
+    """
+    seq = get_staff_feed_seq(venue_id)
+    start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    orders = filter_order_history(
+        staff_feed_orders().filter(venue_id=venue_id), start, start + timedelta(days=1), spot_id=spot_id
+    )
+    return {
+        'type': 'snapshot',
+        'seq': seq,
+        'orders': [staff_feed_order(order) for order in orders[:STAFF_FEED_SNAPSHOT_LIMIT]],
+    }
+
+
+def staff_feed_deltas_since(venue_id, since, spot_id=None) -> list[dict] | None:
+    """
+    События ленты после since для переподключившегося клиента.
+    None — догнать нельзя (события уже вытеснены или их слишком много), нужен снапшот.
+    """
+    current = get_staff_feed_seq(venue_id)
+    if since > current or current - since > STAFF_FEED_MAX_RESUME:
+        return None
+
+    keys = [staff_feed_delta_key(venue_id, seq) for seq in range(since + 1, current + 1)]
+    found = cache.get_many(keys)
+    if len(found) < len(keys):
+        return None
+    # seq общий на заведение, поэтому у ленты точки в номерах бывают пропуски
+    return [found[key] for key in keys if not spot_id or found[key]['spot_id'] == spot_id]
+
+
+def publish_staff_order_change(order, previous_status) -> None:
+    """
+    После коммита отправляет в ленту персонала новый оплаченный заказ целиком
+    или смену статуса одной короткой дельтой. Неоплаченные заказы в ленту не попадают.
+    """
+    if order.status == OrderStatus.WAITING_FOR_PAYMENT:
+        return
+    if previous_status is None or previous_status == OrderStatus.WAITING_FOR_PAYMENT:
+        kind = 'order'
+    elif previous_status != order.status:
+        kind = 'status'
+    else:
+        return
+
+    order_id, venue_id, spot_id, status = order.pk, order.venue_id, order.spot_id, order.status
+    transaction.on_commit(lambda: _publish(kind, order_id, venue_id, spot_id, status))
+
+
+def _publish(kind, order_id, venue_id, spot_id, status):
+    try:
+        if kind == 'order':
+            order = staff_feed_orders().filter(pk=order_id).first()
+            if order is None:
+                return
+            delta = {'type': 'order', 'spot_id': spot_id, 'order': staff_feed_order(order)}
+        else:
+            delta = {'type': 'status', 'spot_id': spot_id, 'id': order_id, 'status': status}
+
+        delta['seq'] = _next_seq(venue_id)
+        cache.set(staff_feed_delta_key(venue_id, delta['seq']), delta, STAFF_FEED_DELTA_TIMEOUT)
+
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            logger.error("Channel layer is not configured.")
+            return
+        event = {'type': 'staff_order_event', 'delta': delta}
+        async_to_sync(channel_layer.group_send)(staff_feed_group(venue_id), event)
+        if spot_id:
+            async_to_sync(channel_layer.group_send)(staff_feed_group(venue_id, spot_id), event)
+    except Exception:
+        # лента — не повод ронять сохранение заказа; клиенты догонят её снапшотом
+        logger.exception(f"Не удалось отправить заказ {order_id} в ленту персонала")
+
+
+def _next_seq(venue_id) -> int:
+    # счётчик стартует от текущего времени: после истечения ключа
+    # новые номера не совпадут с ещё живыми дельтами прежних номеров
+    return incr_counter(staff_feed_seq_key(venue_id), STAFF_FEED_SEQ_TIMEOUT)
@@ -0,0 +1,33 @@
+from django.db import IntegrityError, transaction
+
+from orders.models import WebhookEvent
+
+
+def bakai_event_key(data) -> str | None:
+    operation_id, operation_state = data.get("operation_id"), data.get("operation_state")
+    if not operation_id or not operation_state:
+        return None
+    return f"{operation_id}:{operation_state}"
+
+
+def poster_event_key(post_data) -> str:
+    return f"{post_data['account']}:{post_data['object']}:{post_data['object_id']}:{post_data['action']}:{post_data['time']}"
+
+
+def webhook_event_seen(source, event_key) -> bool:
+    """Быстрая проверка по уникальному индексу, без блокировок."""
+    return WebhookEvent.objects.filter(source=source, event_key=event_key).exists()
+
+
+def record_webhook_event(source, event_key) -> bool:
+    """
+    Записывает событие в журнал. Вызывается внутри транзакции обработки:
+    если обработка упадёт, запись откатится и повторная доставка пройдёт заново.
+    Возвращает False, если такое событие уже обработано (в том числе параллельным запросом).
+    """
+    try:
+        with transaction.atomic():
+            WebhookEvent.objects.create(source=source, event_key=event_key)
+    except IntegrityError:
+        return False
+    return True
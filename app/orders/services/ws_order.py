@@ -25,3 +25,20 @@ async def notify_order_status(order):
             'service_mode': order.service_mode,
         }
     )
+
+
+async def notify_payment_link(order, payment_url):
+    if channel_layer is None:
+        logger.error("Channel layer is not configured.")
+        return
+
+    phone_number = re.sub(r'\D', '', order.phone)
+
+    await channel_layer.group_send(
+        f'orders_{phone_number}',
+        {
+            'type': 'order_payment_link',
+            'order_id': order.id,
+            'payment_url': payment_url,
+        }
+    )
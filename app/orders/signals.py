@@ -0,0 +1,51 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from orders.models import Order, PaymentAccount
+from orders.services.order_create import invalidate_venue_pricing
+from orders.services.order_stats import (
+    apply_order_stats_change, order_stats_snapshot, stored_order_stats_snapshot
+)
+from orders.services.staff_feed import publish_staff_order_change
+from venues.models import Venue
+
+# update_fields, при которых заказ может перейти в другую строку OrderDailyStats
+# или в ленте персонала (статус)
+ORDER_STATS_UPDATE_FIELDS = {'venue', 'venue_id', 'created_at', 'status', 'total_price', 'bonus', 'tips_price'}
+
+
+@receiver(post_save, sender=Venue)
+def invalidate_pricing_on_venue_change(sender, instance, **kwargs):
+    invalidate_venue_pricing(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=PaymentAccount)
+def invalidate_pricing_on_payment_account_change(sender, instance, **kwargs):
+    invalidate_venue_pricing(instance.venue_id)
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_stats(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & ORDER_STATS_UPDATE_FIELDS:
+        instance._stored_stats = False  # поля сводки не меняются
+        return
+    instance._stored_stats = stored_order_stats_snapshot(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=Order)
+def track_order_changes(sender, instance, raw=False, **kwargs):
+    old = instance.__dict__.pop('_stored_stats', False)
+    if raw or old is False:
+        return
+    apply_order_stats_change(old, order_stats_snapshot(instance))
+    publish_staff_order_change(instance, old['status'] if old else None)
+
+
+@receiver(post_delete, sender=Order)
+def remove_order_stats(sender, instance, origin=None, **kwargs):
+    # при удалении заведения его сводка удаляется каскадом вместе с заказами
+    if isinstance(origin, Venue) or getattr(origin, 'model', None) is Venue:
+        return
+    apply_order_stats_change(order_stats_snapshot(instance), None)
@@ -1,3 +1,312 @@
-from django.test import TestCase
+import hashlib
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.models import ROLE_OWNER, User
+from menu.models import Modificator, Product
+from orders.models import Client, Order, OrderDailyStats, OrderJob, OrderStatus, Transaction, WebhookEvent
+from orders.services import (
+    bakai_event_key, create_order, filter_order_history, get_venue_pricing, poster_event_key,
+    rebuild_order_daily_stats, resolve_order_items
+)
+from venues.models import POSSystem, Table, Venue
+
+
+class OrderHistoryQueryPlanTests(TestCase):
+    """
+    Запросы истории заказов (планшеты персонала опрашивают её постоянно)
+    должны идти по составным индексам Order, а не сканировать всю таблицу.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.venue = Venue.objects.create(company_name='Cafe', slug='plan-cafe')
+        cls.table = Table.objects.create(venue=cls.venue, table_num='1')
+        now = timezone.now()
+        Order.objects.bulk_create([
+            Order(
+                venue=cls.venue,
+                table=cls.table if i % 2 else None,
+                phone=f'+99655500{i:04d}',
+                status=OrderStatus.WAITING_FOR_PAYMENT if i % 5 == 0 else OrderStatus.NEW,
+            )
+            for i in range(50)
+        ])
+        cls.start = now - timedelta(days=1)
+        cls.end = now + timedelta(days=1)
+
+    def assertPlanUsesIndex(self, queryset, index_name):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # на маленькой тестовой таблице планировщику дешевле seq scan
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def history(self, **filters):
+        return filter_order_history(Order.objects.all(), self.start, self.end, **filters)
+
+    def test_venue_history_uses_partial_index(self):
+        self.assertPlanUsesIndex(self.history(venue_slug='Plan-Cafe'), 'order_venue_paid_created_idx')
+
+    def test_venue_is_filtered_by_id_without_join(self):
+        sql = str(self.history(venue_slug='plan-cafe').query)
+        self.assertNotIn('venues_venue', sql)
+
+    def test_unknown_venue_returns_nothing(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(list(self.history(venue_slug='missing')), [])
+
+    def test_phone_history_uses_phone_index(self):
+        self.assertPlanUsesIndex(self.history(phone='+996555000001'), 'order_phone_created_idx')
+
+    def test_table_history_uses_table_index(self):
+        self.assertPlanUsesIndex(self.history(table_id=self.table.pk), 'order_table_created_idx')
+
+    def test_waiting_for_payment_is_excluded(self):
+        orders = list(self.history(venue_slug='plan-cafe'))
+        self.assertEqual(len(orders), 40)
+        self.assertNotIn(OrderStatus.WAITING_FOR_PAYMENT, {order.status for order in orders})
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CreateOrderQueryCountTests(TestCase):
+    """Создание заказа не должно делать запросов на каждую позицию корзины."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.venue = Venue.objects.create(company_name='Cafe', slug='cart-cafe')
+        cls.products = [
+            Product.objects.create(venue=cls.venue, product_name=f'Блюдо {i}', product_price=100 + i)
+            for i in range(10)
+        ]
+        cls.modificators = [
+            Modificator.objects.create(product=product, name='Большой', price=150) for product in cls.products
+        ]
+
+    def setUp(self):
+        cache.clear()
+        get_venue_pricing(self.venue)  # сборы заведения кешируются один раз, а не на каждый заказ
+        self.create_order_queries(1)  # первый заказ дня ещё создаёт строку сводки OrderDailyStats
+
+    def cart(self, size):
+        return [
+            {'product': product.pk, 'modificator': None if i % 2 else modificator.pk, 'count': i + 1}
+            for i, (product, modificator) in enumerate(zip(self.products[:size], self.modificators))
+        ]
+
+    def create_order_queries(self, size):
+        with CaptureQueriesContext(connection) as queries:
+            items = resolve_order_items(self.cart(size))
+            order, _, _ = create_order({'venue': self.venue, 'phone': '+996555000001'}, items)
+        self.assertEqual(order.order_products.count(), size)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_cart_size(self):
+        self.assertEqual(self.create_order_queries(1), self.create_order_queries(10))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ClientOrdersApiTests(TestCase):
+    """История заказов клиента: доступ только персоналу и курсорная пагинация по (created_at, id)."""
+
+    url = '/api/v2/clients/%2B996700123456/orders/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.venue = Venue.objects.create(company_name='Cafe', slug='client-cafe')
+        cls.other_venue = Venue.objects.create(company_name='Other', slug='client-other')
+        cls.client_obj = Client.objects.create(phone_number='+996700123456')
+        cls.owner = User.objects.create_user(
+            email='owner@example.com', phone_number='+996700000101', full_name='Owner',
+            role=ROLE_OWNER, venue=cls.venue,
+        )
+        cls.guest = User.objects.create_user(email='guest@example.com', phone_number='+996700000102', full_name='Guest')
+
+        cls.now = timezone.now()
+        orders = Order.objects.bulk_create([
+            Order(venue=cls.venue, client=cls.client_obj, phone='+996700123456', status=OrderStatus.NEW)
+            for _ in range(25)
+        ])
+        # у первых десяти одинаковое время — порядок между ними задаёт id
+        for i, order in enumerate(orders):
+            order.created_at = cls.now if i < 10 else cls.now - timedelta(minutes=i)
+        Order.objects.bulk_update(orders, ['created_at'])
+        Order.objects.create(venue=cls.other_venue, client=cls.client_obj, phone='+996700123456')
+
+    def get(self, url, user=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'} if user else {}
+        return self.client.get(url, **headers)
+
+    def expected_ids(self):
+        return list(
+            Order.objects.filter(venue=self.venue).order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def walk(self, url, on_page=None):
+        ids = []
+        while url:
+            response = self.get(url, self.owner)
+            self.assertEqual(response.status_code, 200)
+            ids += [order['id'] for order in response.json()['results']]
+            url = response.json()['next']
+            if on_page:
+                on_page()
+        return ids
+
+    def test_anonymous_is_rejected(self):
+        self.assertEqual(self.get(self.url).status_code, 401)
+
+    def test_user_without_venue_role_is_forbidden(self):
+        self.assertEqual(self.get(self.url, self.guest).status_code, 403)
+
+    def test_staff_sees_only_own_venue(self):
+        response = self.get(f'{self.url}?limit=100', self.owner)
+        self.assertEqual(response.status_code, 200)
+        self.assertCountEqual([order['id'] for order in response.json()['results']], self.expected_ids())
+
+    def test_cursor_walks_ties_in_id_order(self):
+        ids = self.walk(f'{self.url}?pagination=cursor&limit=7')
+        self.assertEqual(ids, self.expected_ids())
+
+    def test_cursor_is_stable_across_inserts(self):
+        expected = self.expected_ids()
+        inserted = []
+
+        def insert_newer_order():
+            # новый заказ новее всех прочитанных и не должен сдвигать следующие страницы
+            inserted.append(Order.objects.create(venue=self.venue, client=self.client_obj, phone='+996700123456').pk)
+
+        ids = self.walk(f'{self.url}?pagination=cursor&limit=7', on_page=insert_newer_order)
+        self.assertEqual(ids, expected)
+        self.assertFalse(set(ids) & set(inserted))
+
+
+class OrderDailyStatsTests(TestCase):
+    """Сводка, которую сигналы ведут инкрементами, совпадает с агрегатом по таблице заказов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.venue = Venue.objects.create(company_name='Cafe', slug='stats-cafe')
+        cls.other_venue = Venue.objects.create(company_name='Other', slug='stats-other')
+
+    def create_order(self, venue=None, **fields):
+        fields = {'phone': '+996700000201', 'status': OrderStatus.NEW, 'total_price': 500, **fields}
+        return Order.objects.create(venue=venue or self.venue, **fields)
+
+    def live_totals(self):
+        rows = (
+            Order.objects
+            .filter(venue__in=[self.venue, self.other_venue])
+            .annotate(day=TruncDate('created_at'))
+            .values('venue_id', 'day', 'status')
+            .annotate(count=Count('id'), revenue=Sum('total_price'), bonus=Sum('bonus'), tips=Sum('tips_price'))
+            .order_by()
+        )
+        return {
+            (row['venue_id'], row['day'], row['status']): (row['count'], row['revenue'], row['bonus'], row['tips'])
+            for row in rows
+        }
+
+    def stored_totals(self):
+        # после переходов между статусами остаются нулевые строки — в агрегате их нет
+        return {
+            (row.venue_id, row.day, row.status): (row.count, row.revenue, row.bonus, row.tips)
+            for row in OrderDailyStats.objects.filter(venue__in=[self.venue, self.other_venue]).exclude(count=0)
+        }
+
+    def test_rollup_matches_live_aggregate(self):
+        paid = [self.create_order(total_price=100 * i, bonus=i, tips_price=10) for i in range(1, 6)]
+        self.create_order(status=OrderStatus.WAITING_FOR_PAYMENT)
+        self.create_order(venue=self.other_venue, status=OrderStatus.COMPLETED, total_price=900)
+
+        # отмена оплаченного заказа переносит его в строку CANCELLED
+        paid[0].status = OrderStatus.CANCELLED
+        paid[0].save(update_fields=['status'])
+        # возврат части суммы и списанных бонусов
+        paid[1].total_price = 50
+        paid[1].bonus = 0
+        paid[1].save()
+        # заказ за вчера: изменённая дата переносит его в другой день
+        paid[2].created_at = timezone.now() - timedelta(days=1)
+        paid[2].save(update_fields=['created_at'])
+        paid[3].delete()
+        # поля вне сводки строку не трогают
+        paid[4].comment = 'Без лука'
+        paid[4].save(update_fields=['comment'])
+
+        self.assertEqual(self.stored_totals(), self.live_totals())
+        for venue in (self.venue, self.other_venue):
+            self.assertEqual(rebuild_order_daily_stats(venue.pk), {'created': 0, 'updated': 0, 'deleted': 0})
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, POSTER_APPLICATION_SECRET='poster-secret')
+class WebhookReplayTests(TestCase):
+    """Повторная доставка вебхука отвечает 200, но второй раз ничего не меняет."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.venue = Venue.objects.create(
+            company_name='Cafe', slug='webhook-cafe', account_number='webhook-account', access_token='token',
+            pos_system=POSSystem.objects.get_or_create(name='Poster')[0],
+        )
+        cls.order = Order.objects.create(venue=cls.venue, phone='+996700000301', external_id='77', total_price=500)
+        cls.transaction = Transaction.objects.create(order=cls.order, total_price=500)
+
+    def post_twice(self, url, payload, between=None):
+        for attempt in range(2):
+            response = self.client.post(url, payload, content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+            if between and not attempt:
+                between()
+
+    def reset_order_status(self, status):
+        # мимо сигналов: повтор, применивший событие заново, снова сменил бы статус
+        Order.objects.filter(pk=self.order.pk).update(status=status)
+
+    def test_bakai_replay_enqueues_jobs_once(self):
+        payload = {'operation_id': self.transaction.pk, 'operation_state': 'success'}
+        self.post_twice(
+            '/api/v2/payment/webhook/', payload,
+            between=lambda: self.reset_order_status(OrderStatus.WAITING_FOR_PAYMENT),
+        )
+
+        events = WebhookEvent.objects.filter(source=WebhookEvent.Source.BAKAI, event_key=bakai_event_key(payload))
+        self.assertEqual(events.count(), 1)
+        self.assertEqual(
+            OrderJob.objects.filter(order=self.order, step=OrderJob.Step.POS_CLIENT).count(), 1
+        )
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, OrderStatus.WAITING_FOR_PAYMENT)
+
+    def poster_payload(self):
+        payload = {
+            'account': 'webhook', 'account_number': 'webhook-account', 'object': 'incoming_order',
+            'object_id': 77, 'action': 'changed', 'time': 1700000000,
+        }
+        verify = ';'.join(str(payload[name]) for name in ('account', 'object', 'object_id', 'action'))
+        payload['verify'] = hashlib.md5(f"{verify};;{payload['time']};poster-secret".encode()).hexdigest()
+        return payload
+
+    @mock.patch('services.poster.PosterService.get_incoming_order_by_id', return_value={'status': OrderStatus.READY})
+    def test_poster_replay_updates_order_once(self, get_incoming_order):
+        payload = self.poster_payload()
+        self.post_twice(
+            '/api/v2/poster-webhook/', payload,
+            between=lambda: self.reset_order_status(OrderStatus.NEW),
+        )
+
+        self.assertEqual(get_incoming_order.call_count, 1)
+        events = WebhookEvent.objects.filter(source=WebhookEvent.Source.POSTER, event_key=poster_event_key(payload))
+        self.assertEqual(events.count(), 1)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, OrderStatus.NEW)
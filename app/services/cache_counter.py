@@ -0,0 +1,34 @@
+import time
+
+from django.core.cache import cache
+
+
+def counter_start() -> int:
+    # Счётчик начинается с текущего времени в микросекундах: если ключ истёк
+    # или его вытеснили из Redis, новые значения всё равно больше любых прежних
+    # и не совпадут с ещё живыми ключами, построенными на старых значениях.
+    return time.time_ns() // 1000
+
+
+def get_counter(key: str, timeout: int) -> int:
+    """Текущее значение счётчика; отсутствующий ключ заводится от counter_start()."""
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, counter_start(), timeout)
+        value = cache.get(key)
+    return value
+
+
+def incr_counter(key: str, timeout: int) -> int:
+    """
+    Увеличивает счётчик одним INCR и продлевает ключ на timeout секунд.
+    Из-за старта от времени истечение ключа безопасно, поэтому без timeout=None:
+    ключи мусорных заведений и аккаунтов со временем уходят из Redis сами.
+    """
+    try:
+        value = cache.incr(key)
+    except ValueError:
+        cache.add(key, counter_start(), timeout)
+        value = cache.incr(key)
+    cache.touch(key, timeout)
+    return value
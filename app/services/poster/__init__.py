@@ -1 +1,5 @@
-from .service import *
\ No newline at end of file
+from .cache import *
+from .clients import *
+from .service import *
+from .sync import *
+from .sync_worker import *
\ No newline at end of file
@@ -0,0 +1,52 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+
+from services.cache_counter import get_counter, incr_counter
+
+# endpoint -> сколько секунд хранить ответ; остальные запросы в Poster не кешируются
+POSTER_CACHE_TTL = {
+    'settings.getAllSettings': 60 * 60,
+    'spots.getSpots': 10 * 60,
+    'spots.getSpotTablesHalls': 10 * 60,
+    'spots.getTableHallTables': 10 * 60,
+    'clients.getClient': 60,
+}
+# версия живёт дольше любого из TTL выше: пока она в кеше, ответы сбрасываются её сменой
+POSTER_CACHE_VERSION_TIMEOUT = 60 * 60 * 24
+# объекты вебхука Poster, после изменения которых сбрасывается весь кеш аккаунта
+POSTER_REFERENCE_OBJECTS = ('spot', 'hall', 'table', 'settings')
+
+
+def poster_account_key(api_token: str) -> str:
+    # токен в ключи кеша не попадает, аккаунт Poster определяется по его хешу
+    return hashlib.sha256(api_token.encode()).hexdigest()[:16]
+
+
+def poster_cache_version_key(api_token: str) -> str:
+    return f"poster_cache_version:{poster_account_key(api_token)}"
+
+
+def get_poster_cache_version(api_token: str) -> int:
+    return get_counter(poster_cache_version_key(api_token), POSTER_CACHE_VERSION_TIMEOUT)
+
+
+def poster_cache_key(api_token: str, endpoint: str, params: dict | None = None) -> str:
+    # id приходят то числом, то строкой, в ключе они одинаковые
+    params = {name: str(value) for name, value in (params or {}).items()}
+    params_hash = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return ":".join([
+        "poster", poster_account_key(api_token), str(get_poster_cache_version(api_token)), endpoint, params_hash,
+    ])
+
+
+def invalidate_poster_cache(api_token: str, endpoint: str | None = None, params: dict | None = None) -> None:
+    """
+    Сбрасывает закешированные ответы Poster аккаунта: один запрос,
+    если передан endpoint, иначе все сразу сменой версии.
+    """
+    if endpoint:
+        cache.delete(poster_cache_key(api_token, endpoint, params))
+        return
+    incr_counter(poster_cache_version_key(api_token), POSTER_CACHE_VERSION_TIMEOUT)
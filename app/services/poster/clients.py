@@ -0,0 +1,130 @@
+import hashlib
+import json
+import logging
+from decimal import Decimal
+
+from phonenumber_field.phonenumber import to_python as to_phone_number
+
+from orders.models import Client, ClientVenueProfile
+
+logger = logging.getLogger(__name__)
+
+CLIENT_PAGE_SIZE = 500
+
+
+class PosterClientWithoutPhone(Exception):
+    """У клиента Poster нет корректного телефона: сохранить его нельзя, и повтор тут не поможет."""
+
+# поля клиента, которые приходят из POS и перезаписываются при синхронизации
+POS_CLIENT_FIELDS = (
+    'external_id', 'firstname', 'lastname', 'patronymic', 'phone', 'email',
+    'birthday', 'client_sex', 'country', 'city', 'address',
+)
+
+
+def poster_client_values(poster_client: dict) -> dict:
+    """Поля Client из ответа clients.getClient / clients.getClients."""
+    birthday = poster_client.get("birthday")
+    return {
+        'external_id': str(poster_client.get("client_id") or ''),
+        'firstname': poster_client.get("firstname", ""),
+        'lastname': poster_client.get("lastname", ""),
+        'patronymic': poster_client.get("patronymic", ""),
+        'phone': poster_client.get("phone"),
+        'email': poster_client.get("email") or None,
+        'birthday': birthday if birthday and birthday != "0000-00-00" else None,
+        'client_sex': int(poster_client.get("client_sex") or 0),
+        'country': poster_client.get("country", ""),
+        'city': poster_client.get("city", ""),
+        'address': poster_client.get("address", ""),
+    }
+
+
+def pos_client_hash(values: dict) -> str:
+    return hashlib.sha256(
+        json.dumps([values[name] for name in POS_CLIENT_FIELDS], default=str).encode()
+    ).hexdigest()
+
+
+def upsert_poster_clients(venue, poster_clients) -> tuple[dict, dict]:
+    """
+    Сохраняет клиентов из Poster пачкой: INSERT ... ON CONFLICT (phone_number) DO UPDATE
+    только для новых и изменившихся (по pos_hash), плюс профили в заведении.
+    Профиль создаётся с бонусами и суммой покупок из Poster, существующий не меняется.
+    Возвращает клиентов по номеру телефона в E.164 и счётчики.
+    """
+    rows = {}
+    skipped = 0
+    for poster_client in poster_clients:
+        phone_number = to_phone_number(poster_client.get("phone_number") or None)
+        if not phone_number or not phone_number.is_valid():
+            skipped += 1
+            continue
+        rows[phone_number.as_e164] = poster_client
+
+    existing = {
+        str(client.phone_number): client
+        for client in Client.objects.filter(phone_number__in=list(rows))
+    }
+
+    clients, to_upsert = {}, []
+    for phone_number, poster_client in rows.items():
+        values = poster_client_values(poster_client)
+        pos_hash = pos_client_hash(values)
+        client = existing.get(phone_number)
+        if client and client.pos_hash == pos_hash:
+            clients[phone_number] = client
+            continue
+        client = Client(phone_number=phone_number, pos_hash=pos_hash, **values)
+        to_upsert.append(client)
+        clients[phone_number] = client
+
+    Client.objects.bulk_create(
+        to_upsert,
+        batch_size=CLIENT_PAGE_SIZE,
+        update_conflicts=True,
+        unique_fields=['phone_number'],
+        update_fields=[*POS_CLIENT_FIELDS, 'pos_hash', 'updated_at'],
+    )
+
+    profiles = [
+        ClientVenueProfile(
+            client_id=clients[phone_number].pk,
+            venue=venue,
+            bonus=int(Decimal(poster_client.get("bonus") or 0)),
+            total_payed_sum=int(Decimal(poster_client.get("total_payed_sum") or 0) / 100),
+        )
+        for phone_number, poster_client in rows.items()
+    ]
+    ClientVenueProfile.objects.bulk_create(profiles, batch_size=CLIENT_PAGE_SIZE, ignore_conflicts=True)
+
+    created = sum(1 for client in to_upsert if str(client.phone_number) not in existing)
+    stats = {
+        'created': created,
+        'updated': len(to_upsert) - created,
+        'unchanged': len(rows) - len(to_upsert),
+        'skipped': skipped,
+    }
+    return clients, stats
+
+
+def import_poster_clients(venue, pos_service, page_size=CLIENT_PAGE_SIZE) -> dict:
+    """Переносит всю клиентскую базу заведения из Poster постранично (clients.getClients)."""
+    totals = {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+    offset = 0
+    while True:
+        page = pos_service.get_clients(offset=offset, num=page_size)
+        if page is None:
+            raise RuntimeError(f"Poster не вернул клиентов, offset={offset}")
+        if not page:
+            break
+
+        _, stats = upsert_poster_clients(venue, page)
+        for name, count in stats.items():
+            totals[name] += count
+        logger.info(f"Импорт клиентов заведения {venue.pk}: offset={offset}, {stats}")
+
+        if len(page) < page_size:
+            break
+        offset += page_size
+    return totals
@@ -3,9 +3,14 @@ from decimal import Decimal
 import requests
 import logging
 
+from django.core.cache import cache
+
 from menu.models import Category, Product, Modificator
-from orders.models import Client, ClientVenueProfile
+from orders.models import Client
 from venues.models import Spot, Table, Hall
+from .cache import POSTER_CACHE_TTL, poster_cache_key
+from .clients import PosterClientWithoutPhone, upsert_poster_clients
+from .transport import poster_session, poster_timeout
 
 logger = logging.getLogger(__name__)
 
@@ -14,15 +19,32 @@ class PosterService:
     BASE_URL = 'https://joinposter.com'
     API_URL = f"{BASE_URL}/api/"
 
-    def __init__(self, api_token):
+    def __init__(self, api_token, use_cache=True):
         self.API_TOKEN = api_token
+        self.use_cache = use_cache
 
     def get(self, endpoint, params=None):
-        """Метод для отправки GET запросов."""
-        params = params or {}
-        params["token"] = self.API_TOKEN
+        """
+        Метод для отправки GET запросов.
+        Справочные данные (настройки, точки, залы, столы, клиент) читаются
+        через кеш на POSTER_CACHE_TTL секунд, сбрасывает его вебхук Poster.
+        """
+        ttl = POSTER_CACHE_TTL.get(endpoint) if self.use_cache else None
+        if not ttl:
+            return self._get(endpoint, params)
+
+        key = poster_cache_key(self.API_TOKEN, endpoint, params)
+        data = cache.get(key)
+        if data is None:
+            data = self._get(endpoint, params)
+            if data is not None:  # ошибки не кешируем
+                cache.set(key, data, ttl)
+        return data
+
+    def _get(self, endpoint, params=None):
+        params = {**(params or {}), "token": self.API_TOKEN}
         try:
-            response = requests.get(f"{self.API_URL}{endpoint}", params=params)
+            response = poster_session().get(f"{self.API_URL}{endpoint}", params=params, timeout=poster_timeout())
             response.raise_for_status()  # Генерирует исключение для кода состояния >= 400
             return response.json().get('response', [])
         except requests.exceptions.RequestException as e:
@@ -34,7 +56,9 @@ class PosterService:
         params["token"] = self.API_TOKEN
 
         try:
-            response = requests.post(f"{self.API_URL}{endpoint}", params=params, json=data)
+            response = poster_session().post(
+                f"{self.API_URL}{endpoint}", params=params, json=data, timeout=poster_timeout()
+            )
             logger.info(response.json())
             response.raise_for_status()
             return response.json().get('response', [])
@@ -87,8 +111,8 @@ class PosterService:
             weight=product_data.get('out'),
             hidden=product_data.get('hidden'),
             venue=venue,
-            category=args[0],
         )
+        new_product.categories.add(args[0])
         spots = args[1]
         new_product.spots.set(spots)
 
@@ -182,75 +206,23 @@ class PosterService:
         return response
 
     def get_or_create_client(self, venue, poster_client_id):
-        """Получение или создание клиента из Poster и его профиля в конкретном заведении"""
-
-        poster_client_data = self.get_client_by_id(poster_client_id)[0]
-
-        # --- Находим клиента в целом в системе (по external_id или, если нет, по телефону)
-        client = Client.objects.filter(external_id=poster_client_id).first()
-
-        if not client and poster_client_data.get("phone_number"):
-            client = Client.objects.filter(phone_number=poster_client_data["phone_number"]).first()
-
+        """
+        Получение или создание клиента из Poster и его профиля в конкретном заведении.
+        Уже сохранённый клиент находится по id в POS без запроса в Poster.
+        None — Poster не ответил; PosterClientWithoutPhone — сохранить клиента нельзя.
+        """
+        client = Client.objects.filter(external_id=str(poster_client_id)).first()
         if client:
-            # обновляем общие поля
-            client.external_id = poster_client_data.get("client_id", client.external_id)
-            client.firstname = poster_client_data.get("firstname", "")
-            client.lastname = poster_client_data.get("lastname", "")
-            client.patronymic = poster_client_data.get("patronymic", "")
-            client.phone = poster_client_data.get("phone")
-            client.phone_number = poster_client_data.get("phone_number")
-            client.email = poster_client_data.get("email") or None
-            client.birthday = (
-                poster_client_data.get("birthday")
-                if poster_client_data.get("birthday") and poster_client_data.get("birthday") != "0000-00-00"
-                else None
-            )
-            client.client_sex = int(poster_client_data.get("client_sex", 0))
-            client.country = poster_client_data.get("country", "")
-            client.city = poster_client_data.get("city", "")
-            client.address = poster_client_data.get("address", "")
-            client.save()
+            return client
 
-        else:
-            # создаём нового клиента без привязки к venue
-            client = Client.objects.create(
-                external_id=poster_client_data.get("client_id"),
-                firstname=poster_client_data.get("firstname", ""),
-                lastname=poster_client_data.get("lastname", ""),
-                patronymic=poster_client_data.get("patronymic", ""),
-                phone=poster_client_data.get("phone"),
-                phone_number=poster_client_data.get("phone_number"),
-                email=poster_client_data.get("email") or None,
-                birthday=(
-                    poster_client_data.get("birthday")
-                    if poster_client_data.get("birthday") and poster_client_data.get("birthday") != "0000-00-00"
-                    else None
-                ),
-                client_sex=int(poster_client_data.get("client_sex", 0)),
-                country=poster_client_data.get("country", ""),
-                city=poster_client_data.get("city", ""),
-                address=poster_client_data.get("address", ""),
-            )
-
-        # --- Обновляем/создаём профиль клиента в этом заведении
-        profile, created = ClientVenueProfile.objects.get_or_create(
-            client=client,
-            venue=venue,
-            defaults={
-                "bonus": Decimal(poster_client_data.get("bonus", 0)),
-                "total_payed_sum": Decimal(poster_client_data.get("total_payed_sum", 0)) / 100,
-            }
-        )
-
-        # if not created:
-        #     # если профиль уже есть → обновляем бонусы и суммы с POS
-        #     profile.bonus = Decimal(poster_client_data.get("bonus", profile.bonus or 0))
-        #     profile.total_payed_sum = Decimal(
-        #         poster_client_data.get("total_payed_sum", profile.total_payed_sum or 0)) / 100
-        #     profile.save(update_fields=["bonus", "total_payed_sum"])
+        poster_clients = self.get_client_by_id(poster_client_id)
+        if not poster_clients:
+            return None
 
-        return client
+        clients, _ = upsert_poster_clients(venue, poster_clients[:1])
+        if not clients:
+            raise PosterClientWithoutPhone(f"У клиента Poster {poster_client_id} нет корректного номера телефона")
+        return next(iter(clients.values()))
 
     def get_categories(self):
         """Метод для получения категорий меню из Poster."""
@@ -278,6 +250,14 @@ class PosterService:
         }
         return self.get("incomingOrders.getIncomingOrder", params=params)
 
+    def get_clients(self, offset=0, num=100):
+        """Страница клиентской базы Poster."""
+        params = {
+            'offset': offset,
+            'num': num,
+        }
+        return self.get("clients.getClients", params=params)
+
     def get_client_by_id(self, client_id):
         params = {
             'client_id': client_id
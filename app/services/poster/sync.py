@@ -0,0 +1,436 @@
+import logging
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+from django.utils.text import slugify
+from unidecode import unidecode
+
+from menu.models import Category, Modificator, Product
+from menu.services.menu_version import bump_menu_version
+from menu.services.photo_urls import build_photo_urls, is_external_photo
+from venues.models import Hall, Spot, Table
+from .service import PosterService
+
+logger = logging.getLogger(__name__)
+
+SYNC_BATCH_SIZE = 500
+DEFAULT_LANGUAGE = settings.MODELTRANSLATION_DEFAULT_LANGUAGE
+
+# разделы меню, которые не могут прийти пустыми: пустой ответ Poster скрыл бы всё меню
+REQUIRED_SECTIONS = ('spots', 'categories', 'products')
+CHANGESET_LABELS = {
+    'spots': "Точки",
+    'halls': "Залы",
+    'tables': "Столы",
+    'categories': "Категории",
+    'products': "Товары",
+    'product_categories': "Категории товаров",
+    'modificators': "Модификаторы",
+}
+
+
+class PosterSyncError(Exception):
+    """Poster не отдал часть меню, синхронизация не выполнялась."""
+
+
+def fetch_poster_menu(pos_service) -> dict:
+    """Забирает из Poster всё, что синхронизируется: точки, залы, столы, категории и товары."""
+    payload = {
+        'spots': pos_service.get_spots(),
+        'halls': pos_service.get_halls(),
+        'tables': pos_service.get_tables(),
+        'categories': pos_service.get_categories(),
+        'products': pos_service.get_products(),
+    }
+    failed = [
+        section for section, items in payload.items()
+        if items is None or (not items and section in REQUIRED_SECTIONS)
+    ]
+    if failed:
+        raise PosterSyncError(f"Poster не вернул данные: {', '.join(failed)}")
+    return payload
+
+
+def sync_poster_menu(venue, payload=None, dry_run=False) -> dict:
+    """
+    Приводит точки, залы, столы, категории, товары и модификаторы заведения
+    к состоянию в Poster и возвращает сводку изменений (см. PosterMenuSync).
+    С dry_run изменения считаются, но откатываются.
+    """
+    if payload is None:
+        payload = fetch_poster_menu(PosterService(venue.access_token, use_cache=False))
+    return PosterMenuSync(venue, payload).run(dry_run=dry_run)
+
+
+def describe_changeset(changeset: dict) -> str:
+    """Сводка изменений одной строкой для сообщений админки и логов."""
+    parts = []
+    for section, counts in changeset.items():
+        if not any(counts.values()):
+            continue
+        counters = ", ".join(f"{label} {counts[key]}" for key, label in (
+            ('created', 'создано'), ('updated', 'обновлено'),
+            ('removed', 'скрыто'), ('skipped', 'пропущено'),
+        ) if counts.get(key))
+        parts.append(f"{CHANGESET_LABELS[section]}: {counters}")
+    return "; ".join(parts) or "Данные актуальны."
+
+
+class PosterMenuSync:
+    """
+    Синхронизация меню заведения с Poster без запроса на каждую позицию:
+    существующие записи загружаются в словари по external_id, сравниваются с ответом
+    Poster, а создание, изменение и скрытие идут пачками в одной транзакции.
+
+    Что пропало из Poster, скрывается, а не удаляется: на товары, модификаторы, столы
+    и точки ссылаются заказы. Вернувшаяся в Poster запись снова становится видимой.
+    Записи без external_id заведены вручную и не трогаются.
+    Фото обновляется, только если оно не загружено вручную.
+
+    Bulk-операции не вызывают сигналы, поэтому кеш меню сбрасывается
+    здесь же, одной сменой версии после коммита.
+    """
+
+    def __init__(self, venue, payload: dict):
+        self.venue = venue
+        self.payload = payload
+        self.changeset = {}
+        self.now = timezone.now()
+        self.payload_items = {}  # раздел -> {external_id: данные из Poster}
+        self.created_product_ids = set()
+
+    def run(self, dry_run=False) -> dict:
+        with transaction.atomic():
+            spots = self._sync_spots()
+            halls = self._sync_halls(spots)
+            self._sync_tables(spots, halls)
+            categories = self._sync_categories()
+            products = self._sync_products(categories)
+            self._sync_product_spots(products)
+            self._sync_product_categories(products, categories)
+            self._sync_modificators(products)
+
+            if dry_run:
+                transaction.set_rollback(True)
+            elif self.has_changes:
+                venue_slug = self.venue.slug
+                transaction.on_commit(lambda: bump_menu_version(venue_slug))
+
+        logger.info(
+            f"Синхронизация с Poster {'(пробная) ' if dry_run else ''}"
+            f"заведения {self.venue.pk}: {describe_changeset(self.changeset)}"
+        )
+        return self.changeset
+
+    @property
+    def has_changes(self) -> bool:
+        return any(
+            counts.get(key) for counts in self.changeset.values()
+            for key in ('created', 'updated', 'removed')
+        )
+
+    # --- точки, залы, столы
+
+    def _sync_spots(self) -> dict:
+        def values(data, spot):
+            return {
+                'name': data['name'],
+                'address': data.get('address'),
+            }
+
+        return self._apply(
+            'spots', Spot, self._existing(Spot.objects.filter(venue=self.venue)),
+            self._items('spots', 'spot_id'), values,
+            remove=lambda spots: self._hide(Spot, spots, 'is_hidden'),
+        )
+
+    def _sync_halls(self, spots) -> dict:
+        def values(data, hall):
+            spot = spots.get(str(data.get('spot_id')))
+            if not spot:
+                return None
+            return {
+                'hall_name': data.get('hall_name'),
+                'spot_id': spot.pk,
+                'is_hidden': False,
+            }
+
+        return self._apply(
+            'halls', Hall, self._existing(Hall.objects.filter(venue=self.venue)),
+            self._items('halls', 'hall_id'), values,
+            remove=lambda halls: self._hide(Hall, halls, 'is_hidden'),
+        )
+
+    def _sync_tables(self, spots, halls) -> dict:
+        def values(data, table):
+            spot = spots.get(str(data.get('spot_id')))
+            hall = halls.get(str(data.get('hall_id')))
+            return {
+                'table_num': data.get('table_num'),
+                'table_title': data.get('table_title') or '',
+                'table_shape': data.get('table_shape'),
+                'hall_id': hall.pk if hall else None,
+                'spot_id': spot.pk if spot else None,
+                'is_hidden': False,
+            }
+
+        return self._apply(
+            'tables', Table, self._existing(Table.objects.filter(venue=self.venue)),
+            self._items('tables', 'table_id'), values,
+            remove=lambda tables: self._hide(Table, tables, 'is_hidden'),
+        )
+
+    # --- меню
+
+    def _sync_categories(self) -> dict:
+        def values(data, category):
+            return {
+                f'category_name_{DEFAULT_LANGUAGE}': data.get('category_name'),
+                'category_hidden': _poster_flag(data.get('category_hidden')),
+                **_photo_values(category, 'category_photo', data.get('category_photo')),
+            }
+
+        return self._apply(
+            'categories', Category, self._existing(Category.objects.filter(venue=self.venue)),
+            self._items('categories', 'category_id'), values,
+            remove=lambda categories: self._hide(Category, categories, 'category_hidden'),
+            prepare=_refresh_photo_urls, before_create=_assign_slugs,
+        )
+
+    def _sync_products(self, categories) -> dict:
+        def values(data, product):
+            if str(data.get('menu_category_id')) not in categories:
+                logger.warning(
+                    f"Категория {data.get('menu_category_id')} не найдена для товара {data.get('product_id')}"
+                )
+                return None
+            return {
+                f'product_name_{DEFAULT_LANGUAGE}': data.get('product_name'),
+                'product_price': _product_price(data),
+                'weight': int(data.get('out') or 0),
+                'hidden': _poster_flag(data.get('hidden')),
+                **_photo_values(product, 'product_photo', data.get('photo')),
+            }
+
+        return self._apply(
+            'products', Product, self._existing(Product.objects.filter(venue=self.venue)),
+            self._items('products', 'product_id'), values,
+            remove=lambda products: self._hide(Product, products, 'hidden'),
+            prepare=_refresh_photo_urls,
+        )
+
+    def _sync_product_spots(self, products):
+        # новые товары, как и прежде, доступны во всех точках, у существующих точки настраивает владелец
+        created = [product for product in products.values() if product.pk in self.created_product_ids]
+        spot_ids = list(Spot.objects.filter(venue=self.venue).values_list('pk', flat=True))
+        through = Product.spots.through
+        through.objects.bulk_create(
+            [through(product_id=product.pk, spot_id=spot_id) for product in created for spot_id in spot_ids],
+            batch_size=SYNC_BATCH_SIZE, ignore_conflicts=True,
+        )
+
+    def _sync_product_categories(self, products, categories):
+        """Товар привязан к своей категории из Poster, ручные категории без external_id остаются."""
+        through = Product.categories.through
+        pos_category_ids = [category.pk for category in categories.values()]
+        current = set(
+            through.objects
+            .filter(product__venue=self.venue, category_id__in=pos_category_ids)
+            .values_list('product_id', 'category_id')
+        )
+        wanted = set()
+        for external_id, product in products.items():
+            data = self.payload_items['products'][external_id]
+            wanted.add((product.pk, categories[str(data.get('menu_category_id'))].pk))
+
+        synced_product_ids = {product.pk for product in products.values()}
+        to_add = wanted - current
+        to_remove = {link for link in current if link[0] in synced_product_ids} - wanted
+
+        through.objects.bulk_create(
+            [through(product_id=product_id, category_id=category_id) for product_id, category_id in to_add],
+            batch_size=SYNC_BATCH_SIZE, ignore_conflicts=True,
+        )
+        if to_remove:
+            query = Q()
+            for product_id, category_id in to_remove:
+                query |= Q(product_id=product_id, category_id=category_id)
+            through.objects.filter(query).delete()
+
+        self.changeset['product_categories'] = {'created': len(to_add), 'removed': len(to_remove)}
+
+    def _sync_modificators(self, products):
+        # модификатор ищется по паре (товар, external_id): у разных товаров id могут совпадать
+        items = {}
+        for external_id, product in products.items():
+            for data in self.payload_items['products'][external_id].get('modifications') or []:
+                items[(product.pk, str(data.get('modificator_id')))] = data
+
+        def values(data, modificator):
+            spots = data.get('spots') or [{}]
+            return {
+                f'name_{DEFAULT_LANGUAGE}': data.get('modificator_name'),
+                'price': int(Decimal(spots[0].get('price') or 0) / 100),
+                'is_hidden': False,
+            }
+
+        # модификаторы пропущенных и скрытых товаров не трогаем
+        existing = {}
+        queryset = Modificator.objects.filter(product__in=[product.pk for product in products.values()])
+        for modificator in queryset.exclude(external_id='').order_by('pk'):
+            existing.setdefault((modificator.product_id, modificator.external_id), modificator)
+
+        self._apply(
+            'modificators', Modificator, existing, items, values,
+            remove=lambda modificators: self._hide(Modificator, modificators, 'is_hidden'),
+            key_fields=('product_id', 'external_id'),
+        )
+
+    # --- общий механизм
+
+    def _items(self, section, id_key) -> dict:
+        items = {}
+        for data in self.payload[section] or []:
+            items.setdefault(str(data[id_key]), data)
+        self.payload_items[section] = items
+        return items
+
+    @staticmethod
+    def _existing(queryset) -> dict:
+        # при дублях external_id берём первую запись, остальные не трогаем
+        existing = {}
+        for obj in queryset.exclude(external_id='').order_by('pk'):
+            existing.setdefault(obj.external_id, obj)
+        return existing
+
+    def _apply(self, section, model, existing, items, values, remove, prepare=None, before_create=None,
+               key_fields=('external_id',)) -> dict:
+        """
+        Сравнивает записи с данными Poster и сохраняет разницу пачками.
+        values(data, obj) — значения полей из Poster (obj=None для новой записи) или None,
+        если позицию нельзя сохранить. Возвращает актуальные записи по ключу.
+        """
+        to_create, to_update, update_fields = [], [], set()
+        synced = {}
+        skipped = 0
+
+        for key, data in items.items():
+            obj = existing.get(key)
+            fields = values(data, obj)
+            if fields is None:
+                skipped += 1
+                continue
+
+            if obj is None:
+                key_values = key if isinstance(key, tuple) else (key,)
+                obj = model(**dict(zip(key_fields, key_values)), **_translated(fields))
+                if hasattr(model, 'venue'):
+                    obj.venue = self.venue
+                if prepare:
+                    prepare(obj)
+                to_create.append(obj)
+            else:
+                changed = [name for name, value in fields.items() if _field_value(obj, name) != value]
+                for name in changed:
+                    setattr(obj, name, fields[name])
+                if changed and prepare:
+                    changed += prepare(obj)
+                if changed:
+                    obj.updated_at = self.now
+                    update_fields.update(changed, ['updated_at'])
+                    to_update.append(obj)
+            synced[key] = obj
+
+        if before_create and to_create:
+            before_create(to_create)
+        model.objects.bulk_create(to_create, batch_size=SYNC_BATCH_SIZE)
+        if to_update:
+            model.objects.bulk_update(to_update, sorted(update_fields), batch_size=SYNC_BATCH_SIZE)
+        removed = remove([obj for key, obj in existing.items() if key not in items])
+
+        if model is Product:
+            self.created_product_ids = {obj.pk for obj in to_create}
+        self.changeset[section] = {
+            'created': len(to_create), 'updated': len(to_update), 'removed': removed, 'skipped': skipped,
+        }
+        return synced
+
+    def _hide(self, model, objs, hidden_field) -> int:
+        pks = [obj.pk for obj in objs if not getattr(obj, hidden_field)]
+        if not pks:
+            return 0
+        return model.objects.filter(pk__in=pks).update(**{hidden_field: True, 'updated_at': self.now})
+
+
+def _poster_flag(value) -> bool:
+    return str(value or 0) == '1'
+
+
+def _product_price(data) -> int:
+    # у товара с модификациями цена задаётся на модификаторах
+    if data.get('modifications'):
+        return 0
+    prices = data.get('price') or {}
+    price = prices.get('1', next(iter(prices.values()), 0))
+    return int(Decimal(price or 0) / 100)
+
+
+def _photo_values(obj, field_name, poster_photo) -> dict:
+    """Фото из Poster, если у записи нет своего загруженного фото."""
+    if obj is not None:
+        current = getattr(obj, field_name)
+        if current and not is_external_photo(current):
+            return {}
+    return {field_name: PosterService.BASE_URL + poster_photo if poster_photo else ''}
+
+
+def _refresh_photo_urls(obj) -> list:
+    # для фото из Poster ссылки считаются без обращения к хранилищу
+    photo = getattr(obj, 'product_photo' if isinstance(obj, Product) else 'category_photo')
+    if photo and not is_external_photo(photo):
+        return []
+    urls = build_photo_urls(obj)
+    if urls == obj.photo_urls:
+        return []
+    obj.photo_urls = urls
+    return ['photo_urls']
+
+
+def _field_value(obj, name):
+    value = getattr(obj, name)
+    if isinstance(value, FieldFile):
+        return value.name or ''
+    return value
+
+
+def _translated(fields: dict) -> dict:
+    """Новая запись получает название из POS на всех языках, как при create() с автозаполнением."""
+    suffix = f'_{DEFAULT_LANGUAGE}'
+    values = dict(fields)
+    for name, value in fields.items():
+        if name.endswith(suffix):
+            base = name[:-len(suffix)]
+            for language in settings.MODELTRANSLATION_LANGUAGES:
+                values.setdefault(f'{base}_{language}', value)
+    return values
+
+
+def _assign_slugs(categories):
+    """Уникальные slug для новых категорий, как в Category.save(), одним запросом."""
+    base_slugs = [slugify(unidecode(category.category_name)) for category in categories]
+    query = Q()
+    for base_slug in set(base_slugs):
+        query |= Q(slug__startswith=base_slug)
+    taken = set(Category.objects.filter(query).values_list('slug', flat=True))
+
+    for category, base_slug in zip(categories, base_slugs):
+        slug, num = base_slug, 1
+        while slug in taken:
+            slug = f"{base_slug}-{num}"
+            num += 1
+        taken.add(slug)
+        category.slug = slug
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from menu.services import warm_menu_cache
+from venues.models import PosterSyncState, Venue
+from .service import PosterService
+from .sync import fetch_poster_menu, sync_poster_menu
+
+logger = logging.getLogger(__name__)
+
+
+def poster_sync_lock_key(venue_id) -> str:
+    return f"poster_sync_lock:{venue_id}"
+
+
+def poster_payload_hash(payload: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode()
+    ).hexdigest()
+
+
+def poster_sync_venues():
+    """Заведения, меню которых берётся из Poster."""
+    return (
+        Venue.objects
+        .filter(pos_system__name__iexact='poster')
+        .exclude(access_token__isnull=True)
+        .exclude(access_token='')
+    )
+
+
+def run_venue_sync(venue, force=False) -> PosterSyncState | None:
+    """
+    Синхронизирует меню заведения с Poster и сохраняет итог в PosterSyncState.
+    Если ответ Poster не изменился с прошлого раза (по хешу), сравнение с базой
+    пропускается; force — синхронизировать всё равно.
+    Возвращает None, если синхронизация этого заведения уже идёт в другом процессе.
+    """
+    lock_key = poster_sync_lock_key(venue.pk)
+    lock_token = uuid.uuid4().hex
+    if not cache.add(lock_key, lock_token, settings.POSTER_SYNC_LOCK_TIMEOUT):
+        logger.info(f"Синхронизация заведения {venue.pk} с Poster уже выполняется")
+        return None
+
+    # пока синхронизация идёт, лок продлевается: долгий проход не должен его пережить
+    stop_heartbeat = threading.Event()
+    heartbeat = threading.Thread(
+        target=_keep_sync_lock, args=(lock_key, lock_token, stop_heartbeat),
+        name=f"poster-sync-lock-{venue.pk}", daemon=True,
+    )
+    heartbeat.start()
+    try:
+        state, _ = PosterSyncState.objects.get_or_create(
+            venue=venue, defaults={'status': PosterSyncState.Status.RUNNING}
+        )
+        state.status = PosterSyncState.Status.RUNNING
+        state.started_at = timezone.now()
+        state.save(update_fields=['status', 'started_at', 'updated_at'])
+
+        started = time.monotonic()
+        try:
+            payload = fetch_poster_menu(PosterService(venue.access_token, use_cache=False))
+            payload_hash = poster_payload_hash(payload)
+            if not force and payload_hash == state.payload_hash:
+                state.status = PosterSyncState.Status.UNCHANGED
+            else:
+                state.changeset = sync_poster_menu(venue, payload)
+                state.payload_hash = payload_hash
+                state.synced_at = timezone.now()
+                state.status = PosterSyncState.Status.SYNCED
+            state.last_error = None
+        except Exception as e:
+            logger.exception(f"Ошибка синхронизации заведения {venue.pk} с Poster")
+            state.status = PosterSyncState.Status.FAILED
+            state.last_error = str(e)
+
+        state.finished_at = timezone.now()
+        state.duration_ms = int((time.monotonic() - started) * 1000)
+        state.save()
+
+        if state.status == PosterSyncState.Status.SYNCED and _has_changes(state.changeset):
+            # меню сменило версию — собираем кеш на всех языках заранее, а не на первом госте
+            try:
+                warm_menu_cache(venue.slug)
+            except Exception:
+                logger.exception(f"Не удалось прогреть кеш меню заведения {venue.pk}")
+        return state
+    finally:
+        stop_heartbeat.set()
+        heartbeat.join()
+        if cache.get(lock_key) == lock_token:
+            cache.delete(lock_key)
+
+
+def _keep_sync_lock(lock_key, lock_token, stop):
+    interval = settings.POSTER_SYNC_LOCK_TIMEOUT / 3
+    while not stop.wait(interval):
+        if cache.get(lock_key) != lock_token:
+            logger.warning(f"Лок синхронизации {lock_key} потерян до окончания синхронизации")
+            return
+        cache.touch(lock_key, settings.POSTER_SYNC_LOCK_TIMEOUT)
+
+
+def _has_changes(changeset) -> bool:
+    # как PosterMenuSync.has_changes: пропущенные позиции меню не меняют
+    return any(
+        counts.get(key) for counts in (changeset or {}).values()
+        for key in ('created', 'updated', 'removed')
+    )
+
+
+def sync_all_venues(workers=None, force=False) -> Counter:
+    """
+    Синхронизирует все заведения с Poster в пуле из workers потоков
+    (не больше POSTER_SYNC_WORKERS одновременных выгрузок из Poster).
+    Возвращает число заведений по итоговому статусу, 'locked' — уже синхронизировались.
+    """
+    venue_ids = list(poster_sync_venues().values_list('pk', flat=True))
+    with ThreadPoolExecutor(
+        max_workers=workers or settings.POSTER_SYNC_WORKERS, thread_name_prefix="poster-sync"
+    ) as executor:
+        statuses = executor.map(lambda venue_id: _sync_venue_job(venue_id, force), venue_ids)
+        return Counter(statuses)
+
+
+def _sync_venue_job(venue_id, force) -> str:
+    try:
+        venue = Venue.objects.filter(pk=venue_id).first()
+        if venue is None:
+            return 'missing'
+        state = run_venue_sync(venue, force=force)
+        return str(state.status) if state else 'locked'
+    finally:
+        connection.close()
@@ -0,0 +1,44 @@
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter, Retry
+
+POSTER_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def poster_timeout() -> tuple[float, float]:
+    return settings.POSTER_CONNECT_TIMEOUT, settings.POSTER_READ_TIMEOUT
+
+
+def poster_session() -> requests.Session:
+    """
+    Общая на процесс сессия к joinposter.com: keep-alive пул соединений
+    и повторы с паузой на 429/5xx и сетевых ошибках.
+    Ответы на POST не повторяются — иначе Poster может создать заказ дважды,
+    повторяется только неудачное соединение (запрос ещё не ушёл).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retries = Retry(
+                total=settings.POSTER_RETRIES,
+                backoff_factor=settings.POSTER_RETRY_BACKOFF,  # 1-я ошибка → 0с, 2-я → 2*backoff, ...
+                status_forcelist=POSTER_RETRY_STATUSES,
+                allowed_methods=("GET",),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                max_retries=retries,
+                pool_connections=4,
+                pool_maxsize=settings.POSTER_POOL_SIZE,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
@@ -3,4 +3,5 @@ from .venue import *
 from .spot import *
 from .table import *
 from .hall import *
-from .banner import *
\ No newline at end of file
+from .banner import *
+from .poster_sync_state import *
\ No newline at end of file
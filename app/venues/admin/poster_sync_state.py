@@ -0,0 +1,26 @@
+from django.contrib import admin
+
+from account.models import ROLE_OWNER
+from services.admin import BaseModelAdmin
+from ..models import PosterSyncState
+
+
+@admin.register(PosterSyncState)
+class PosterSyncStateAdmin(BaseModelAdmin):
+    list_display = ("venue", "status", "finished_at", "synced_at", "duration_ms", "detail_link")
+    list_filter = ("status",)
+    list_filter_submit = True
+    list_select_related = ("venue",)
+    search_fields = ("venue__company_name",)
+    readonly_fields = [field.name for field in PosterSyncState._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if request.user.is_superuser:
+            return qs
+        elif request.user.role == ROLE_OWNER:
+            return qs.filter(venue=request.user.venue)
+        return qs.none()
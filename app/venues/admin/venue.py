@@ -2,7 +2,6 @@ import logging
 
 from django import forms
 from django.contrib import admin, messages
-from django.core.cache import cache
 from django.shortcuts import get_object_or_404, redirect
 from django.utils.html import format_html
 from modeltranslation.admin import TabbedTranslationAdmin
@@ -13,11 +12,10 @@ from unfold.decorators import action, display
 from unfold.widgets import UnfoldAdminTimeWidget
 
 from account.models import ROLE_OWNER
-from menu.models import Category, Product
-from services.pos_service_factory import POSServiceFactory
+from services.poster import describe_changeset, run_venue_sync
 from services.admin import BaseModelAdmin
 
-from ..models import Venue, Spot, Table, Hall, WorkSchedule
+from ..models import PosterSyncState, Venue, Spot, WorkSchedule
 
 logger = logging.getLogger(__name__)
 
@@ -206,16 +204,6 @@ class VenueAdmin(BaseModelAdmin, TabbedTranslationAdmin):
             return qs.filter(users=request.user)
         return qs
 
-    def save_model(self, request, obj, form, change):
-        super().save_model(request, obj, form, change)
-
-        cache.delete_pattern(f"venue:{obj.slug.lower()}:*")
-
-    def delete_model(self, request, obj):
-        super().delete_model(request, obj)
-
-        cache.delete_pattern(f"venue:{obj.slug.lower()}:*")
-
     @action(
         description="Получить информацию из POS системы",
         url_path="spots_and_tables_action_detail-url",
@@ -233,134 +221,17 @@ class VenueAdmin(BaseModelAdmin, TabbedTranslationAdmin):
 
         pos_system_name = venue.pos_system.name.lower()
         logger.info(f"POS система: {pos_system_name} для заведения {venue.company_name}")
-
-        pos_service = POSServiceFactory.get_service(pos_system_name, venue.access_token)
-
-        logger.info("Получение spots...")
-        spots_data = pos_service.get_spots()
-        if not self.process_items(request, venue, spots_data, Spot, 'spot_id', pos_service.create_new_spot):
-            return redirect(request.META["HTTP_REFERER"])
-
-        logger.info("Получение halls...")
-        halls_data = pos_service.get_halls()
-        if not self.process_items(
-                request, venue, halls_data, Hall, 'hall_id', pos_service.create_new_hall,
-                related_model_class_1=Spot, related_external_id_key_1='spot_id'):
-            return redirect(request.META["HTTP_REFERER"])
-
-        logger.info("Получение tables...")
-        tables_data = pos_service.get_tables()
-        if not self.process_items(
-                request, venue, tables_data, Table, 'table_id', pos_service.create_new_table,
-                related_model_class_1=Hall, related_external_id_key_1='hall_id',
-                related_model_class_2=Spot, related_external_id_key_2='spot_id'):
-            return redirect(request.META["HTTP_REFERER"])
-
-        logger.info("Получение categories...")
-        categories_data = pos_service.get_categories()
-        if not self.process_items(
-                request, venue, categories_data, Category, 'category_id', pos_service.create_new_category):
-            return redirect(request.META["HTTP_REFERER"])
-
-        logger.info("Получение products...")
-        products_data = pos_service.get_products()
-        if not products_data:
-            msg = 'Ошибка при получении продуктов'
-            logger.error(msg)
-            self.message_user(request, msg, level=messages.ERROR)
+        if pos_system_name != 'poster':
+            self.message_user(request, f"POS система {venue.pos_system} не поддерживается.", level=messages.ERROR)
             return redirect(request.META["HTTP_REFERER"])
 
-        created_item_count = 0
-        for product_data in products_data:
-            existing_product = Product.objects.filter(
-                venue=venue,
-                external_id=product_data['product_id']
-            ).exists()
-
-            if not existing_product:
-                category_external_id = product_data.get('menu_category_id')
-                related_category = Category.objects.filter(
-                    venue=venue,
-                    external_id=category_external_id
-                ).first()
-                if not related_category:
-                    # logger.warning(
-                    #     f"Не найдена категория для продукта ID={product_data}, "
-                    #     f"Не найдена категория для продукта ID={product_data.get('product_id')}, "
-                    #     f"menu_category_id={category_external_id}, "
-                    #     f"имеющиеся категории: {list(Category.objects.filter(venue=venue).values_list('external_id', flat=True))}"
-                    # )
-                    msg = f"Связанная категория не найдена для продукта: {product_data.get('product_id')}"
-                    logger.warning(msg)
-                    self.message_user(
-                        request,
-                        f"Не удалось найти связанные объекты для Продуктов ({Category._meta.verbose_name_plural}).",
-                        level=messages.ERROR,
-                    )
-                    return redirect(request.META["HTTP_REFERER"])
-
-                related_spots = Spot.objects.filter(venue=venue)
-
-                logger.debug(f"Создание нового продукта: {product_data}")
-                pos_service.create_new_product(product_data, venue, related_category, related_spots)
-                created_item_count += 1
-
-        if created_item_count > 0:
-            msg = f"{created_item_count} продуктов успешно созданы."
-            logger.info(msg)
-            self.message_user(request, msg, level=messages.SUCCESS)
+        state = run_venue_sync(venue, force=True)
+        if state is None:
+            self.message_user(request, "Синхронизация заведения уже выполняется.", level=messages.WARNING)
+        elif state.status == PosterSyncState.Status.FAILED:
+            self.message_user(request, state.last_error, level=messages.ERROR)
         else:
-            logger.info("Продукты актуальны.")
-            self.message_user(request, "Продукты актуальны.", level=messages.SUCCESS)
+            self.message_user(request, describe_changeset(state.changeset), level=messages.SUCCESS)
 
         logger.info(f"Обработка POS данных завершена для заведения ID: {object_id}")
         return redirect(request.META["HTTP_REFERER"])
-
-    def process_items(self, request, venue, items_data, model_class, external_id_key, create_method,
-                      related_model_class_1=None, related_external_id_key_1=None,
-                      related_model_class_2=None, related_external_id_key_2=None):
-        item_name = model_class._meta.verbose_name_plural
-        logger.info(f"Обработка {item_name}...")
-
-        if not items_data:
-            msg = f'{item_name} не найдено!'
-            logger.warning(msg)
-            self.message_user(request, msg)
-            return False
-
-        created_item_count = 0
-        for item_data in items_data:
-            existing_item = model_class.objects.filter(
-                venue=venue,
-                external_id=item_data[external_id_key]
-            ).exists()
-
-            if not existing_item:
-                related_instance_1 = None
-                if related_model_class_1 and related_external_id_key_1:
-                    related_instance_1 = related_model_class_1.objects.filter(
-                        venue=venue,
-                        external_id=item_data.get(related_external_id_key_1)
-                    ).first()
-
-                related_instance_2 = None
-                if related_model_class_2 and related_external_id_key_2:
-                    related_instance_2 = related_model_class_2.objects.filter(
-                        venue=venue,
-                        external_id=item_data.get(related_external_id_key_2)
-                    ).first()
-
-                logger.debug(f"Создание нового объекта {item_name[:-1]}: {item_data}")
-                create_method(item_data, venue, related_instance_1, related_instance_2)
-                created_item_count += 1
-
-        if created_item_count > 0:
-            msg = f"{created_item_count} {item_name} успешно созданы."
-            logger.info(msg)
-            self.message_user(request, msg, level=messages.SUCCESS)
-        else:
-            msg = f"{item_name} актуальны."
-            logger.info(msg)
-            self.message_user(request, msg, level=messages.SUCCESS)
-
-        return True
@@ -38,7 +38,7 @@ class CallWaiterView(APIView):
             )
 
         try:
-            table = Table.objects.get(id=table_id)
+            table = Table.objects.get(id=table_id, is_hidden=False)
         except Table.DoesNotExist:
             return Response({"error": "Table not found"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -27,7 +27,7 @@ class VenueViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin):
             .prefetch_related(Prefetch("spots", queryset=Spot.objects.filter(is_hidden=False)))
             .get(slug=slug.lower())
         )
-        table = venue.tables.get(pk=table_id)
+        table = venue.tables.get(pk=table_id, is_hidden=False)
 
         venue_data = VenueSerializer(venue, context={'request': request}).data
         venue_data['table'] = TableSerializer(table, context={'request': request}).data
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
@@ -5,7 +6,10 @@ from rest_framework import viewsets, mixins
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
-from venues.models import Venue, Spot
+from menu.services import (
+    cache_key_etag, etag_headers, etag_matches, menu_cache_key, menu_language, not_modified_response
+)
+from venues.models import Venue, Spot, Table
 from venues.api.v2.serializers import TableSerializer
 from venues.api.v2.serializers.venue import VenueSerializer
 
@@ -63,21 +67,31 @@ class VenueViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin):
         - `/api/venues/{slug}/`
         - `/api/venues/{slug}/?table_id={id}`
         """
-        venue = get_object_or_404(
-            Venue.objects.prefetch_related(
-                Prefetch("spots", queryset=Spot.objects.filter(is_hidden=False))
-            ),
-            slug=slug.lower()
-        )
-
-        data = VenueSerializer(venue, context={'request': request}).data
+        slug = slug.lower()
         table_id = request.query_params.get('table_id')
+        cache_key = menu_cache_key("venue", slug, menu_language())
+        # стол в кеш заведения не входит, но ответ от него зависит
+        etag = cache_key_etag(f"{cache_key}:{table_id or ''}")
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+
+        data = cache.get(cache_key)
+
+        if not data:
+            venue = get_object_or_404(
+                Venue.objects.prefetch_related(
+                    Prefetch("spots", queryset=Spot.objects.filter(is_hidden=False))
+                ),
+                slug=slug
+            )
+            data = VenueSerializer(venue, context={'request': request}).data
+            cache.set(cache_key, data, 60 * 30)  # 30 минут
 
         if table_id:
-            table = get_object_or_404(venue.tables, pk=table_id)
-            data["table"] = TableSerializer(table, context={'request': request}).data
+            table = get_object_or_404(Table, venue__slug=slug, pk=table_id, is_hidden=False)
+            data = {**data, "table": TableSerializer(table, context={'request': request}).data}
 
-        return Response(data)
+        return Response(data, headers=etag_headers(etag))
 
     def get_object(self):
         slug = self.kwargs.get(self.lookup_field).lower()
@@ -0,0 +1,62 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from services.poster import describe_changeset, poster_sync_venues, run_venue_sync, sync_all_venues
+
+
+class Command(BaseCommand):
+    help = (
+        "Периодически синхронизирует меню, точки и столы всех заведений с Poster: "
+        "несколько заведений параллельно, одно заведение — не больше одной синхронизации за раз"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=settings.POSTER_SYNC_INTERVAL,
+            help='Пауза между проходами по всем заведениям, секунд'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.POSTER_SYNC_WORKERS,
+            help='Сколько заведений синхронизировать одновременно'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Один проход и выход'
+        )
+        parser.add_argument(
+            '--venue', type=int,
+            help='Синхронизировать только заведение с этим ID и выйти'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Сравнивать с базой, даже если ответ Poster не изменился'
+        )
+
+    def handle(self, *args, **options):
+        if options['venue']:
+            venue = poster_sync_venues().filter(pk=options['venue']).first()
+            if not venue:
+                raise CommandError(f"Заведение {options['venue']} не найдено или не подключено к Poster")
+            state = run_venue_sync(venue, force=options['force'])
+            if state is None:
+                self.stdout.write(self.style.WARNING("⏳ Синхронизация заведения уже выполняется"))
+            else:
+                details = state.last_error or describe_changeset(state.changeset or {})
+                self.stdout.write(f"🏁 {state.get_status_display()}: {details}")
+            return
+
+        self.stdout.write("🔄 Синхронизация с Poster запущена")
+        while True:
+            close_old_connections()
+            started = time.monotonic()
+            statuses = sync_all_venues(workers=options['workers'], force=options['force'])
+            summary = ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+            self.stdout.write(
+                self.style.SUCCESS(f"🏁 Проход за {time.monotonic() - started:.1f}с — {summary or 'нет заведений'}")
+            )
+            if options['once']:
+                return
+            time.sleep(max(options['interval'] - (time.monotonic() - started), 0))
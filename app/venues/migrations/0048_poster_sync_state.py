@@ -0,0 +1,36 @@
+# Generated by Django 5.1 on 2026-10-18 16:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues', '0047_venue_table_qr_text_en_venue_table_qr_text_ky_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PosterSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата последнего обновления')),
+                ('status', models.CharField(choices=[('running', 'Выполняется'), ('synced', 'Синхронизировано'), ('unchanged', 'Без изменений'), ('failed', 'Ошибка')], max_length=20, verbose_name='Статус')),
+                ('payload_hash', models.CharField(blank=True, max_length=64, verbose_name='Хеш данных Poster')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начало последней синхронизации')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Окончание последней синхронизации')),
+                ('synced_at', models.DateTimeField(blank=True, null=True, verbose_name='Последние изменения из Poster')),
+                ('duration_ms', models.PositiveIntegerField(blank=True, null=True, verbose_name='Длительность, мс')),
+                ('changeset', models.JSONField(blank=True, null=True, verbose_name='Сводка изменений')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='Последняя ошибка')),
+                ('venue', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='poster_sync_state', to='venues.venue', verbose_name='Заведение')),
+            ],
+            options={
+                'verbose_name': 'Синхронизация с Poster',
+                'verbose_name_plural': 'Синхронизации с Poster',
+                'ordering': ['-finished_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('venues', '0048_poster_sync_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hall',
+            name='is_hidden',
+            field=models.BooleanField(default=False, verbose_name='Скрыт?'),
+        ),
+        migrations.AddField(
+            model_name='table',
+            name='is_hidden',
+            field=models.BooleanField(default=False, verbose_name='Скрыт?'),
+        ),
+    ]
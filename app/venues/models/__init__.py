@@ -4,4 +4,5 @@ from .spot import *
 from .table import *
 from .hall import *
 from .banner import *
-from .work_schedule import *
\ No newline at end of file
+from .work_schedule import *
+from .poster_sync_state import *
\ No newline at end of file
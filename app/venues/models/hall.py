@@ -10,6 +10,7 @@ class Hall(BaseModel):
                               verbose_name="Заведение")
     spot = models.ForeignKey('Spot', on_delete=models.CASCADE, related_name='halls',
                              verbose_name="Точка заведения")
+    is_hidden = models.BooleanField(default=False, verbose_name="Скрыт?")
 
     class Meta:
         verbose_name = "Зал"
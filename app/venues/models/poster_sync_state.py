@@ -0,0 +1,33 @@
+from django.db import models
+
+from services.model import BaseModel
+
+
+class PosterSyncState(BaseModel):
+    """Состояние последней синхронизации меню заведения с Poster (см. services.poster.sync_worker)."""
+
+    class Status(models.TextChoices):
+        RUNNING = 'running', 'Выполняется'
+        SYNCED = 'synced', 'Синхронизировано'
+        UNCHANGED = 'unchanged', 'Без изменений'
+        FAILED = 'failed', 'Ошибка'
+
+    venue = models.OneToOneField(
+        'Venue', on_delete=models.CASCADE, related_name='poster_sync_state', verbose_name="Заведение"
+    )
+    status = models.CharField(max_length=20, choices=Status.choices, verbose_name="Статус")
+    payload_hash = models.CharField(max_length=64, blank=True, verbose_name="Хеш данных Poster")
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name="Начало последней синхронизации")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Окончание последней синхронизации")
+    synced_at = models.DateTimeField(blank=True, null=True, verbose_name="Последние изменения из Poster")
+    duration_ms = models.PositiveIntegerField(blank=True, null=True, verbose_name="Длительность, мс")
+    changeset = models.JSONField(blank=True, null=True, verbose_name="Сводка изменений")
+    last_error = models.TextField(blank=True, null=True, verbose_name="Последняя ошибка")
+
+    class Meta:
+        verbose_name = "Синхронизация с Poster"
+        verbose_name_plural = "Синхронизации с Poster"
+        ordering = ['-finished_at']
+
+    def __str__(self):
+        return f'{self.venue} — {self.get_status_display()}'
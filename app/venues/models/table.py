@@ -29,6 +29,8 @@ class Table(BaseModel):
         'Hall', on_delete=models.CASCADE, related_name='tables',
         blank=True, null=True, verbose_name='Зал'
     )
+    # пропавший из Poster стол скрывается, а не удаляется: на него ссылается история заказов
+    is_hidden = models.BooleanField(default=False, verbose_name="Скрыт?")
 
     def __str__(self):
         return f"Стол {self.table_num} ({self.table_title})"
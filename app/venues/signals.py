@@ -0,0 +1,34 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from menu.services import invalidate_menu_slug, invalidate_venue_menu
+from venues.models import Venue, Spot, Table, WorkSchedule
+
+
+@receiver(pre_save, sender=Venue)
+def remember_venue_slug(sender, instance, raw=False, **kwargs):
+    instance._previous_slug = None
+    if instance.pk and not raw:
+        instance._previous_slug = Venue.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Venue)
+def invalidate_menu_on_venue_change(sender, instance, **kwargs):
+    invalidate_venue_menu(pk=instance.pk)
+    previous_slug = getattr(instance, '_previous_slug', None)
+    if previous_slug and previous_slug != instance.slug:
+        # кеш лежит под ключами старого slug — без сброса по нему отдавалось бы прежнее меню
+        invalidate_menu_slug(previous_slug)
+
+
+@receiver(post_delete, sender=Venue)
+def invalidate_menu_on_venue_delete(sender, instance, **kwargs):
+    # после коммита заведения уже нет в базе, сбрасываем по slug
+    invalidate_menu_slug(instance.slug)
+
+
+@receiver([post_save, post_delete], sender=Spot)
+@receiver([post_save, post_delete], sender=WorkSchedule)
+@receiver([post_save, post_delete], sender=Table)
+def invalidate_menu_on_spot_change(sender, instance, **kwargs):
+    invalidate_venue_menu(pk=instance.venue_id)